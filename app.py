@@ -1,16 +1,120 @@
-from flask import Flask, render_template, request
-from flask import jsonify
+from flask import Flask, request, g
+from flask import render_template as flask_render_template
+from flask import jsonify, Response, stream_with_context
 from datetime import datetime
-from utility import fetch_cost_center_details
-from status import get_subscription_status, get_sql_connection, row_to_dict
+from utility import fetch_cost_center_details, fetch_cost_center_details_bulk, iter_cost_center_details, normalize_cost_center
+from utility import fetch_cost_center_details_within, submit_enrichment, EnrichmentBusyError, ENRICH_QUEUE_MAX
+from utility import cost_center_replica, sync_cost_center_replica, COST_CENTER_SYNC_INTERVAL
+from cost_center_replica import run_scheduler
+from owners import it_owner_index, IT_OWNER_INDEX_REFRESH, IT_OWNER_TYPEAHEAD_LIMIT, IT_OWNER_TYPEAHEAD_MAX
+from cache import make_cache, get_cache_stats, MISS, CACHE_FALLBACK_TTL
+from schema import PLATFORMS, get_platform, select_by_id, select_proposed
+from listing import list_subscriptions, summarize_subscriptions, empty_summary
+from listing import ListingError, EXACT_FILTERS, CONTAINS_FILTERS, DEFAULT_PAGE_SIZE
+from approvals import apply_approval_decisions, ApprovalBatchError
+from submissions import submit_reviews, ReviewBatchError, load_rows, plan_submission
+from submissions import cost_center_approval_fields, approval_row, upsert_approvals, upsert_proposed_changes
+from submissions import enrich_queued_approval, queued_approvals
+from status import get_sql_connection, get_pool_stats, row_to_dict, rows_to_dicts
+from status import start_db_call_tracking, get_db_call_counter, owner_email_predicate, APPROVER_COLUMNS
+from instrumentation import start_request_trace, get_request_trace, route_metrics, span, SLOW_REQUEST_LOG_MS
 from dotenv import load_dotenv
+from concurrent.futures import TimeoutError as FutureTimeoutError
 import pyodbc
 import base64
 import json
+import os
+import threading
+import time
+import uuid
 load_dotenv()
 
 app = Flask(__name__, static_folder='static', template_folder='templates')
 
+# X-DB-Queries / X-DB-Connections / Server-Timing on every response; development only,
+# they expose statement counts and timings to any client
+DB_DEBUG_HEADERS = os.getenv("DB_DEBUG_HEADERS", "false").lower() == "true"
+
+# Bulk cost center resolution limits
+COST_CENTER_BULK_MAX_CODES = int(os.getenv("COST_CENTER_BULK_MAX_CODES", "10000"))
+COST_CENTER_BULK_STREAM_THRESHOLD = int(os.getenv("COST_CENTER_BULK_STREAM_THRESHOLD", "200"))
+COST_CENTER_BULK_PROGRESS_EVERY = 50
+
+# Submit-time cost center enrichment: hard deadline for the API lookup, or (async mode)
+# queue the approval row at once and fill responsible/name in the background
+COST_CENTER_ENRICH_DEADLINE = float(os.getenv("COST_CENTER_ENRICH_DEADLINE", "5"))  # seconds
+COST_CENTER_ENRICH_ASYNC = os.getenv("COST_CENTER_ENRICH_ASYNC", "false").lower() == "true"
+# Seconds between sweeps for queued approvals whose background job never ran (queue
+# full, worker restarted); 0 = off
+COST_CENTER_ENRICH_SWEEP_INTERVAL = float(os.getenv("COST_CENTER_ENRICH_SWEEP_INTERVAL", "300"))
+
+# Details page view model cache, keyed by (platform, sub_id). Writes invalidate it, which
+# every worker sees at once through the shared backend (CACHE_REDIS_URL). Without Redis
+# each worker keeps its own copy for at most CACHE_FALLBACK_TTL seconds, so another
+# worker may serve a page that old after an edit.
+DETAILS_CACHE_SIZE = int(os.getenv("DETAILS_CACHE_SIZE", "2048"))
+DETAILS_CACHE_TTL = int(os.getenv("DETAILS_CACHE_TTL", "60"))  # seconds
+details_cache = make_cache("metadetails", max_size=DETAILS_CACHE_SIZE, ttl=DETAILS_CACHE_TTL,
+                           local_ttl=0, fallback_ttl=CACHE_FALLBACK_TTL)
+
+# Home page counters per user, keyed by the user's email set (same fallback rule)
+DASHBOARD_CACHE_SIZE = int(os.getenv("DASHBOARD_CACHE_SIZE", "4096"))
+DASHBOARD_CACHE_TTL = int(os.getenv("DASHBOARD_CACHE_TTL", "120"))  # seconds
+dashboard_cache = make_cache("dashboard", max_size=DASHBOARD_CACHE_SIZE, ttl=DASHBOARD_CACHE_TTL,
+                             local_ttl=0, fallback_ttl=CACHE_FALLBACK_TTL)
+
+# Keep the local cost center replica fresh from inside the app (alternatively run
+# `python -m cost_center_replica` from cron); the file lock lets one worker sync at a time
+if COST_CENTER_SYNC_INTERVAL > 0:
+    run_scheduler(lambda: sync_cost_center_replica(min_interval=COST_CENTER_SYNC_INTERVAL), COST_CENTER_SYNC_INTERVAL)
+
+# it_owner_reference is loaded on first use and reloaded in the background
+if IT_OWNER_INDEX_REFRESH > 0:
+    it_owner_index.start_refresh(IT_OWNER_INDEX_REFRESH)
+
+# =======================
+# Request Hooks
+# =======================
+@app.before_request
+def track_db_calls():
+    start_db_call_tracking()
+    start_request_trace()
+
+@app.after_request
+def add_db_call_headers(response):
+    # Expose DB usage per request so N+1 regressions show up in the browser dev tools
+    counter = get_db_call_counter()
+    if DB_DEBUG_HEADERS and counter is not None:
+        response.headers['X-DB-Connections'] = str(counter.connections)
+        response.headers['X-DB-Queries'] = str(counter.queries)
+    return response
+
+@app.after_request
+def add_server_timing_header(response):
+    # Per-span breakdown in the browser (Server-Timing)
+    g.response_status = response.status_code
+    trace = get_request_trace()
+    if DB_DEBUG_HEADERS and trace is not None:
+        response.headers['Server-Timing'] = trace.server_timing()
+    return response
+
+@app.teardown_request
+def record_request_timing(exc):
+    # Per-route histograms for /metrics; teardown also runs when a view raised,
+    # so unhandled exceptions count as 500s
+    trace = get_request_trace()
+    if trace is None:
+        return
+    status = 500 if exc is not None else g.get('response_status', 500)
+    route = request.url_rule.rule if request.url_rule else '<unmatched>'
+    elapsed_ms = route_metrics.observe(route, request.method, status, trace)
+    if SLOW_REQUEST_LOG_MS and elapsed_ms >= SLOW_REQUEST_LOG_MS:
+        print(f"🐢 {request.method} {route} took {elapsed_ms:.0f} ms: {json.dumps(trace.summary())}")
+
+def render_template(template_name, **context):
+    with span('render', template_name):
+        return flask_render_template(template_name, **context)
+
 # =======================
 # Helper Functions
 # =======================
@@ -34,61 +138,92 @@ def get_logged_in_user():
     emails = [e.lower() for e in (email1, email2) if e]
     return user_name, emails
 
-def get_subscriptions_by_email(table_name, user_emails, platform):
-    # Extract and filter None values
-    emails = [e.lower() for e in user_emails if e]  # remove None
-    if not emails:
-        return []  # no emails, return empty list
-
-    conn = get_sql_connection()
-    cursor = conn.cursor()
+def _dashboard_version(email):
+    """
+    Current generation token of one email's dashboards. A missing token (never set,
+    expired or evicted) is replaced by a fresh one, so it can't revive an old entry.
+    """
+    key = f"version:{email}"
+    version = dashboard_cache.get(key)
+    if version is MISS:
+        version = uuid.uuid4().hex[:12]
+        dashboard_cache.set(key, version)
+    return version
+
+def dashboard_cache_key(user_emails):
+    """
+    One entry per set of emails the user logs in with, tagged with each email's
+    generation token: bumping any of them (invalidate_dashboards) orphans every
+    entry that email is part of.
+    """
+    emails = sorted({e.lower() for e in user_emails if e})
+    return "|".join(f"{email}#{_dashboard_version(email)}" for email in emails)
 
-    # Build placeholders dynamically
-    placeholders = ','.join('?' for _ in emails)
-    query = f"""
-        SELECT * 
-        FROM [{table_name}]
-        WHERE LOWER([IT Owner]) IN ({placeholders})
-           OR LOWER([Cost Center Responsible]) IN ({placeholders})
+def get_dashboard_summary(user_emails):
     """
-    # Repeat emails tuple for IT Owner + Cost Center
-    params = tuple(emails) * 2
-    cursor.execute(query, params)
-    rows = cursor.fetchall()
-
-    # Convert pyodbc rows → list of dicts
-    columns = [col[0] for col in cursor.description]
-    subscriptions = [dict(zip(columns, row)) for row in rows]
-
-    # Normalization
-    normalized = []
-    for sub in subscriptions:
-        if platform == 'AWS':
-            sub['Subscription ID'] = sub.pop('Account ID', None)
-            sub['Environment'] = sub.get('Type of Account', 'N/A')
-        elif platform == 'GCP':
-            sub['Subscription ID'] = sub.pop('Project ID', None)
-            sub['Environment'] = sub.get('Type of Project', 'N/A')
-            sub['Person-related'] = sub.get('Personal Related', 'N/A')
-        else:  # Azure
-            sub['Environment'] = sub.get('Type of Subscription', 'N/A')
-
-        sub['platform'] = platform
-        sub['Subscription Status'] = get_subscription_status(sub['Subscription ID'], platform)
-        normalized.append(sub)
-
-    cursor.close()
-    conn.close()
-    return normalized
-
-def count_statuses(subscriptions):
-    return {
-        'total': len(subscriptions),
-        'up_to_date': sum(1 for sub in subscriptions if sub.get('Subscription Status', '').lower() == 'up to date'),
-        'overdue': sum(1 for sub in subscriptions if sub.get('Subscription Status', '').lower() == 'overdue'),
-        'in_progress': sum(1 for sub in subscriptions if sub.get('Subscription Status', '').lower() == 'in-progress'),
-        'check': sum(1 for sub in subscriptions if sub.get('Subscription Status', '').lower() == 'check'),
-    }
+    Status counters per platform for the home page, cached per user.
+    Returns ({platform: counts}, [warnings]).
+    """
+    key = dashboard_cache_key(user_emails)
+    if not key:
+        return {platform: empty_summary() for platform in PLATFORMS}, []
+
+    summary = dashboard_cache.get(key)
+    if summary is MISS:
+        summary, warnings = summarize_subscriptions(user_emails)
+        if warnings:
+            return summary, warnings  # partial counters are not cached
+        dashboard_cache.set(key, summary)
+    return summary, []
+
+def invalidate_dashboards(*emails):
+    """
+    Drop the cached counters of the given users (asset owners and the acting user)
+    after a write changed an asset's status or ownership. Covers every cached
+    email combination an email appears in.
+    """
+    for email in emails:
+        if isinstance(email, str) and email.strip():
+            dashboard_cache.set(f"version:{email.strip().lower()}", uuid.uuid4().hex[:12])
+
+def invalidate_touched(touched):
+    """Cache invalidation for the subscriptions a batch write changed: [(platform, sub_id, owners)]."""
+    reviewer_emails = get_logged_in_user()[1]
+    for platform, sub_id, owners in touched:
+        invalidate_details(platform, sub_id)
+        invalidate_dashboards(*owners, *reviewer_emails)
+
+def enrich_in_background(platform, sub_id, new_cost_center, proposed, owners):
+    """Async enrichment job; a dropped approval row changes the subscription's status."""
+    try:
+        if not enrich_queued_approval(platform, sub_id, new_cost_center, proposed):
+            print(f"⚠️ Cost center {new_cost_center} for {platform}/{sub_id} could not be resolved; approval dropped")
+            invalidate_dashboards(*owners)
+    except Exception as e:
+        print(f"❌ Background cost center enrichment failed for {platform}/{sub_id}: {e}")
+
+def sweep_queued_enrichments():
+    """Resubmit queued approvals still lacking a responsible, as far as the queue allows."""
+    for platform, sub_id, new_cost_center, proposed, owners in queued_approvals(ENRICH_QUEUE_MAX):
+        if not submit_enrichment(enrich_in_background, platform, sub_id, new_cost_center, proposed, owners):
+            break
+
+def start_enrichment_sweep(interval):
+    """Daemon thread calling sweep_queued_enrichments() every `interval` seconds."""
+    def loop():
+        while True:
+            time.sleep(interval)
+            try:
+                sweep_queued_enrichments()
+            except Exception as e:
+                print(f"❌ Queued cost center enrichment sweep failed: {e}")
+
+    thread = threading.Thread(target=loop, name="cost-center-enrich-sweep", daemon=True)
+    thread.start()
+    return thread
+
+if COST_CENTER_ENRICH_SWEEP_INTERVAL > 0:
+    start_enrichment_sweep(COST_CENTER_ENRICH_SWEEP_INTERVAL)
 
 # =======================
 # Routes
@@ -98,101 +233,97 @@ def count_statuses(subscriptions):
 def home():
     user_name, user_email = get_logged_in_user()
 
-    # Get subscriptions from all platforms
-    azure_subs = get_subscriptions_by_email('azure_assets', user_email, 'Azure')
-    aws_subs = get_subscriptions_by_email('aws_assets', user_email, 'AWS')
-    gcp_subs = get_subscriptions_by_email('gcp_assets', user_email, 'GCP')
-
-    # Status counts
-    azure_counts = count_statuses(azure_subs)
-    aws_counts = count_statuses(aws_subs)
-    gcp_counts = count_statuses(gcp_subs)
+    # Status counts only; the page never needed the rows themselves
+    summary, warnings = get_dashboard_summary(user_email)
+    azure_counts = summary['Azure']
+    aws_counts = summary['AWS']
+    gcp_counts = summary['GCP']
 
     return render_template('index.html',
                            user_email=user_email,
                            user_name=user_name,
-                           azure_subs=azure_subs,
-                           aws_subs=aws_subs,
-                           gcp_subs=gcp_subs,
                            azure_counts=azure_counts,
                            aws_counts=aws_counts,
-                           gcp_counts=gcp_counts)
+                           gcp_counts=gcp_counts,
+                           warnings=warnings)
 
 @app.route('/components/metadata')
 def metadata():
     platform = request.args.get('platform')
     user_name, user_emails = get_logged_in_user()  # <-- FIX: unpack correctly
 
-    if not platform:
-        azure_subs = get_subscriptions_by_email('azure_assets', user_emails, 'Azure')
-        aws_subs = get_subscriptions_by_email('aws_assets', user_emails, 'AWS')
-        gcp_subs = get_subscriptions_by_email('gcp_assets', user_emails, 'GCP')
-
-        subscriptions = azure_subs + aws_subs + gcp_subs
-        platform = "All Platforms"
-    else:
-        table_map = {
-            'Azure': 'azure_assets',
-            'AWS': 'aws_assets',
-            'GCP': 'gcp_assets'
-        }
-        table = table_map.get(platform)
-        if not table:
-            return "Invalid platform", 400
-        subscriptions = get_subscriptions_by_email(table, user_emails, platform)
-
-    # Dynamic subscription status
-    for sub in subscriptions:
-        sub_id = sub['Subscription ID']
-        sub_platform = sub['platform']
-        sub['Subscription Status'] = get_subscription_status(sub_id, sub_platform)
+    if platform and get_platform(platform) is None:
+        return "Invalid platform", 400
 
+    # Rows are fetched page by page from /api/metadata by metaData.js
     return render_template(
         'components/metaData.html',
         user_name=user_name,
         user_email=user_emails,
-        platform=platform,
-        subscriptions=subscriptions
+        platform=platform or "All Platforms",
+        page_size=DEFAULT_PAGE_SIZE
     )
 
-@app.route('/components/metadetails')
-def meta_details():
-    sub_id = request.args.get('id')
-    platform = request.args.get('platform')
-
-    if not sub_id or not platform:
-        return "Missing required parameters", 400
-
-    table_map = {
-        'Azure': ('azure_assets', 'Subscription ID'),
-        'AWS': ('aws_assets', 'Account ID'),
-        'GCP': ('gcp_assets', 'Project ID')
-    }
-
-    if platform not in table_map:
-        return "Invalid platform", 400
+@app.route('/api/metadata')
+def metadata_api():
+    """
+    JSON listing for the metadata page with keyset pagination.
+    Query args: platform (repeatable), status / environment (repeatable, exact),
+    id / cost_center / it_owner (contains), q (search), sort, order, limit, cursor,
+    facets=1 (include filter options).
+    """
+    _, user_emails = get_logged_in_user()
+    args = request.args
 
-    table_name, id_column = table_map[platform]
+    platforms = args.getlist('platform')
+    if any(get_platform(p) is None for p in platforms):
+        return jsonify({'error': 'Invalid platform'}), 400
 
+    try:
+        page = list_subscriptions(
+            user_emails,
+            platforms=platforms or None,
+            filters={column: args.getlist(column) for column in EXACT_FILTERS + CONTAINS_FILTERS},
+            search=args.get('q'),
+            sort=args.get('sort', 'platform'),
+            order=args.get('order', 'asc'),
+            limit=args.get('limit', DEFAULT_PAGE_SIZE, type=int),
+            cursor=args.get('cursor'),
+            with_facets=args.get('facets') == '1'
+        )
+    except ListingError as e:
+        return jsonify({'error': str(e)}), 400
+
+    return jsonify(page)
+
+def details_cache_key(platform, sub_id):
+    return f"{platform}:{sub_id}"
+
+def invalidate_details(platform, sub_id):
+    """Drop the cached details view model after a write to this subscription."""
+    details_cache.delete(details_cache_key(platform, sub_id))
+
+def build_details_view(descriptor, sub_id):
+    """Assemble the details page view model (original row + proposed changes), or None if not found."""
+    platform = descriptor.name
     conn = get_sql_connection()
-    cursor = conn.cursor()
+    try:
+        cursor = conn.cursor()
 
-    # --- Get proposed changes (if any)
-    cursor.execute(
-        "SELECT * FROM proposed_changes WHERE sub_id = ? AND platform = ?",
-        (sub_id, platform)
-    )
-    proposed_row = cursor.fetchone()
-    proposed_dict = row_to_dict(cursor, proposed_row)
+        # --- Get proposed changes (if any)
+        cursor.execute(select_proposed(), (sub_id, platform))
+        proposed_row = cursor.fetchone()
+        proposed_dict = row_to_dict(cursor, proposed_row)
 
-    # --- Always fetch original row
-    cursor.execute(f"SELECT * FROM {table_name} WHERE [{id_column}] = ?", (sub_id,))
-    original_row = cursor.fetchone()
-    original_dict = row_to_dict(cursor, original_row)
-    conn.close()
+        # --- Always fetch original row
+        cursor.execute(select_by_id(platform, 'details'), (sub_id,))
+        original_row = cursor.fetchone()
+        original_dict = row_to_dict(cursor, original_row)
+    finally:
+        conn.close()
 
     if not original_dict:
-        return "Subscription not found", 404
+        return None
 
     sub = {
         'Subscription ID': sub_id,
@@ -200,13 +331,7 @@ def meta_details():
     }
 
     # ========= Non-editable fields =========
-    name_field = {
-        'Azure': 'Subscription Name',
-        'AWS': 'Account Name',
-        'GCP': 'Project Name'
-    }.get(platform)
-
-    sub['Subscription Name'] = original_dict.get(name_field, 'N/A')
+    sub['Subscription Name'] = original_dict.get(descriptor.name_column, 'N/A')
     sub['Cost Center Name (Current)'] = original_dict.get('Cost Center Name', 'N/A')
 
     sub['Cost Center Responsible (Current)'] = str(
@@ -224,35 +349,9 @@ def meta_details():
     sub['Last Review Date'] = original_dict.get('Last Review Date', 'N/A')
 
     # ========= Editable Fields (Proposed vs Current) =========
-    editable_fields = {
-        'I-SC': 'i_sc',
-        'A-SC': 'a_sc',
-        'C-SC': 'c_sc',
-        'Organizational Unit': 'organizational_unit',
-        'Type of Environment': 'environment',
-        'Cost Center': 'cost_center',
-        'IT Owner': 'it_owner',
-        'Person-related': 'person_related'
-    }
-
-    db_field_map = {
-        'i_sc': 'I-SC',
-        'a_sc': 'A-SC',
-        'c_sc': 'C-SC',
-        'organizational_unit': 'Management Group (OE)',
-        'environment': {
-            'Azure': 'Type of Subscription',
-            'AWS': 'Type of Account',
-            'GCP': 'Type of Project'
-        }[platform],
-        'cost_center': 'Cost Center',
-        'it_owner': 'IT Owner',
-        'person_related': 'Personal Related' if platform == 'GCP' else 'Person-related'
-    }
-
-    for label, key in editable_fields.items():
+    for label, key in descriptor.proposed_prefixes.items():
         proposed_key = f"{key}_proposed"
-        original_db_col = db_field_map[key]
+        original_db_col = descriptor.editable_columns[label]
 
         original_value = (original_dict.get(original_db_col) or '').strip()
         proposed_value = (proposed_dict.get(proposed_key) or '').strip() if proposed_dict.get(proposed_key) else ''
@@ -274,29 +373,49 @@ def meta_details():
     # Required for UI display (header)
     sub['Environment'] = sub.get('Type of Environment', 'N/A')
 
-    return render_template('components/metadetails/metaDetails.html', subscription=sub)
+    return sub
+
+@app.route('/components/metadetails')
+def meta_details():
+    sub_id = request.args.get('id')
+    platform = request.args.get('platform')
+
+    if not sub_id or not platform:
+        return "Missing required parameters", 400
+
+    descriptor = get_platform(platform)
+    if descriptor is None:
+        return "Invalid platform", 400
+
+    # Read-through: the write routes invalidate the entry, the TTL bounds anything they miss
+    key = details_cache_key(platform, sub_id)
+    sub = details_cache.get(key)
+    if sub is MISS:
+        sub = build_details_view(descriptor, sub_id)
+        if sub is None:
+            return "Subscription not found", 404
+        details_cache.set(key, sub)
+
+    return render_template('components/metadetails/metaDetails.html', subscription=dict(sub))
 
 @app.route('/get_it_owner_details', methods=['POST'])
 def get_it_owner_details():
     data = request.json
     it_owner_email = data.get('it_owner_email')
 
-    conn = get_sql_connection()
-    cursor = conn.cursor()
-
-    cursor.execute("""
-        SELECT [IT Owner WOM]
-        FROM it_owner_reference
-        WHERE [IT Owner] = ?
-    """, (it_owner_email,))
-
-    row = cursor.fetchone()
-    cursor.close()
-    conn.close()
-
-    it_owner_wom = row[0] if row else ''
+    it_owner_wom = it_owner_index.wom(it_owner_email) or ''
     return jsonify({'it_owner_wom': it_owner_wom})
 
+@app.route('/search_it_owners')
+def search_it_owners():
+    # Typeahead: ?q=<email prefix>&limit=N → owners whose email starts with q, with their WOM
+    prefix = request.args.get('q', '')
+    try:
+        limit = min(max(int(request.args.get('limit', IT_OWNER_TYPEAHEAD_LIMIT)), 1), IT_OWNER_TYPEAHEAD_MAX)
+    except ValueError:
+        return jsonify({'error': 'limit must be an integer'}), 400
+    return jsonify({'results': it_owner_index.search(prefix, limit)})
+
 @app.route('/get_cost_center_details', methods=['POST'])
 def get_cost_center_details():
     data = request.json
@@ -318,6 +437,39 @@ def get_cost_center_details():
     }
     return jsonify(result)
 
+@app.route('/get_cost_center_details_bulk', methods=['POST'])
+def get_cost_center_details_bulk():
+    """
+    Resolve many cost centers at once: {"cost_center_codes": [...], "stream": false}.
+    Small batches return {"results": {...}, "errors": {...}}. Large batches (or
+    "stream": true) return NDJSON: progress lines, then one final result line.
+    """
+    data = request.get_json(silent=True) or {}
+    codes = data.get('cost_center_codes')
+
+    if not isinstance(codes, list) or not codes:
+        return jsonify({'error': 'cost_center_codes must be a non-empty list'}), 400
+    if len(codes) > COST_CENTER_BULK_MAX_CODES:
+        return jsonify({'error': f'At most {COST_CENTER_BULK_MAX_CODES} cost centers per request'}), 400
+    codes = [str(c) for c in codes if c is not None]
+
+    if not data.get('stream') and len(codes) < COST_CENTER_BULK_STREAM_THRESHOLD:
+        return jsonify(fetch_cost_center_details_bulk(codes))
+
+    def generate():
+        total = len(set(filter(None, map(normalize_cost_center, codes))))
+        results, errors = {}, {}
+        for done, (code, record, error) in enumerate(iter_cost_center_details(codes), start=1):
+            if error:
+                errors[code] = error
+            else:
+                results[code] = record
+            if done % COST_CENTER_BULK_PROGRESS_EVERY == 0 or done == total:
+                yield json.dumps({'type': 'progress', 'done': done, 'total': total}) + "\n"
+        yield json.dumps({'type': 'result', 'results': results, 'errors': errors}) + "\n"
+
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+
 @app.route('/components/help')
 def help_support():
     return render_template('components/helpSupport.html')
@@ -334,24 +486,27 @@ def review_page():
     if not user_emails:
         return render_template('Admin/reviewApproval.html', user_email=None, approvals=[])
 
-    conn = get_sql_connection()
-    cursor = conn.cursor()
-
-    # Build dynamic placeholders (?, ?, ? ...)
-    placeholders = ','.join('?' for _ in user_emails)
+    approver_sql, params = owner_email_predicate(user_emails, APPROVER_COLUMNS)
     query = f"""
-        SELECT * 
+        SELECT platform, subscription_id, name, management_group,
+               old_cost_center, old_cost_center_responsible,
+               new_cost_center, new_cost_center_responsible,
+               it_owner, last_review_date, status
         FROM cost_center_approvals
-        WHERE LOWER(new_cost_center_responsible) IN ({placeholders})
+        WHERE {approver_sql}
         ORDER BY last_review_date DESC
     """
-    cursor.execute(query, tuple(user_emails))
-    rows = cursor.fetchall()
+
+    conn = get_sql_connection()
+    try:
+        cursor = conn.cursor()
+        cursor.execute(query, params)
+        rows = rows_to_dicts(cursor, cursor.fetchall())
+    finally:
+        conn.close()
 
     approvals = []
-    columns = [col[0] for col in cursor.description]
-    for row in rows:
-        row_dict = dict(zip(columns, row))
+    for row_dict in rows:
         approvals.append({
             'Platform': row_dict.get('platform', ''),
             'ID': row_dict.get('subscription_id', ''),
@@ -366,14 +521,37 @@ def review_page():
             'Status': row_dict.get('status', '')
         })
 
-    conn.close()
-
     return render_template(
         'Admin/reviewApproval.html',
         user_email=', '.join(user_emails),  # show all possible emails for clarity
         approvals=approvals
     )
 
+@app.route('/db_pool_stats')
+def db_pool_stats():
+    # Connection pool metrics for this worker process
+    return jsonify(get_pool_stats())
+
+@app.route('/cache_stats')
+def cache_stats():
+    # Hit/miss counters of the in-process caches for this worker process
+    return jsonify(get_cache_stats())
+
+@app.route('/metrics')
+def metrics():
+    # Latency histograms and span totals per route for this worker process (Prometheus text format)
+    return Response(route_metrics.render(), mimetype='text/plain; version=0.0.4')
+
+@app.route('/cost_center_replica_stats')
+def cost_center_replica_stats():
+    # Size, last sync times and lookup hit rate of the local cost center replica
+    return jsonify(cost_center_replica.stats())
+
+@app.route('/it_owner_index_stats')
+def it_owner_index_stats():
+    # Size, approximate memory and last refresh duration of the in-memory IT owner index
+    return jsonify(it_owner_index.stats())
+
 @app.route('/notification')
 def trigger_notification():
     return render_template('Admin/notification.html')
@@ -388,131 +566,57 @@ def save_proposed_changes():
     sub_id = data['subscription_id']
     platform = data['platform']
 
-    # Map platform to ID column & table
-    id_column_map = {'Azure': 'Subscription ID', 'AWS': 'Account ID', 'GCP': 'Project ID'}
-    table_map = {'Azure': 'azure_assets', 'AWS': 'aws_assets', 'GCP': 'gcp_assets'}
-
-    column_name = id_column_map.get(platform)
-    table_name = table_map.get(platform)
-    if not column_name:
+    descriptor = get_platform(platform)
+    if descriptor is None:
         return jsonify({"error": "Invalid platform"}), 400
 
     conn = get_sql_connection()
-    cursor = conn.cursor()
+    try:
+        cursor = conn.cursor()
 
-    # Fetch original subscription
-    cursor.execute(f"SELECT * FROM {table_name} WHERE [{column_name}] = ?", (sub_id,))
-    original_row = cursor.fetchone()
-    original_dict = row_to_dict(cursor, original_row)
+        # Fetch original subscription
+        cursor.execute(select_by_id(platform, 'save'), (sub_id,))
+        original_row = cursor.fetchone()
+        original_dict = row_to_dict(cursor, original_row)
 
-    if not original_dict:
-        conn.close()
-        return jsonify({"error": "Subscription not found"}), 404
-
-    # Field mapping
-    field_mapping = {
-        'I-SC': 'I-SC',
-        'A-SC': 'A-SC',
-        'C-SC': 'C-SC',
-        'Organizational Unit': 'Management Group (OE)',
-        'Type of Environment': {
-            'Azure': 'Type of Subscription',
-            'AWS': 'Type of Account',
-            'GCP': 'Type of Project'
-        }.get(platform, ''),
-        'Cost Center': 'Cost Center',
-        'IT Owner': 'IT Owner',
-        'Person-related': 'Person-related' if platform != 'GCP' else 'Personal Related'
-    }
+        if not original_dict:
+            return jsonify({"error": "Subscription not found"}), 404
 
-    proposed = {'sub_id': sub_id, 'platform': platform}
-
-    for label, db_field in field_mapping.items():
-        if not db_field:
-            continue
-
-        matched_key = next((k for k in original_dict if k.strip().lower() == db_field.strip().lower()), None)
-        original_value = (original_dict.get(matched_key) or '').strip() if matched_key else ''
-        new_value = (data.get(label) or '').strip()
-        if new_value in ['"', "'"]:
-            new_value = ''
-
-        # Fix SC suffix issue
-        if platform in ['Azure', 'GCP'] and label in ['I-SC', 'A-SC', 'C-SC'] and new_value:
-            if new_value.startswith("SC"):
-                suffix = new_value[2:]
-                new_value = f"{label}{suffix}"
-
-        proposed[f'{label}_original'] = original_value
-        proposed[f'{label}_proposed'] = new_value
-
-    # Manual fields
-    proposed['cost_center_name_manual'] = (data.get('cc_name') or '').strip()
-    proposed['cost_center_responsible_manual'] = (data.get('cc_responsible') or '').strip()
-    proposed['cost_center_responsible_wom_manual'] = (data.get('cc_responsible_wom') or '').strip()
-
-    # ====================== UPSERT LOGIC FOR SQL SERVER ======================
-    # SQL Server uses MERGE for upsert
-    merge_query = f"""
-        MERGE proposed_changes AS target
-        USING (SELECT ? AS sub_id, ? AS platform) AS source
-        ON target.sub_id = source.sub_id AND target.platform = source.platform
-        WHEN MATCHED THEN 
-            UPDATE SET 
-                i_sc_original = ?, i_sc_proposed = ?,
-                a_sc_original = ?, a_sc_proposed = ?,
-                c_sc_original = ?, c_sc_proposed = ?,
-                organizational_unit_original = ?, organizational_unit_proposed = ?,
-                environment_original = ?, environment_proposed = ?,
-                cost_center_original = ?, cost_center_proposed = ?,
-                it_owner_original = ?, it_owner_proposed = ?,
-                person_related_original = ?, person_related_proposed = ?,
-                cost_center_name_manual = ?, 
-                cost_center_responsible_manual = ?, 
-                cost_center_responsible_wom_manual = ?
-        WHEN NOT MATCHED THEN
-            INSERT (sub_id, platform,
-                    i_sc_original, i_sc_proposed,
-                    a_sc_original, a_sc_proposed,
-                    c_sc_original, c_sc_proposed,
-                    organizational_unit_original, organizational_unit_proposed,
-                    environment_original, environment_proposed,
-                    cost_center_original, cost_center_proposed,
-                    it_owner_original, it_owner_proposed,
-                    person_related_original, person_related_proposed,
-                    cost_center_name_manual,
-                    cost_center_responsible_manual,
-                    cost_center_responsible_wom_manual)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?);
-    """
+        proposed = {'sub_id': sub_id, 'platform': platform}
 
-    params = [
-        proposed['sub_id'], proposed['platform'],
-        proposed.get('I-SC_original'), proposed.get('I-SC_proposed'),
-        proposed.get('A-SC_original'), proposed.get('A-SC_proposed'),
-        proposed.get('C-SC_original'), proposed.get('C-SC_proposed'),
-        proposed.get('Organizational Unit_original'), proposed.get('Organizational Unit_proposed'),
-        proposed.get('Type of Environment_original'), proposed.get('Type of Environment_proposed'),
-        proposed.get('Cost Center_original'), proposed.get('Cost Center_proposed'),
-        proposed.get('IT Owner_original'), proposed.get('IT Owner_proposed'),
-        proposed.get('Person-related_original'), proposed.get('Person-related_proposed'),
-        proposed['cost_center_name_manual'], proposed['cost_center_responsible_manual'], proposed['cost_center_responsible_wom_manual'],
-        # For INSERT
-        proposed['sub_id'], proposed['platform'],
-        proposed.get('I-SC_original'), proposed.get('I-SC_proposed'),
-        proposed.get('A-SC_original'), proposed.get('A-SC_proposed'),
-        proposed.get('C-SC_original'), proposed.get('C-SC_proposed'),
-        proposed.get('Organizational Unit_original'), proposed.get('Organizational Unit_proposed'),
-        proposed.get('Type of Environment_original'), proposed.get('Type of Environment_proposed'),
-        proposed.get('Cost Center_original'), proposed.get('Cost Center_proposed'),
-        proposed.get('IT Owner_original'), proposed.get('IT Owner_proposed'),
-        proposed.get('Person-related_original'), proposed.get('Person-related_proposed'),
-        proposed['cost_center_name_manual'], proposed['cost_center_responsible_manual'], proposed['cost_center_responsible_wom_manual']
-    ]
-
-    cursor.execute(merge_query, params)
-    conn.commit()
-    conn.close()
+        for label, db_field in descriptor.editable_columns.items():
+            # Normalized index lookup (the projection aliases pin the key spelling)
+            original_value = (original_dict.get(descriptor.column(db_field)) or '').strip()
+            new_value = (data.get(label) or '').strip()
+            if new_value in ['"', "'"]:
+                new_value = ''
+
+            # Fix SC suffix issue
+            if platform in ['Azure', 'GCP'] and label in ['I-SC', 'A-SC', 'C-SC'] and new_value:
+                if new_value.startswith("SC"):
+                    suffix = new_value[2:]
+                    new_value = f"{label}{suffix}"
+
+            prefix = descriptor.proposed_prefixes[label]
+            proposed[f'{prefix}_original'] = original_value
+            proposed[f'{prefix}_proposed'] = new_value
+
+        # Manual fields
+        proposed['cost_center_name_manual'] = (data.get('cc_name') or '').strip()
+        proposed['cost_center_responsible_manual'] = (data.get('cc_responsible') or '').strip()
+        proposed['cost_center_responsible_wom_manual'] = (data.get('cc_responsible_wom') or '').strip()
+
+        # Upsert binding each value once; an unchanged row is not rewritten
+        written = upsert_proposed_changes(cursor, [proposed])
+        conn.commit()
+    finally:
+        conn.close()
+
+    if written != 0:
+        invalidate_details(platform, sub_id)
+        invalidate_dashboards(
+            original_dict.get('IT Owner'), original_dict.get('Cost Center Responsible'), *get_logged_in_user()[1]
+        )
 
     return jsonify({"message": "Changes saved successfully"}), 200
 
@@ -525,244 +629,104 @@ def submit_proposed_changes():
     if not sub_id or not platform:
         return jsonify({'error': 'Missing subscription ID or platform'}), 400
 
-    table_map = {
-        'Azure': ('azure_assets', 'Subscription ID'),
-        'AWS': ('aws_assets', 'Account ID'),
-        'GCP': ('gcp_assets', 'Project ID')
-    }
-    if platform not in table_map:
+    descriptor = get_platform(platform)
+    if descriptor is None:
         return jsonify({'error': 'Invalid platform'}), 400
 
-    table_name, id_column = table_map[platform]
+    table_name, id_column = descriptor.table, descriptor.id_column
 
     conn = None
     try:
-        # 1. Establish Azure SQL Connection using your utility
         conn = get_sql_connection()
         cursor = conn.cursor()
 
-        # Fetch original row
-        # NOTE: Using square brackets [] for column names is required for columns with spaces
-        cursor.execute(f"SELECT * FROM {table_name} WHERE [{id_column}] = ?", (sub_id,))
-        original_pyodbc_row = cursor.fetchone()
-
-        if not original_pyodbc_row:
+        # Current row + saved proposed changes (via /save_proposed_changes) in one round trip
+        row = load_rows(cursor, platform, [sub_id]).get(str(sub_id).lower())
+        if row is None:
             return jsonify({'error': 'Subscription not found'}), 404
 
-        # Convert the pyodbc row to a dictionary using your utility function: row_to_dict(cursor, row)
-        original = row_to_dict(cursor, original_pyodbc_row)
-
+        original, proposed = row
         old_it_owner = (original.get('IT Owner') or '').strip()
+        source = 'proposed_changes' if proposed else 'request_data'
 
-        # Load any proposed row (saved earlier via /save_proposed_changes)
-        cursor.execute("SELECT * FROM proposed_changes WHERE sub_id = ? AND platform = ?", (sub_id, platform))
-        proposed_pyodbc_row = cursor.fetchone()
-
-        # Convert the proposed row to a dictionary
-        proposed_row = row_to_dict(cursor, proposed_pyodbc_row)
-
-        update_values = {}
-        source = 'proposed_changes' if proposed_row else 'request_data'
-
-        # Map of proposed_changes -> platform table columns
-        mapping = {
-            'i_sc_proposed': 'I-SC',
-            'a_sc_proposed': 'A-SC',
-            'c_sc_proposed': 'C-SC',
-            'organizational_unit_proposed': 'Management Group (OE)',
-            'environment_proposed': {
-                'Azure': 'Type of Subscription',
-                'AWS': 'Type of Account',
-                'GCP': 'Type of Project'
-            }[platform],
-            'person_related_proposed': 'Personal Related' if platform == 'GCP' else 'Person-related',
-            'it_owner_proposed': 'IT Owner'
-        }
-
-        it_owner_updated = False
-        cost_center_changed = False
-        new_it_owner = None
-        new_cost_center = None
-        new_cost_center_responsible = None
-        new_cost_center_responsible_wom = None
-        new_cost_center_name = None
-
-        # Collect updated values from proposed_changes
-        if proposed_row:
-            proposed = proposed_row
-            for key, db_col in mapping.items():
-                val = (proposed.get(key) or '').strip()
-                if val and val not in ['"', "'"]:
-                    # Normalize SC labels for Azure/GCP
-                    if platform in ['Azure', 'GCP']:
-                        if key.startswith('i_sc') and not val.startswith('I-'):
-                            val = f"I-{val}"
-                        elif key.startswith('a_sc') and not val.startswith('A-'):
-                            val = f"A-{val}"
-                        elif key.startswith('c_sc') and not val.startswith('C-'):
-                            val = f"C-{val}"
-                    update_values[db_col] = val
-                    if db_col == 'IT Owner' and val != old_it_owner:
-                        it_owner_updated = True
-                        new_it_owner = val
-
-            # Cost Center change → fetch details via API (fetch_cost_center_details is external)
-            cost_center_new = (proposed.get('cost_center_proposed') or '').strip()
-
-            if cost_center_new and cost_center_new not in ['"', "'"] and cost_center_new != (original.get('Cost Center') or '').strip():
-                cost_center_changed = True
-                new_cost_center = cost_center_new
-
-            cc_data = fetch_cost_center_details(cost_center_new)
-            if cc_data:
-                if cc_data.get("Responsible"):
-                    new_cost_center_responsible = f"{cc_data['Responsible'].lower()}@bosch.com"
-                new_cost_center_responsible_wom = cc_data.get("cost_center_responsible_wom")
-                # Build Cost Center Name from API parts
-                name4 = cc_data.get("Name4", "").strip()
-                name3 = cc_data.get("Name3", "").strip()
-                department = cc_data.get("Department", "").strip()
-                new_cost_center_name = f"{name4} {name3}".strip()
-                if department:
-                    new_cost_center_name = f"{new_cost_center_name} ({department})"
-                update_values['Cost Center'] = cost_center_new
-                update_values['Cost Center Responsible'] = new_cost_center_responsible
-                update_values['Cost Center Responsible WOM'] = new_cost_center_responsible_wom
-                update_values['Cost Center Name'] = new_cost_center_name
-            else:
-                # Fallback to manual fields if available
-                manual_responsible = (proposed.get('cost_center_responsible_manual') or '').strip()
-                manual_wom = (proposed.get('cost_center_responsible_wom_manual') or '').strip()
-                manual_name = (proposed.get('cost_center_name_manual') or '').strip()
+        plan = plan_submission(descriptor, original, proposed)
+        update_values = dict(plan['updates'])
+        new_it_owner = plan['new_it_owner']
+        new_cost_center = plan['new_cost_center']
 
-                if manual_responsible and manual_wom:
-                    new_cost_center_responsible = manual_responsible
-                    new_cost_center_responsible_wom = manual_wom
-                    new_cost_center_name = manual_name
+        # If IT Owner changed, try to enrich WOM
+        if new_it_owner:
+            woms = it_owner_index.woms([new_it_owner])
+            if new_it_owner.lower() in woms:
+                update_values['IT Owner WOM'] = woms[new_it_owner.lower()]
 
-                    update_values['Cost Center'] = cost_center_new
-                    update_values['Cost Center Responsible'] = new_cost_center_responsible
-                    update_values['Cost Center Responsible WOM'] = new_cost_center_responsible_wom
-                    update_values['Cost Center Name'] = new_cost_center_name
+        # Hand the connection back before calling out to the cost center API
+        conn.close()
+        conn = None
+
+        # Cost Center change → enrich via the API, only when it actually changed
+        new_cost_center_responsible = new_cost_center_name = None
+        approval = None
+        enrichment = None
+        if new_cost_center:
+            if COST_CENTER_ENRICH_ASYNC:
+                # Queue the approval row now; responsible/name are filled in the background
+                enrichment = 'queued'
+            else:
+                try:
+                    cc_data = fetch_cost_center_details_within(new_cost_center, COST_CENTER_ENRICH_DEADLINE)
+                except EnrichmentBusyError as e:
+                    # Earlier lookups are stuck on a slow API; queue like async mode instead of waiting
+                    print(f"⚠️ {e}; enriching {new_cost_center} in the background")
+                    enrichment = 'queued'
+                except FutureTimeoutError:
+                    print(f"⚠️ Cost center lookup for {new_cost_center} exceeded {COST_CENTER_ENRICH_DEADLINE}s")
+                    cc_data = None
+                    enrichment = 'timed_out'
+                if enrichment != 'queued':
+                    fields = cost_center_approval_fields(cc_data, proposed)
+                    if fields and fields[0]:
+                        new_cost_center_responsible, _, new_cost_center_name = fields
+            if enrichment == 'queued' or new_cost_center_responsible:
+                approval = approval_row(descriptor, sub_id, original, update_values, new_cost_center,
+                                        new_cost_center_responsible, new_cost_center_name)
 
-        # If IT Owner changed, try to enrich WOM
-        if it_owner_updated and new_it_owner:
-            cursor.execute("""
-                SELECT [IT Owner WOM]
-                FROM it_owner_reference
-                WHERE [IT Owner] = ?
-            """, (new_it_owner,))
-            result = cursor.fetchone() # result is a tuple (value,)
-            if result:
-                update_values['IT Owner WOM'] = result[0]
-
-        # Remove cost center fields from update_values (approval gate)
-        for k in ['Cost Center', 'Cost Center Responsible', 'Cost Center Responsible WOM', 'Cost Center Name']:
-            update_values.pop(k, None)
-
-        # Update other editable fields directly on the main table
-        if update_values:
-            # Build SET clause with parameterized column names (using [])
-            set_clause = ", ".join([f"[{col}] = ?" for col in update_values])
-            values = list(update_values.values()) + [sub_id]
-            cursor.execute(f"""
-                UPDATE {table_name}
-                SET {set_clause}
-                WHERE [{id_column}] = ?
-            """, values)
-
-        # Always update Last Review Date
+        conn = get_sql_connection()
+        cursor = conn.cursor()
+
+        # One UPDATE: non-gated fields + Last Review Date (cost center fields wait for approval)
         today_str = datetime.today().strftime('%Y-%m-%d')
-        cursor.execute(f"UPDATE {table_name} SET [Last Review Date] = ? WHERE [{id_column}] = ?", (today_str, sub_id))
-
-        # Snapshot for email/details (reflects updated non-gated fields)
-        snapshot = original.copy()
-        snapshot.update(update_values)
-
-        # Upsert into cost_center_approvals when CC changed
-        if cost_center_changed and new_cost_center and new_cost_center_responsible:
-            # Check for existing pending record
-            cursor.execute("""
-                SELECT id FROM cost_center_approvals
-                WHERE subscription_id = ? AND status = 'Pending'
-            """, (sub_id,))
-            existing_pyodbc_row = cursor.fetchone()
-            existing_id = existing_pyodbc_row[0] if existing_pyodbc_row else None
-
-            # Normalize subscription/account/project name
-            subscription_name_field = {
-                'Azure': 'Subscription Name',
-                'AWS': 'Account Name',
-                'GCP': 'Project Name'
-            }[platform]
-            subscription_name = original.get(subscription_name_field, sub_id)
-
-            if existing_id:
-                # UPDATE logic
-                cursor.execute("""
-                    UPDATE cost_center_approvals
-                    SET platform = ?, name = ?, management_group = ?,
-                        old_cost_center = ?, old_cost_center_responsible = ?,
-                        new_cost_center = ?, new_cost_center_responsible = ?, new_cost_center_name = ?,
-                        it_owner = ?, last_review_date = ?
-                    WHERE id = ?
-                """, (
-                    platform,
-                    subscription_name,
-                    snapshot.get('Management Group (OE)'),
-                    original.get('Cost Center'),
-                    original.get('Cost Center Responsible'),
-                    new_cost_center,
-                    new_cost_center_responsible,
-                    new_cost_center_name,
-                    snapshot.get('IT Owner'),
-                    today_str,
-                    existing_id
-                ))
-            else:
-                # INSERT logic
-                cursor.execute("""
-                    INSERT INTO cost_center_approvals (
-                        platform, subscription_id, name, management_group,
-                        old_cost_center, old_cost_center_responsible,
-                        new_cost_center, new_cost_center_responsible, new_cost_center_name,
-                        it_owner, last_review_date, status
-                    )
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                """, (
-                    platform,
-                    sub_id,
-                    subscription_name,
-                    snapshot.get('Management Group (OE)'),
-                    original.get('Cost Center'),
-                    original.get('Cost Center Responsible'),
-                    new_cost_center,
-                    new_cost_center_responsible,
-                    new_cost_center_name,
-                    snapshot.get('IT Owner'),
-                    today_str,
-                    'Pending'
-                ))
+        set_values = {**update_values, 'Last Review Date': today_str}
+        set_clause = ", ".join(f"[{col}] = ?" for col in set_values)
+        cursor.execute(f"""
+            UPDATE [{table_name}]
+            SET {set_clause}
+            WHERE [{id_column}] = ?
+        """, list(set_values.values()) + [sub_id])
+
+        # Upsert the pending cost_center_approvals row when CC changed
+        if approval:
+            upsert_approvals(cursor, [approval], today_str)
 
         # Only clear proposed_changes if CC didn't change
-        if not cost_center_changed:
+        if not new_cost_center:
             cursor.execute("DELETE FROM proposed_changes WHERE sub_id = ? AND platform = ?", (sub_id, platform))
 
         # Commit all changes to Azure SQL Server
         conn.commit()
+        owners = (old_it_owner, original.get('Cost Center Responsible'), new_it_owner)
+        invalidate_details(platform, sub_id)
+        invalidate_dashboards(*owners, *get_logged_in_user()[1])
 
-        # Pull final row for email/snapshot
-        cursor.execute(f"SELECT * FROM {table_name} WHERE [{id_column}] = ?", (sub_id,))
-        final_pyodbc_row = cursor.fetchone()
-
-        # Convert the final pyodbc row to a dictionary
-        final_row = row_to_dict(cursor, final_pyodbc_row)
+        if enrichment == 'queued':
+            if not submit_enrichment(enrich_in_background, platform, sub_id, new_cost_center, proposed, owners):
+                print(f"⚠️ Enrichment queue full; {platform}/{sub_id} waits for the next sweep")
 
         # # --- Email drafts (using win32com and pythoncom) ---
         # # NOTE: This section remains unchanged as it doesn't involve the database.
 
         # # IT Owner change draft
-        # if it_owner_updated and new_it_owner:
+        # if new_it_owner:
         #     pythoncom.CoInitialize()
         #     try:
         #         subscription_name_field = {
@@ -774,7 +738,7 @@ def submit_proposed_changes():
         #         cost_center_resp_email = original.get('Cost Center Responsible', '')
 
         #         details_html = "<table border='1' style='border-collapse: collapse;'>"
-        #         for k, v in final_row.items():
+        #         for k, v in snapshot.items():
         #             if isinstance(v, float) and v.is_integer():
         #                 v = int(v)
         #             details_html += f"<tr><td><b>{k}</b></td><td>{v}</td></tr>"
@@ -803,7 +767,7 @@ def submit_proposed_changes():
         #         pythoncom.CoUninitialize()
 
         # # Cost Center approval draft
-        # if cost_center_changed and new_cost_center_responsible:
+        # if approval:
         #     pythoncom.CoInitialize()
         #     try:
         #         subscription_name_field = {
@@ -811,10 +775,10 @@ def submit_proposed_changes():
         #             'AWS': 'Account Name',
         #             'GCP': 'Project Name'
         #         }[platform]
-        #         name_value = final_row.get(subscription_name_field, sub_id)
+        #         name_value = snapshot.get(subscription_name_field, sub_id)
 
         #         details_html = "<table border='1' style='border-collapse: collapse;'>"
-        #         for k, v in final_row.items():
+        #         for k, v in snapshot.items():
         #             if isinstance(v, float) and v.is_integer():
         #                 v = int(v)
         #             details_html += f"<tr><td><b>{k}</b></td><td>{v}</td></tr>"
@@ -848,7 +812,10 @@ def submit_proposed_changes():
         #     finally:
         #         pythoncom.CoUninitialize()
 
-        return jsonify({'message': f"Submitted successfully using {source}"}), 200
+        response = {'message': f"Submitted successfully using {source}"}
+        if enrichment:
+            response['cost_center_enrichment'] = enrichment
+        return jsonify(response), 200
 
     except pyodbc.Error as ex:
         # Log the error for debugging
@@ -859,6 +826,30 @@ def submit_proposed_changes():
         # Ensure the connection is always closed
         if conn:
             conn.close()
+@app.route('/submit_proposed_changes_bulk', methods=['POST'])
+def submit_proposed_changes_bulk():
+    """
+    Review-submit many subscriptions in one transaction:
+    {"items": [{"subscription_id": ..., "platform": ...}, ...]}.
+    Stamps Last Review Date, applies saved proposed changes and routes cost center
+    changes to approval. Returns per-item results in input order plus a summary.
+    """
+    data = request.get_json(silent=True) or {}
+    try:
+        results, touched = submit_reviews(data.get('items'))
+    except ReviewBatchError as e:
+        return jsonify({'error': str(e)}), 400
+    except pyodbc.Error as ex:
+        print(f"Azure SQL Error: {ex}")
+        return jsonify({'error': 'Database error occurred; no changes were submitted'}), 500
+
+    invalidate_touched(touched)
+
+    summary = {}
+    for result in results:
+        summary[result['status']] = summary.get(result['status'], 0) + 1
+    return jsonify({'results': results, 'summary': summary}), 200
+
 @app.route('/handle_approval', methods=['POST'])
 def handle_approval():
     data = request.get_json()
@@ -869,73 +860,41 @@ def handle_approval():
     if not sub_id or not platform or action not in ['approve', 'reject']:
         return jsonify({'error': 'Invalid request'}), 400
 
-    table_map = {
-        'Azure': ('azure_assets', 'Subscription ID'),
-        'AWS': ('aws_assets', 'Account ID'),
-        'GCP': ('gcp_assets', 'Project ID')
-    }
-
-    if platform not in table_map:
+    if get_platform(platform) is None:
         return jsonify({'error': 'Invalid platform'}), 400
 
-    table_name, id_column = table_map[platform]
-
-    conn = get_sql_connection()
-    cursor = conn.cursor()
-
-    # Fetch pending cost center approval
-    cursor.execute("""
-        SELECT new_cost_center, new_cost_center_responsible, new_cost_center_name
-        FROM cost_center_approvals
-        WHERE subscription_id = ? AND platform = ? AND status = 'Pending'
-    """, (sub_id, platform))
-    row = cursor.fetchone()
+    # Same transactional path as the bulk endpoint, with a batch of one
+    results, touched = apply_approval_decisions(
+        [{'subscription_id': sub_id, 'platform': platform, 'action': action}]
+    )
+    invalidate_touched(touched)
 
-    if not row:
-        conn.close()
+    if results[0]['status'] == 'not_found':
         return jsonify({'error': 'No pending request found'}), 404
+    return jsonify({'message': f"Request {action}ed successfully."}), 200
 
-    new_cc, new_cc_responsible, new_cc_name = row
-
-    # Fetch WOM from proposed_changes (already saved during submit/save)
-    cursor.execute("""
-        SELECT cost_center_responsible_wom_manual
-        FROM proposed_changes
-        WHERE sub_id = ? AND platform = ?
-    """, (sub_id, platform))
-    wom_row = cursor.fetchone()
-    new_cc_wom = wom_row[0] if wom_row else None
-
-    today_str = datetime.today().strftime('%Y-%m-%d')
+@app.route('/handle_approval_bulk', methods=['POST'])
+def handle_approval_bulk():
+    """
+    Approve/reject many pending cost center changes in one transaction:
+    {"items": [{"subscription_id": ..., "platform": ..., "action": "approve"|"reject"}, ...]}.
+    Returns per-item results in input order plus a summary.
+    """
+    data = request.get_json(silent=True) or {}
+    try:
+        results, touched = apply_approval_decisions(data.get('items'))
+    except ApprovalBatchError as e:
+        return jsonify({'error': str(e)}), 400
+    except pyodbc.Error as ex:
+        print(f"Azure SQL Error: {ex}")
+        return jsonify({'error': 'Database error occurred; no decisions were applied'}), 500
 
-    # If approved → update main table
-    if action == 'approve':
-        cursor.execute(f"""
-            UPDATE {table_name}
-            SET [Cost Center] = ?, 
-                [Cost Center Responsible] = ?, 
-                [Cost Center Responsible WOM] = ?,
-                [Cost Center Name] = ?,  
-                [Last Review Date] = ?
-            WHERE [{id_column}] = ?
-        """, (new_cc, new_cc_responsible, new_cc_wom, new_cc_name, today_str, sub_id))
-    # Update approval status
-    final_status = 'Approved' if action == 'approve' else 'Rejected'
-    cursor.execute("""
-        UPDATE cost_center_approvals
-        SET status = ?, last_review_date = ?
-        WHERE subscription_id = ? AND platform = ? AND status = 'Pending'
-    """, (final_status, today_str, sub_id, platform))
-
-    # Remove any saved proposed changes now that the approval decision is made
-    cursor.execute("""
-        DELETE FROM proposed_changes WHERE sub_id = ? AND platform = ?
-    """, (sub_id, platform))
-
-    conn.commit()
-    conn.close()
+    invalidate_touched(touched)
 
-    return jsonify({'message': f"Request {action}ed successfully."}), 200
+    summary = {}
+    for result in results:
+        summary[result['status']] = summary.get(result['status'], 0) + 1
+    return jsonify({'results': results, 'summary': summary}), 200
 
 if __name__ == '__main__':
     app.run(debug=True)
@@ -0,0 +1,146 @@
+import os
+from datetime import datetime
+from dotenv import load_dotenv
+from schema import PLATFORMS
+from status import get_sql_connection, values_clause
+
+# ---------- LOAD ENV ----------
+load_dotenv()
+
+# Decisions per request. Each VALUES row binds up to 4 parameters and SQL Server
+# allows 2100 per statement, so keep this well below 500.
+APPROVAL_BATCH_MAX = int(os.getenv("APPROVAL_BATCH_MAX", "200"))
+
+ACTIONS = {'approve': 'Approved', 'reject': 'Rejected'}
+
+
+class ApprovalBatchError(ValueError):
+    """The batch as a whole is malformed (not a list, empty, too large)."""
+
+
+def _validate(items):
+    """
+    Split a decision list into accepted (idx, sub_id, platform, action) tuples and
+    per-item results for everything rejected up front (invalid or duplicate).
+    """
+    if not isinstance(items, list) or not items:
+        raise ApprovalBatchError("items must be a non-empty list")
+    if len(items) > APPROVAL_BATCH_MAX:
+        raise ApprovalBatchError(f"At most {APPROVAL_BATCH_MAX} decisions per request")
+
+    accepted, results, seen = [], [None] * len(items), set()
+    for idx, item in enumerate(items):
+        item = item if isinstance(item, dict) else {}
+        sub_id = str(item.get('subscription_id') or '').strip()
+        platform = item.get('platform')
+        action = item.get('action')
+        result = {'subscription_id': sub_id, 'platform': platform, 'action': action}
+        results[idx] = result
+
+        if not sub_id or platform not in PLATFORMS or action not in ACTIONS:
+            result.update(status='invalid', error='Invalid request')
+        elif (sub_id, platform) in seen:
+            result.update(status='duplicate', error='Subscription listed more than once')
+        else:
+            seen.add((sub_id, platform))
+            accepted.append((idx, sub_id, platform, action))
+    return accepted, results
+
+
+def apply_approval_decisions(items):
+    """
+    Approve/reject many pending cost center changes in one transaction.
+
+    items: [{'subscription_id', 'platform', 'action': 'approve'|'reject'}, ...]
+    Returns (results, touched):
+      results - one dict per input item, in order, with 'status' one of
+                'approved', 'rejected', 'not_found', 'invalid', 'duplicate'
+      touched - [(platform, sub_id, owner emails)] for cache invalidation
+
+    A constant number of statements runs per batch (lookup, one asset UPDATE per
+    platform, approvals UPDATE, proposed_changes DELETE), independent of its size.
+    Any database error rolls the whole batch back.
+    """
+    accepted, results = _validate(items)
+    if not accepted:
+        return results, []
+
+    today_str = datetime.today().strftime('%Y-%m-%d')
+    conn = get_sql_connection()
+    try:
+        cursor = conn.cursor()
+
+        # 1. Which decisions have a pending request (and who is affected)
+        values_sql, params = values_clause(accepted)
+        cursor.execute(f"""
+            SELECT v.idx, c.new_cost_center_responsible, c.old_cost_center_responsible, c.it_owner
+            FROM {values_sql} AS v(idx, sub_id, platform, action)
+            JOIN cost_center_approvals c
+              ON c.subscription_id = v.sub_id AND c.platform = v.platform AND c.status = 'Pending'
+        """, params)
+        owners = {}
+        for idx, *emails in cursor.fetchall():
+            owners.setdefault(idx, set()).update(e for e in emails if e)
+
+        pending = [row for row in accepted if row[0] in owners]
+        for idx, sub_id, platform, action in accepted:
+            if idx not in owners:
+                results[idx].update(status='not_found', error='No pending request found')
+        if not pending:
+            return results, []
+
+        # 2. Approved → copy the new cost center onto each platform's asset table. Should a
+        #    subscription have several Pending rows, the latest request (highest id) wins.
+        for platform, descriptor in PLATFORMS.items():
+            approved = [(sub_id,) for _, sub_id, p, action in pending if p == platform and action == 'approve']
+            if not approved:
+                continue
+            values_sql, params = values_clause(approved)
+            cursor.execute(f"""
+                UPDATE a
+                SET [Cost Center] = c.new_cost_center,
+                    [Cost Center Responsible] = c.new_cost_center_responsible,
+                    [Cost Center Responsible WOM] = p.cost_center_responsible_wom_manual,
+                    [Cost Center Name] = c.new_cost_center_name,
+                    [Last Review Date] = ?
+                FROM [{descriptor.table}] a
+                JOIN {values_sql} AS v(sub_id) ON a.[{descriptor.id_column}] = v.sub_id
+                JOIN (
+                    SELECT subscription_id, new_cost_center, new_cost_center_responsible, new_cost_center_name,
+                           ROW_NUMBER() OVER (PARTITION BY subscription_id ORDER BY id DESC) AS rn
+                    FROM cost_center_approvals
+                    WHERE platform = ? AND status = 'Pending'
+                ) c ON c.subscription_id = v.sub_id AND c.rn = 1
+                LEFT JOIN proposed_changes p ON p.sub_id = v.sub_id AND p.platform = ?
+            """, [today_str] + params + [platform, platform])
+
+        # 3. Close the approval requests
+        decisions = [(sub_id, platform, ACTIONS[action]) for _, sub_id, platform, action in pending]
+        values_sql, params = values_clause(decisions)
+        cursor.execute(f"""
+            UPDATE c
+            SET status = v.final_status, last_review_date = ?
+            FROM cost_center_approvals c
+            JOIN {values_sql} AS v(sub_id, platform, final_status)
+              ON c.subscription_id = v.sub_id AND c.platform = v.platform
+            WHERE c.status = 'Pending'
+        """, [today_str] + params)
+
+        # 4. Saved proposed changes are done with once a decision is made
+        values_sql, params = values_clause([(sub_id, platform) for _, sub_id, platform, _ in pending])
+        cursor.execute(f"""
+            DELETE p
+            FROM proposed_changes p
+            JOIN {values_sql} AS v(sub_id, platform) ON p.sub_id = v.sub_id AND p.platform = v.platform
+        """, params)
+
+        conn.commit()
+        cursor.close()
+    finally:
+        conn.close()
+
+    touched = []
+    for idx, sub_id, platform, action in pending:
+        results[idx]['status'] = 'approved' if action == 'approve' else 'rejected'
+        touched.append((platform, sub_id, owners[idx]))
+    return results, touched
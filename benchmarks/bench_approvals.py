@@ -0,0 +1,138 @@
+"""
+Benchmark: batch approve/reject (approvals.apply_approval_decisions) vs. looping
+the previous single-item /handle_approval statements, at several batch sizes.
+
+Seeds synthetic pending requests (IDs prefixed BENCH-APPROVAL-) into the database
+configured in .env, decides them, and deletes everything it created afterwards.
+Run it against a development database only:
+
+    python -m benchmarks.bench_approvals [10 50 200]
+"""
+import os
+import sys
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from approvals import apply_approval_decisions, APPROVAL_BATCH_MAX  # noqa: E402
+from schema import PLATFORMS  # noqa: E402
+from status import get_sql_connection, start_db_call_tracking  # noqa: E402
+
+PREFIX = 'BENCH-APPROVAL-'
+DEFAULT_SIZES = [10, 50, 200]
+
+
+def seed(items):
+    conn = get_sql_connection()
+    try:
+        cursor = conn.cursor()
+        for item in items:
+            descriptor = PLATFORMS[item['platform']]
+            sub_id = item['subscription_id']
+            cursor.execute(f"INSERT INTO [{descriptor.table}] ([{descriptor.id_column}], [Cost Center]) VALUES (?, ?)",
+                           (sub_id, 'OLD001'))
+            cursor.execute("""
+                INSERT INTO cost_center_approvals (
+                    platform, subscription_id, name, old_cost_center, new_cost_center,
+                    new_cost_center_responsible, new_cost_center_name, status
+                ) VALUES (?, ?, ?, 'OLD001', 'NEW001', 'bench.responsible@bosch.com', 'Bench', 'Pending')
+            """, (item['platform'], sub_id, sub_id))
+            cursor.execute("""
+                INSERT INTO proposed_changes (sub_id, platform, cost_center_proposed, cost_center_responsible_wom_manual)
+                VALUES (?, ?, 'NEW001', 'WOM')
+            """, (sub_id, item['platform']))
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def cleanup():
+    conn = get_sql_connection()
+    try:
+        cursor = conn.cursor()
+        pattern = PREFIX + '%'
+        for descriptor in PLATFORMS.values():
+            cursor.execute(f"DELETE FROM [{descriptor.table}] WHERE [{descriptor.id_column}] LIKE ?", (pattern,))
+        cursor.execute("DELETE FROM cost_center_approvals WHERE subscription_id LIKE ?", (pattern,))
+        cursor.execute("DELETE FROM proposed_changes WHERE sub_id LIKE ?", (pattern,))
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def legacy_single(sub_id, platform, action):
+    """The statements /handle_approval ran per item before batching (one connection + commit each)."""
+    descriptor = PLATFORMS[platform]
+    conn = get_sql_connection()
+    try:
+        cursor = conn.cursor()
+        cursor.execute("""
+            SELECT new_cost_center, new_cost_center_responsible, new_cost_center_name
+            FROM cost_center_approvals
+            WHERE subscription_id = ? AND platform = ? AND status = 'Pending'
+        """, (sub_id, platform))
+        row = cursor.fetchone()
+        if not row:
+            return
+        new_cc, new_cc_responsible, new_cc_name = row
+        cursor.execute("""
+            SELECT cost_center_responsible_wom_manual FROM proposed_changes WHERE sub_id = ? AND platform = ?
+        """, (sub_id, platform))
+        wom_row = cursor.fetchone()
+        today_str = datetime.today().strftime('%Y-%m-%d')
+        if action == 'approve':
+            cursor.execute(f"""
+                UPDATE {descriptor.table}
+                SET [Cost Center] = ?, [Cost Center Responsible] = ?, [Cost Center Responsible WOM] = ?,
+                    [Cost Center Name] = ?, [Last Review Date] = ?
+                WHERE [{descriptor.id_column}] = ?
+            """, (new_cc, new_cc_responsible, wom_row[0] if wom_row else None, new_cc_name, today_str, sub_id))
+        cursor.execute("""
+            UPDATE cost_center_approvals SET status = ?, last_review_date = ?
+            WHERE subscription_id = ? AND platform = ? AND status = 'Pending'
+        """, ('Approved' if action == 'approve' else 'Rejected', today_str, sub_id, platform))
+        cursor.execute("DELETE FROM proposed_changes WHERE sub_id = ? AND platform = ?", (sub_id, platform))
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def make_items(size, run):
+    platforms = list(PLATFORMS)
+    return [
+        {
+            'subscription_id': f"{PREFIX}{run}-{i:05d}",
+            'platform': platforms[i % len(platforms)],
+            'action': 'approve' if i % 4 else 'reject'
+        }
+        for i in range(size)
+    ]
+
+
+def measure(label, size, run, decide):
+    items = make_items(size, run)
+    seed(items)
+    counter = start_db_call_tracking()
+    start = time.perf_counter()
+    decide(items)
+    elapsed = (time.perf_counter() - start) * 1000
+    print(f"{size:>6} {label:<8} {elapsed:>10.1f} ms {counter.connections:>6} conns {counter.queries:>6} queries")
+
+
+def main(sizes):
+    print(f"{'items':>6} {'path':<8} {'wall':>13} {'':>12} {'':>14}")
+    try:
+        for size in sizes:
+            if size > APPROVAL_BATCH_MAX:
+                print(f"skipping {size}: above APPROVAL_BATCH_MAX={APPROVAL_BATCH_MAX}")
+                continue
+            measure('looped', size, f"L{size}",
+                    lambda items: [legacy_single(i['subscription_id'], i['platform'], i['action']) for i in items])
+            measure('batch', size, f"B{size}", apply_approval_decisions)
+    finally:
+        cleanup()
+
+
+if __name__ == "__main__":
+    main([int(n) for n in sys.argv[1:]] or DEFAULT_SIZES)
@@ -0,0 +1,63 @@
+"""
+Micro-benchmark: streaming cost center feed parser vs. the previous
+ET.fromstring(response.text) implementation, on the feeds in fixtures/.
+
+    python -m benchmarks.bench_cost_center_parser
+"""
+import os
+import sys
+import timeit
+import xml.etree.ElementTree as ET
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utility import parse_cost_center_feed, REQUIRED_FIELDS  # noqa: E402
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+CHUNK_SIZE = 8192
+REPEAT = 5
+
+
+def legacy_parse(body):
+    """The parser fetch_cost_center_details used before (decode → full tree → findall)."""
+    ns = {
+        "atom": "http://www.w3.org/2005/Atom",
+        "d": "http://schemas.microsoft.com/ado/2007/08/dataservices",
+        "m": "http://schemas.microsoft.com/ado/2007/08/dataservices/metadata"
+    }
+    root = ET.fromstring(body.decode("utf-8"))
+    required_fields = ["CostCenter", "Name3", "Name4", "Responsible", "Department", "ResponsibleOrgOffice"]
+    result = []
+    for entry in root.findall("atom:entry", ns):
+        props = entry.find("atom:content/m:properties", ns)
+        if props is not None:
+            record = {child.tag.split("}")[-1]: child.text for child in props if child.tag.split("}")[-1] in required_fields}
+            result.append(record)
+    return result[0] if result else None
+
+
+def streaming_parse(body):
+    chunks = (body[i:i + CHUNK_SIZE] for i in range(0, len(body), CHUNK_SIZE))
+    return parse_cost_center_feed(chunks)
+
+
+def main():
+    print(f"{'fixture':<36}{'bytes':>9}{'legacy µs':>12}{'stream µs':>12}{'speedup':>9}")
+    for name in sorted(os.listdir(FIXTURES_DIR)):
+        if not name.startswith("costcenter_"):
+            continue
+        with open(os.path.join(FIXTURES_DIR, name), "rb") as f:
+            body = f.read()
+
+        assert legacy_parse(body) == streaming_parse(body), f"parsers disagree on {name}"
+
+        number = max(1, 200000 // max(len(body), 1))
+        legacy = min(timeit.repeat(lambda: legacy_parse(body), number=number, repeat=REPEAT)) / number
+        stream = min(timeit.repeat(lambda: streaming_parse(body), number=number, repeat=REPEAT)) / number
+        print(f"{name:<36}{len(body):>9}{legacy * 1e6:>12.1f}{stream * 1e6:>12.1f}{legacy / stream:>8.1f}x")
+
+    print(f"\nfields kept per record: {', '.join(REQUIRED_FIELDS)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""
+Benchmark: memory and refresh time of the in-memory IT owner index (owners.py),
+plus exact-lookup and typeahead latency, for a synthetic it_owner_reference.
+
+    python -m benchmarks.bench_it_owner_index [100000 ...]
+    python -m benchmarks.bench_it_owner_index --db    # the real table from .env
+"""
+import os
+import random
+import statistics
+import string
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from owners import ITOwnerIndex, load_it_owner_reference  # noqa: E402
+
+DEFAULT_SIZES = [10_000, 100_000]
+LOOKUPS = 10_000
+SEARCHES = 1_000
+
+
+def synthetic_rows(size, seed=42):
+    rng = random.Random(seed)
+    rows = []
+    for i in range(size):
+        first = ''.join(rng.choices(string.ascii_lowercase, k=rng.randint(3, 9)))
+        last = ''.join(rng.choices(string.ascii_lowercase, k=rng.randint(4, 12)))
+        rows.append((f"{first.title()}.{last.title()}{i}@bosch.com", f"WOM{rng.randint(0, 99999):05d}"))
+    return rows
+
+
+def per_call_us(fn, args):
+    start = time.perf_counter()
+    for arg in args:
+        fn(arg)
+    return (time.perf_counter() - start) / len(args) * 1e6
+
+
+def measure(label, load):
+    rows = load()
+    index = ITOwnerIndex(lambda: rows)
+
+    tracemalloc.start()
+    index.refresh()
+    _, peak = tracemalloc.get_traced_memory()
+    current = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    refresh_times = []
+    for _ in range(3):
+        index.refresh()
+        refresh_times.append(index.refresh_seconds * 1000)
+
+    emails = [email for email, _ in rows]
+    rng = random.Random(7)
+    hits = rng.choices(emails, k=LOOKUPS)
+    prefixes = [e[:rng.randint(3, 6)].lower() for e in rng.choices(emails, k=SEARCHES)]
+
+    print(f"{label:>10} rows={index.stats()['rows']:>7} "
+          f"refresh={statistics.median(refresh_times):8.1f} ms "
+          f"retained={current / 2**20:6.1f} MiB (peak {peak / 2**20:6.1f}) "
+          f"approx_bytes={index.stats()['approx_bytes'] / 2**20:6.1f} MiB "
+          f"lookup={per_call_us(index.wom, hits):5.2f} us "
+          f"typeahead={per_call_us(index.search, prefixes):6.1f} us")
+
+
+def main(argv):
+    if '--db' in argv:
+        measure('db', load_it_owner_reference)
+        return
+    for size in [int(n) for n in argv] or DEFAULT_SIZES:
+        rows = synthetic_rows(size)
+        measure(f"{size}", lambda: rows)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,85 @@
+"""
+Before/after benchmark for the owner-email lookups (migrations/001_owner_email_lookup.sql).
+
+For every asset table (and cost_center_approvals) it compares the legacy
+LOWER(column) IN (...) filter with the indexed LC-column filter:
+  - the estimated plan's access operators (Index Seek vs. Scan), via SHOWPLAN_XML
+  - wall-clock latency over a few runs
+
+Runs against the database configured in .env (DB_SERVER, DB_DATABASE, ...):
+
+    python -m benchmarks.bench_owner_lookup someone@bosch.com [other@bosch.com ...]
+"""
+import os
+import re
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from status import get_sql_connection, ASSET_OWNER_COLUMNS, APPROVER_COLUMNS  # noqa: E402
+
+RUNS = 10
+TABLES = [
+    ('azure_assets', ASSET_OWNER_COLUMNS),
+    ('aws_assets', ASSET_OWNER_COLUMNS),
+    ('gcp_assets', ASSET_OWNER_COLUMNS),
+    ('cost_center_approvals', APPROVER_COLUMNS),
+]
+PLAN_OPERATOR = re.compile(r'PhysicalOp="([^"]+)"[^>]*?>\s*.*?<Object [^>]*Table="\[([^\]]+)\]"(?: Index="\[([^\]]+)\]")?', re.S)
+
+
+def build_queries(table, columns, emails):
+    placeholders = ','.join('?' for _ in emails)
+    legacy = ' OR '.join(f"LOWER([{column}]) IN ({placeholders})" for column, _ in columns)
+    indexed = ' OR '.join(f"[{lc_column}] IN ({placeholders})" for _, lc_column in columns)
+    params = [e.lower() for e in emails] * len(columns)
+    return {
+        'before (LOWER)': (f"SELECT * FROM [{table}] WHERE {legacy}", params),
+        'after (LC index)': (f"SELECT * FROM [{table}] WHERE {indexed}", params),
+    }
+
+
+def plan_operators(cursor, sql, params):
+    cursor.execute("SET SHOWPLAN_XML ON")
+    try:
+        cursor.execute(sql, params)
+        plan = cursor.fetchone()[0]
+    finally:
+        cursor.execute("SET SHOWPLAN_XML OFF")
+    ops = {f"{op} {index or table}" for op, table, index in PLAN_OPERATOR.findall(plan)}
+    return sorted(op for op in ops if 'Scan' in op or 'Seek' in op)
+
+
+def time_query(cursor, sql, params):
+    timings = []
+    rows = 0
+    for _ in range(RUNS):
+        start = time.perf_counter()
+        cursor.execute(sql, params)
+        rows = len(cursor.fetchall())
+        timings.append((time.perf_counter() - start) * 1000)
+    return rows, statistics.median(timings), max(timings)
+
+
+def main(emails):
+    conn = get_sql_connection()
+    try:
+        cursor = conn.cursor()
+        for table, columns in TABLES:
+            print(f"\n=== {table} ===")
+            for label, (sql, params) in build_queries(table, columns, emails).items():
+                ops = plan_operators(cursor, sql, params)
+                rows, median_ms, max_ms = time_query(cursor, sql, params)
+                print(f"{label:<18} rows={rows:<6} median={median_ms:8.2f} ms  max={max_ms:8.2f} ms")
+                print(f"{'':<18} plan: {', '.join(ops) or '-'}")
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print(__doc__)
+        sys.exit(1)
+    main(sys.argv[1:])
@@ -0,0 +1,27 @@
+"""
+Reproducible load test: synthetic data in a local SQL Server, a stub of the
+cost center OData service, and concurrent clients against the Flask routes.
+
+1. A throwaway SQL Server (the app's T-SQL - MERGE, TOP, VALUES tables - needs
+   the real engine; any ODBC Driver 18 reachable instance works):
+
+       docker run -d --name metadata-bench -e ACCEPT_EULA=Y -e MSSQL_SA_PASSWORD='Bench#Passw0rd' \\
+           -p 1433:1433 mcr.microsoft.com/mssql/server:2022-latest
+
+   and point .env (or the environment) at a database whose name contains "bench":
+   DB_SERVER=localhost DB_DATABASE=metadata_bench DB_USERNAME=sa DB_PASSWORD=...
+
+2. Seed it (creates the tables, applies migrations/, fills them):
+
+       python -m benchmarks.loadtest.seed --rows 100000 --reset
+
+3. Run the load test (starts the OData stub and the app in-process):
+
+       python -m benchmarks.loadtest --clients 16 --duration 30 --latency-ms 80
+
+   or only the stub, e.g. for a gunicorn instance started with
+   COST_CENTER_API_URL=http://127.0.0.1:8765/CostCenterEntitySet:
+
+       python -m benchmarks.loadtest.odata_stub --port 8765 --latency-ms 80
+       python -m benchmarks.loadtest --target http://127.0.0.1:8000
+"""
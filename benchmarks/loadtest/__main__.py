@@ -0,0 +1,292 @@
+"""
+Drive the Flask routes with concurrent clients against the seeded load test
+database and report latency percentiles, throughput and the server-side span
+breakdown (from the Server-Timing header) per scenario.
+
+    python -m benchmarks.loadtest [--clients 16] [--duration 30] [--scenarios home,metadetails]
+                                  [--latency-ms 50] [--jitter-ms 0] [--error-rate 0]
+                                  [--target http://host:port] [--json results.json]
+
+Without --target the cost center OData stub and the app (werkzeug, threaded)
+run in this process; use --target to measure a gunicorn deployment instead.
+"""
+import argparse
+import base64
+import json
+import math
+import os
+import queue
+import random
+import sys
+import threading
+import time
+from collections import defaultdict
+
+import requests
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from benchmarks.loadtest import data, odata_stub  # noqa: E402
+
+SCENARIO_ORDER = ['home', 'metadata', 'metadetails', 'submit', 'approve']
+WARMUP_REQUESTS = 20
+
+# 'metadata' listing sessions: filter mix, and how many of them page on via next_cursor
+LISTING_STATUSES = ['Up to date', 'In-Progress', 'Check']
+LISTING_ENVIRONMENTS = ['Production', 'Development', 'Test']
+LISTING_SORTS = ['platform', 'status', 'id', 'cost_center']
+LISTING_PAGE_SIZES = [10, 20]          # below data.ASSETS_PER_OWNER, so sessions have a next page
+LISTING_FOLLOW_SHARE = 0.5
+LISTING_MAX_PAGES = 5
+
+
+def principal_header(email):
+    """X-MS-CLIENT-PRINCIPAL as App Service authentication sends it."""
+    claims = {'claims': [{'typ': 'name', 'val': email.split('@')[0]},
+                         {'typ': 'preferred_username', 'val': email}]}
+    return {'X-MS-CLIENT-PRINCIPAL': base64.b64encode(json.dumps(claims).encode()).decode()}
+
+
+class Workload:
+    """Builds the next request of each scenario from the seeded data layout."""
+
+    def __init__(self, rows, seed=1):
+        self.rows = rows
+        self.submittable = data.submittable_indexes(rows)
+        pending = data.pending_indexes(rows)
+        random.Random(seed).shuffle(pending)
+        self.pending = queue.SimpleQueue()
+        for i in pending:
+            self.pending.put(i)
+
+    def owner_headers(self, rng):
+        return principal_header(data.owner_email(rng.randrange(data.owner_count(self.rows))))
+
+    def listing_params(self, rng):
+        """First page of a /api/metadata session: platforms, one filter or search, sort and page size."""
+        platforms = data.platform_names()
+        params = {
+            'platform': rng.sample(platforms, rng.randint(1, len(platforms))),
+            'sort': rng.choice(LISTING_SORTS),
+            'order': rng.choice(['asc', 'desc']),
+            'limit': rng.choice(LISTING_PAGE_SIZES),
+        }
+        kind = rng.choice(['none', 'status', 'environment', 'search'])
+        if kind == 'status':
+            params['status'] = rng.choice(LISTING_STATUSES)
+        elif kind == 'environment':
+            params['environment'] = rng.choice(LISTING_ENVIRONMENTS)
+        elif kind == 'search':
+            params['q'] = f"{data.PREFIX}-000{rng.randrange(10)}"
+        return params
+
+    def next_request(self, scenario, rng, state):
+        """
+        (method, path, params, json_body, headers), or None once the scenario's data is used up.
+        `state` is the calling client's own dict, carried across its requests.
+        """
+        if scenario == 'home':
+            return 'GET', '/', None, None, self.owner_headers(rng)
+        if scenario == 'metadata':
+            listing = state.get('listing')
+            if listing and listing['cursor']:
+                params = {**listing['params'], 'cursor': listing['cursor']}
+                return 'GET', '/api/metadata', params, None, listing['headers']
+            listing = state['listing'] = {
+                'params': self.listing_params(rng),
+                'headers': self.owner_headers(rng),
+                'follow': rng.random() < LISTING_FOLLOW_SHARE,
+                'pages': 0,
+                'cursor': None,
+            }
+            return 'GET', '/api/metadata', {**listing['params'], 'facets': '1'}, None, listing['headers']
+        if scenario == 'metadetails':
+            platform, sub_id = data.asset_key(rng.randrange(self.rows))
+            return 'GET', '/components/metadetails', {'id': sub_id, 'platform': platform}, None, {}
+        if scenario == 'submit':
+            platform, sub_id = data.asset_key(rng.choice(self.submittable))
+            return 'POST', '/submit_proposed_changes', None, {'subscription_id': sub_id, 'platform': platform}, {}
+        if scenario == 'approve':
+            try:
+                i = self.pending.get_nowait()
+            except queue.Empty:
+                return None
+            platform, sub_id = data.asset_key(i)
+            body = {'subscription_id': sub_id, 'platform': platform, 'action': 'approve' if i % 3 else 'reject'}
+            return 'POST', '/handle_approval', None, body, {}
+        raise ValueError(f"Unknown scenario {scenario!r}")
+
+    def record_response(self, scenario, state, response):
+        """
+        Keep the next_cursor of a listing session that pages on (up to LISTING_MAX_PAGES);
+        a failed request (response None) ends the session.
+        """
+        listing = state.get('listing')
+        if scenario != 'metadata' or not listing:
+            return
+        listing['pages'] += 1
+        next_cursor = None
+        if (listing['follow'] and listing['pages'] < LISTING_MAX_PAGES
+                and response is not None and response.status_code == 200):
+            next_cursor = response.json().get('next_cursor')
+        listing['cursor'] = next_cursor
+
+
+def parse_server_timing(header):
+    """{'db': ms, 'cc-api': ms, ...} from a Server-Timing header."""
+    spans = {}
+    for part in (header or '').split(','):
+        fields = part.strip().split(';')
+        for field in fields[1:]:
+            if field.startswith('dur='):
+                spans[fields[0]] = float(field[4:])
+    return spans
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(pct / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def run_scenario(base_url, workload, scenario, clients, duration, max_requests):
+    latencies, errors, spans = [], defaultdict(int), defaultdict(float)
+    lock = threading.Lock()
+    deadline = time.perf_counter() + duration
+    remaining = [max_requests]
+
+    def client(seed):
+        rng = random.Random(seed)
+        state = {}
+        session = requests.Session()
+        session.trust_env = False  # never route 127.0.0.1 through HTTP(S)_PROXY
+        while time.perf_counter() < deadline:
+            with lock:
+                if remaining[0] is not None:
+                    if remaining[0] <= 0:
+                        return
+                    remaining[0] -= 1
+            request = workload.next_request(scenario, rng, state)
+            if request is None:
+                return
+            method, path, params, body, headers = request
+            start = time.perf_counter()
+            try:
+                response = session.request(method, base_url + path, params=params, json=body,
+                                           headers=headers, timeout=60)
+                response.content  # include the body transfer
+                status = response.status_code
+                timing = parse_server_timing(response.headers.get('Server-Timing'))
+            except requests.RequestException as e:
+                response, status, timing = None, type(e).__name__, {}
+            elapsed = (time.perf_counter() - start) * 1000
+            workload.record_response(scenario, state, response)
+            with lock:
+                latencies.append(elapsed)
+                if not isinstance(status, int) or status >= 400:
+                    errors[str(status)] += 1
+                for name, ms in timing.items():
+                    spans[name] += ms
+
+    wall_start = time.perf_counter()
+    threads = [threading.Thread(target=client, args=(n,), daemon=True) for n in range(clients)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    wall = time.perf_counter() - wall_start
+
+    latencies.sort()
+    count = len(latencies)
+    return {
+        'scenario': scenario,
+        'requests': count,
+        'errors': dict(errors),
+        'throughput_rps': round(count / wall, 1) if wall else 0.0,
+        'p50_ms': round(percentile(latencies, 50), 1),
+        'p95_ms': round(percentile(latencies, 95), 1),
+        'p99_ms': round(percentile(latencies, 99), 1),
+        'max_ms': round(latencies[-1], 1) if latencies else 0.0,
+        'server_mean_ms': {name: round(total / count, 1) for name, total in spans.items()} if count else {},
+    }
+
+
+def start_local_app(odata_url):
+    """Import the app with the stub as cost center API and serve it on a free port."""
+    os.environ['COST_CENTER_API_URL'] = odata_url
+    for var in ('HTTP_PROXY', 'HTTPS_PROXY'):
+        os.environ.pop(var, None)  # the stub is on localhost; the corporate proxy can't reach it
+    os.environ.setdefault('DB_DEBUG_HEADERS', 'true')
+    os.environ.setdefault('OWNER_LOOKUP_COLUMNS', 'true')  # seed.py applies migrations/
+    from werkzeug.serving import make_server, WSGIRequestHandler
+    from app import app
+
+    class QuietHandler(WSGIRequestHandler):
+        def log_request(self, *args, **kwargs):
+            pass  # per-request access log lines would swamp the report
+
+    server = make_server('127.0.0.1', 0, app, threaded=True, request_handler=QuietHandler)
+    threading.Thread(target=server.serve_forever, name="loadtest-app", daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_port}"
+
+
+def print_report(results):
+    print(f"{'scenario':<12} {'reqs':>7} {'errors':>7} {'rps':>8} {'p50':>8} {'p95':>8} {'p99':>8} {'max':>8}  server spans (mean ms)")
+    for r in results:
+        spans = ' '.join(f"{k}={v}" for k, v in sorted(r['server_mean_ms'].items()))
+        print(f"{r['scenario']:<12} {r['requests']:>7} {sum(r['errors'].values()):>7} {r['throughput_rps']:>8} "
+              f"{r['p50_ms']:>8} {r['p95_ms']:>8} {r['p99_ms']:>8} {r['max_ms']:>8}  {spans}")
+        if r['errors']:
+            print(f"{'':<12} errors by status: {r['errors']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--scenarios', default=','.join(SCENARIO_ORDER))
+    parser.add_argument('--clients', type=int, default=8)
+    parser.add_argument('--duration', type=float, default=20.0, help="seconds per scenario")
+    parser.add_argument('--requests', type=int, default=None, help="stop a scenario after this many requests")
+    parser.add_argument('--rows', type=int, default=None, help="seeded asset count (read from the database if omitted)")
+    parser.add_argument('--target', default=None, help="base URL of an already running app")
+    parser.add_argument('--latency-ms', type=float, default=50.0, help="OData stub latency")
+    parser.add_argument('--jitter-ms', type=float, default=0.0)
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    parser.add_argument('--json', default=None, help="also write the results to this file")
+    args = parser.parse_args()
+
+    scenarios = [s.strip() for s in args.scenarios.split(',') if s.strip()]
+    unknown = set(scenarios) - set(SCENARIO_ORDER)
+    if unknown:
+        sys.exit(f"Unknown scenarios: {', '.join(sorted(unknown))} (choose from {', '.join(SCENARIO_ORDER)})")
+
+    if args.rows is None:
+        from benchmarks.loadtest.seed import seeded_rows
+        args.rows = seeded_rows()
+
+    stub = None
+    if args.target:
+        base_url = args.target.rstrip('/')
+    else:
+        stub, odata_url = odata_stub.start(0, args.latency_ms, args.jitter_ms, args.error_rate)
+        _, base_url = start_local_app(odata_url)
+
+    workload = Workload(args.rows)
+    print(f"{args.rows} seeded assets, {args.clients} clients, {args.duration:.0f}s per scenario against {base_url}")
+    results = []
+    for scenario in scenarios:
+        if scenario != 'approve':  # approvals are consumed; don't spend them on warm-up
+            run_scenario(base_url, workload, scenario, 1, args.duration, WARMUP_REQUESTS)
+        results.append(run_scenario(base_url, workload, scenario, args.clients, args.duration, args.requests))
+
+    print_report(results)
+    if stub is not None:
+        print(f"OData stub served {stub.requests} requests")
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump({'rows': args.rows, 'clients': args.clients, 'results': results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+"""
+Deterministic synthetic data shared by the seeder, the OData stub and the
+load driver, so all three agree on which IDs, owners and cost centers exist
+without talking to each other.
+"""
+import random
+
+from schema import PLATFORMS, EDITABLE_FIELDS
+
+PREFIX = 'LT'
+COST_CENTER_COUNT = 5000     # size of the stub's cost center universe
+ASSETS_PER_OWNER = 25
+
+# Row i of the seeded assets is in one of these states (by i % 20)
+PENDING_APPROVAL = {0}       # pending cost center approval + saved proposal → 'Check'
+SUBMITTABLE = {5, 15}        # saved proposal, no approval yet → 'In-Progress'
+
+
+def platform_names():
+    return list(PLATFORMS)
+
+
+def asset_key(i):
+    """(platform, sub_id) of seeded asset i."""
+    platforms = platform_names()
+    return platforms[i % len(platforms)], f"{PREFIX}-{i:08d}"
+
+
+def owner_count(rows):
+    return max(1, rows // ASSETS_PER_OWNER)
+
+
+def owner_email(n):
+    return f"lt.owner{n:06d}@bosch.com"
+
+
+def responsible_email(n):
+    return f"lt.resp{n:05d}@bosch.com"
+
+
+def cost_center_code(n):
+    """Ten-character code like the real ones ('000065F650'); users may type it without leading zeros."""
+    return f"{n + 0x10000:010X}"
+
+
+def cost_center_index(code):
+    """Inverse of cost_center_code, or None for codes outside the universe."""
+    try:
+        n = int(code, 16) - 0x10000
+    except (TypeError, ValueError):
+        return None
+    return n if 0 <= n < COST_CENTER_COUNT and cost_center_code(n) == code.upper() else None
+
+
+def cost_center_record(n):
+    """The REQUIRED_FIELDS the stub serves for cost center n."""
+    return {
+        'CostCenter': cost_center_code(n),
+        'Name3': f"Last{n:05d}",
+        'Name4': f"First{n:05d}",
+        'Responsible': f"LT.RESP{n % 997:05d}",
+        'Department': f"LT/D{n % 50:02d}",
+        'ResponsibleOrgOffice': f"{100000 + n % 997}",
+    }
+
+
+def asset_row(i, rows):
+    """Column → value for asset i (physical column names of its platform)."""
+    platform, sub_id = asset_key(i)
+    descriptor = PLATFORMS[platform]
+    rng = random.Random(i)
+    cc = rng.randrange(COST_CENTER_COUNT)
+    return {
+        descriptor.id_column: sub_id,
+        descriptor.name_column: f"{platform} workload {i}",
+        descriptor.environment_column: rng.choice(['Production', 'Development', 'Test']),
+        descriptor.person_related_column: rng.choice(['Yes', 'No']),
+        'I-SC': rng.choice(['1', '2', '3']),
+        'A-SC': rng.choice(['1', '2', '3']),
+        'C-SC': rng.choice(['1', '2', '3']),
+        'Management Group (OE)': f"OE-{rng.randrange(200):03d}",
+        'Cost Center': cost_center_code(cc),
+        'Cost Center Name': f"First{cc:05d} Last{cc:05d}",
+        'Cost Center Responsible': responsible_email(cc % 997),
+        'Cost Center Responsible WOM': f"{100000 + cc % 997}",
+        'IT Owner': owner_email(i % owner_count(rows)),
+        'IT Owner WOM': f"W{i % owner_count(rows):06d}",
+        'Last Review Date': f"2025-{1 + i % 12:02d}-{1 + i % 28:02d}",
+    }
+
+
+def proposed_row(i, rows):
+    """proposed_changes values for asset i: new IT owner and a new cost center."""
+    platform, sub_id = asset_key(i)
+    asset = asset_row(i, rows)
+    descriptor = PLATFORMS[platform]
+    new_cc = (cost_center_index(asset['Cost Center']) + 1) % COST_CENTER_COUNT
+    values = {'sub_id': sub_id, 'platform': platform}
+    for label, (prefix, _) in EDITABLE_FIELDS.items():
+        column = descriptor.editable_columns[label]
+        values[f"{prefix}_original"] = asset[column]
+        values[f"{prefix}_proposed"] = asset[column]
+    values['it_owner_proposed'] = owner_email((i + 1) % owner_count(rows))
+    values['cost_center_proposed'] = cost_center_code(new_cc)
+    values['cost_center_name_manual'] = ''
+    values['cost_center_responsible_manual'] = ''
+    values['cost_center_responsible_wom_manual'] = ''
+    return values
+
+
+def approval_row(i, rows):
+    """Pending cost_center_approvals row for asset i."""
+    platform, sub_id = asset_key(i)
+    asset = asset_row(i, rows)
+    proposal = proposed_row(i, rows)
+    new_cc = cost_center_index(proposal['cost_center_proposed'])
+    return {
+        'platform': platform,
+        'subscription_id': sub_id,
+        'name': asset[PLATFORMS[platform].name_column],
+        'management_group': asset['Management Group (OE)'],
+        'old_cost_center': asset['Cost Center'],
+        'old_cost_center_responsible': asset['Cost Center Responsible'],
+        'new_cost_center': proposal['cost_center_proposed'],
+        'new_cost_center_responsible': responsible_email(new_cc % 997),
+        'new_cost_center_name': f"First{new_cc:05d} Last{new_cc:05d}",
+        'it_owner': asset['IT Owner'],
+        'status': 'Pending',
+        'last_review_date': asset['Last Review Date'],
+    }
+
+
+def pending_indexes(rows):
+    return [i for i in range(rows) if i % 20 in PENDING_APPROVAL]
+
+
+def submittable_indexes(rows):
+    return [i for i in range(rows) if i % 20 in SUBMITTABLE]
@@ -0,0 +1,121 @@
+"""
+Local stand-in for the CostCenterEntitySet OData service, serving the
+synthetic cost centers from data.py as Atom feeds.
+
+Understands what utility.py sends: `$filter=CostCenter eq '...' or ...`
+lookups and `$top`/`$skip` paging (replica sync). Adds a configurable
+latency (plus jitter) and 503 error rate per request.
+
+    python -m benchmarks.loadtest.odata_stub --port 8765 --latency-ms 80 --jitter-ms 40
+"""
+import argparse
+import os
+import random
+import re
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+from xml.sax.saxutils import escape
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from benchmarks.loadtest import data  # noqa: E402
+
+ENTITY_SET = "CostCenterEntitySet"
+FILTER_TERM = re.compile(r"CostCenter eq '((?:[^']|'')*)'")
+MAX_PAGE = 5000
+
+FEED_HEAD = (
+    '<?xml version="1.0" encoding="utf-8"?>'
+    '<feed xmlns="http://www.w3.org/2005/Atom" '
+    'xmlns:m="http://schemas.microsoft.com/ado/2007/08/dataservices/metadata" '
+    'xmlns:d="http://schemas.microsoft.com/ado/2007/08/dataservices">'
+    f'<title type="text">{ENTITY_SET}</title>'
+)
+
+
+def entry(record):
+    props = ''.join(f"<d:{k}>{escape(v)}</d:{k}>" for k, v in record.items())
+    return (f"<entry><id>{ENTITY_SET}('{record['CostCenter']}')</id>"
+            f'<content type="application/xml"><m:properties>{props}</m:properties></content></entry>')
+
+
+def feed(records, next_href=None):
+    link = f'<link rel="next" href="{escape(next_href)}"/>' if next_href else ''
+    return (FEED_HEAD + ''.join(entry(r) for r in records) + link + '</feed>').encode('utf-8')
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, like the real service behind the proxy
+
+    def do_GET(self):
+        settings = self.server.settings
+        with self.server.lock:
+            self.server.requests += 1
+
+        delay = settings['latency_ms'] + random.uniform(0, settings['jitter_ms'])
+        time.sleep(delay / 1000)
+
+        url = urlsplit(self.path)
+        if not url.path.rstrip('/').endswith(ENTITY_SET):
+            return self._send(404, b'')
+        if random.random() < settings['error_rate']:
+            return self._send(503, b'Service Unavailable')
+
+        query = parse_qs(url.query)
+        filter_expr = query.get('$filter', [''])[0]
+        if 'CostCenter eq' in filter_expr:
+            codes = [code.replace("''", "'") for code in FILTER_TERM.findall(filter_expr)]
+            indexes = [data.cost_center_index(code) for code in codes]
+            records = [data.cost_center_record(n) for n in indexes if n is not None]
+            return self._send(200, feed(records))
+
+        # Paging (full sync); delta filters are ignored - everything counts as changed
+        top = min(int(query.get('$top', [MAX_PAGE])[0]), MAX_PAGE)
+        skip = int(query.get('$skip', ['0'])[0])
+        records = [data.cost_center_record(n) for n in range(skip, min(skip + top, data.COST_CENTER_COUNT))]
+        return self._send(200, feed(records))
+
+    def _send(self, status, body):
+        self.send_response(status)
+        self.send_header("Content-Type", "application/atom+xml;charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass  # one line per request would dominate the load test output
+
+
+def start(port=0, latency_ms=50.0, jitter_ms=0.0, error_rate=0.0):
+    """Serve in a daemon thread. Returns (server, base URL of the entity set)."""
+    server = ThreadingHTTPServer(("127.0.0.1", port), StubHandler)
+    server.daemon_threads = True
+    server.settings = {'latency_ms': latency_ms, 'jitter_ms': jitter_ms, 'error_rate': error_rate}
+    server.lock = threading.Lock()
+    server.requests = 0
+    threading.Thread(target=server.serve_forever, name="odata-stub", daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_port}/{ENTITY_SET}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--latency-ms', type=float, default=50.0)
+    parser.add_argument('--jitter-ms', type=float, default=0.0)
+    parser.add_argument('--error-rate', type=float, default=0.0, help="fraction of requests answered with 503")
+    args = parser.parse_args()
+
+    server, url = start(args.port, args.latency_ms, args.jitter_ms, args.error_rate)
+    print(f"Cost center OData stub on {url} ({data.COST_CENTER_COUNT} cost centers); Ctrl+C to stop")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
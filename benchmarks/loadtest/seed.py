@@ -0,0 +1,190 @@
+"""
+Create and fill the load test database with synthetic assets, proposed changes,
+pending approvals and the IT owner reference (see data.py for the layout).
+
+    python -m benchmarks.loadtest.seed --rows 100000 [--reset]
+
+Refuses to touch a database whose name does not contain "bench" unless --force.
+"""
+import argparse
+import os
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from schema import PLATFORMS, PLATFORM_COLUMNS  # noqa: E402
+from status import get_sql_connection, database  # noqa: E402
+from submissions import PROPOSED_WRITE_COLUMNS, APPROVAL_COLUMNS  # noqa: E402
+from benchmarks.loadtest import data  # noqa: E402
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+MIGRATIONS_DIR = os.path.join(REPO_DIR, "migrations")
+INSERT_CHUNK = 10_000
+
+ASSET_COLUMN_TYPES = {
+    'name': 'NVARCHAR(255)', 'environment': 'NVARCHAR(100)', 'person_related': 'NVARCHAR(20)',
+    'I-SC': 'NVARCHAR(20)', 'A-SC': 'NVARCHAR(20)', 'C-SC': 'NVARCHAR(20)',
+    'Management Group (OE)': 'NVARCHAR(255)',
+    'Cost Center': 'NVARCHAR(50)', 'Cost Center Name': 'NVARCHAR(255)',
+    'Cost Center Responsible': 'NVARCHAR(320)', 'Cost Center Responsible WOM': 'NVARCHAR(100)',
+    'IT Owner': 'NVARCHAR(320)', 'IT Owner WOM': 'NVARCHAR(100)',
+    'Last Review Date': 'DATE',
+}
+
+LOADTEST_TABLES = ['cost_center_approvals', 'proposed_changes', 'it_owner_reference', 'loadtest_meta'] + \
+    [descriptor.table for descriptor in PLATFORMS.values()]
+
+
+def ddl():
+    """CREATE TABLE statements for every table the app touches (only where missing)."""
+    statements = []
+    for platform, cols in PLATFORM_COLUMNS.items():
+        columns = [f"[{cols['id']}] NVARCHAR(100) NOT NULL PRIMARY KEY"]
+        for logical, sql_type in ASSET_COLUMN_TYPES.items():
+            columns.append(f"[{cols.get(logical, logical)}] {sql_type} NULL")
+        statements.append(
+            f"IF OBJECT_ID('dbo.{cols['table']}') IS NULL CREATE TABLE dbo.{cols['table']} ({', '.join(columns)})"
+        )
+
+    proposed = ', '.join(f"{c} NVARCHAR(400) NULL" for c in PROPOSED_WRITE_COLUMNS if c not in ('sub_id', 'platform'))
+    statements.append(f"""
+        IF OBJECT_ID('dbo.proposed_changes') IS NULL CREATE TABLE dbo.proposed_changes (
+            sub_id NVARCHAR(100) NOT NULL, platform NVARCHAR(20) NOT NULL, {proposed},
+            PRIMARY KEY (sub_id, platform))""")
+
+    approvals = ', '.join(f"{c} NVARCHAR(400) NULL" for c in APPROVAL_COLUMNS if c not in ('platform', 'subscription_id'))
+    statements.append(f"""
+        IF OBJECT_ID('dbo.cost_center_approvals') IS NULL CREATE TABLE dbo.cost_center_approvals (
+            id INT IDENTITY PRIMARY KEY, platform NVARCHAR(20) NOT NULL, subscription_id NVARCHAR(100) NOT NULL,
+            {approvals}, status NVARCHAR(20) NOT NULL, last_review_date DATE NULL)""")
+    statements.append("""
+        IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE name = 'IX_cost_center_approvals_subscription')
+            CREATE INDEX IX_cost_center_approvals_subscription
+                ON dbo.cost_center_approvals (subscription_id, platform, status)""")
+
+    statements.append("""
+        IF OBJECT_ID('dbo.it_owner_reference') IS NULL CREATE TABLE dbo.it_owner_reference (
+            [IT Owner] NVARCHAR(320) NOT NULL PRIMARY KEY, [IT Owner WOM] NVARCHAR(100) NULL)""")
+    statements.append("""
+        IF OBJECT_ID('dbo.loadtest_meta') IS NULL CREATE TABLE dbo.loadtest_meta (
+            [key] NVARCHAR(50) NOT NULL PRIMARY KEY, value NVARCHAR(200) NULL)""")
+    return statements
+
+
+def migration_batches():
+    """Forward migrations in order, split into batches on GO lines (rollback scripts skipped)."""
+    for name in sorted(os.listdir(MIGRATIONS_DIR)):
+        if not name.endswith('.sql') or name.endswith('_rollback.sql'):
+            continue
+        with open(os.path.join(MIGRATIONS_DIR, name), encoding='utf-8') as f:
+            for batch in re.split(r'^\s*GO\s*$', f.read(), flags=re.M | re.I):
+                if batch.strip():
+                    yield batch
+
+
+def insert_rows(conn, cursor, table, columns, rows):
+    sql = (f"INSERT INTO [{table}] ({', '.join(f'[{c}]' for c in columns)}) "
+           f"VALUES ({', '.join('?' for _ in columns)})")
+    cursor.fast_executemany = True
+    batch = []
+    for row in rows:
+        batch.append([row[c] for c in columns])
+        if len(batch) >= INSERT_CHUNK:
+            cursor.executemany(sql, batch)
+            conn.commit()
+            batch = []
+    if batch:
+        cursor.executemany(sql, batch)
+        conn.commit()
+
+
+def seed(rows, reset=False):
+    conn = get_sql_connection()
+    try:
+        cursor = conn.cursor()
+        if reset:
+            for table in LOADTEST_TABLES:
+                cursor.execute(f"IF OBJECT_ID('dbo.{table}') IS NOT NULL DROP TABLE dbo.{table}")
+            conn.commit()
+        for statement in ddl():
+            cursor.execute(statement)
+        for batch in migration_batches():
+            cursor.execute(batch)
+        conn.commit()
+
+        for table in LOADTEST_TABLES:
+            cursor.execute(f"TRUNCATE TABLE dbo.{table}")
+        conn.commit()
+
+        timings = {}
+        for platform, descriptor in PLATFORMS.items():
+            start = time.perf_counter()
+            indexes = range(data.platform_names().index(platform), rows, len(PLATFORMS))
+            columns = [descriptor.id_column] + [PLATFORM_COLUMNS[platform].get(c, c) for c in ASSET_COLUMN_TYPES]
+            insert_rows(conn, cursor, descriptor.table, columns, (data.asset_row(i, rows) for i in indexes))
+            timings[descriptor.table] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        proposed = sorted(data.pending_indexes(rows) + data.submittable_indexes(rows))
+        insert_rows(conn, cursor, 'proposed_changes', PROPOSED_WRITE_COLUMNS,
+                    (data.proposed_row(i, rows) for i in proposed))
+        timings['proposed_changes'] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        approval_columns = APPROVAL_COLUMNS + ['status', 'last_review_date']
+        insert_rows(conn, cursor, 'cost_center_approvals', approval_columns,
+                    (data.approval_row(i, rows) for i in data.pending_indexes(rows)))
+        timings['cost_center_approvals'] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        owners = data.owner_count(rows)
+        insert_rows(conn, cursor, 'it_owner_reference', ['IT Owner', 'IT Owner WOM'],
+                    ({'IT Owner': data.owner_email(n), 'IT Owner WOM': f"W{n:06d}"} for n in range(owners)))
+        timings['it_owner_reference'] = time.perf_counter() - start
+
+        insert_rows(conn, cursor, 'loadtest_meta', ['key', 'value'], [{'key': 'rows', 'value': str(rows)}])
+        for table in LOADTEST_TABLES:
+            cursor.execute(f"UPDATE STATISTICS dbo.{table}")
+        conn.commit()
+        cursor.close()
+    finally:
+        conn.close()
+    return timings
+
+
+def seeded_rows():
+    """Row count recorded by the last seed run (used by the load driver)."""
+    conn = get_sql_connection()
+    try:
+        cursor = conn.cursor()
+        cursor.execute("SELECT value FROM loadtest_meta WHERE [key] = 'rows'")
+        row = cursor.fetchone()
+        cursor.close()
+    finally:
+        conn.close()
+    if not row:
+        raise RuntimeError("Load test database is not seeded; run python -m benchmarks.loadtest.seed first")
+    return int(row[0])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=100_000, help="assets across all platforms (1k-1M)")
+    parser.add_argument('--reset', action='store_true', help="drop and recreate the tables first")
+    parser.add_argument('--force', action='store_true', help="allow a database name without 'bench'")
+    args = parser.parse_args()
+
+    if 'bench' not in (database or '').lower() and not args.force:
+        sys.exit(f"Refusing to seed database {database!r}: name does not contain 'bench' (use --force)")
+
+    start = time.perf_counter()
+    timings = seed(args.rows, reset=args.reset)
+    for table, seconds in timings.items():
+        print(f"{table:<24} {seconds:8.1f} s")
+    print(f"{'total':<24} {time.perf_counter() - start:8.1f} s for {args.rows} assets")
+
+
+if __name__ == "__main__":
+    main()
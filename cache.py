@@ -0,0 +1,202 @@
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from dotenv import load_dotenv
+
+# ---------- LOAD ENV ----------
+load_dotenv()
+
+# Optional shared backend so every gunicorn worker sees the same entries,
+# e.g. CACHE_REDIS_URL=redis://localhost:6379/0 (requires the `redis` package)
+CACHE_REDIS_URL = os.getenv("CACHE_REDIS_URL")
+# Without it, caches whose entries must be invalidated across workers keep a
+# per-worker copy for at most this many seconds (0 = don't cache them at all)
+CACHE_FALLBACK_TTL = int(os.getenv("CACHE_FALLBACK_TTL", "5"))
+
+try:
+    import redis
+except ImportError:
+    redis = None
+
+# Returned by get() when a key is absent; None is a valid (negative) cached value
+MISS = object()
+
+
+# ---------- BACKENDS ----------
+class LocalBackend:
+    """In-process LRU store with a per-entry TTL. Thread-safe."""
+
+    def __init__(self, max_size):
+        self.max_size = max_size
+        self._data = OrderedDict()  # key -> (expires_at, value)
+        self._lock = threading.Lock()
+        self.evictions = 0
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return MISS
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._data[key]
+                return MISS
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl):
+        with self._lock:
+            self._data[key] = (time.monotonic() + ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+class RedisBackend:
+    """Shared store; values are JSON encoded (dates/datetimes come back as strings)."""
+
+    def __init__(self, url, prefix):
+        self._client = redis.Redis.from_url(url, socket_timeout=0.5, socket_connect_timeout=0.5)
+        self.prefix = prefix
+
+    def get(self, key):
+        try:
+            raw = self._client.get(self.prefix + key)
+        except redis.RedisError as e:
+            print(f"⚠️ Shared cache read failed: {e}")
+            return MISS
+        return MISS if raw is None else json.loads(raw)
+
+    def set(self, key, value, ttl):
+        try:
+            self._client.setex(self.prefix + key, max(1, int(ttl)), json.dumps(value, default=str))
+        except redis.RedisError as e:
+            print(f"⚠️ Shared cache write failed: {e}")
+
+    def delete(self, key):
+        try:
+            self._client.delete(self.prefix + key)
+        except redis.RedisError as e:
+            print(f"⚠️ Shared cache delete failed: {e}")
+
+    def clear(self):
+        try:
+            keys = list(self._client.scan_iter(self.prefix + "*"))
+            if keys:
+                self._client.delete(*keys)
+        except redis.RedisError as e:
+            print(f"⚠️ Shared cache clear failed: {e}")
+
+
+# ---------- CACHE ----------
+class TTLCache:
+    """
+    Two-tier cache: an in-process LRU in front of an optional shared backend.
+    Keys are strings. Each entry has its own TTL, so negative results (None)
+    can be stored with a shorter lifetime than positive ones.
+    With a shared backend, local_ttl caps how long a worker keeps its own copy;
+    local_ttl=0 disables the local tier so a delete() is seen by every worker at once.
+    A ttl of 0 stores nothing (every get() misses).
+    """
+
+    def __init__(self, name, max_size=1024, ttl=300, shared=None, local_ttl=30):
+        self.name = name
+        self.ttl = ttl
+        self.local = LocalBackend(max_size)
+        self.shared = shared
+        self.local_ttl = local_ttl
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.negative_hits = 0
+
+    def _record(self, value):
+        with self._lock:
+            if value is MISS:
+                self.misses += 1
+            else:
+                self.hits += 1
+                if value is None:
+                    self.negative_hits += 1
+
+    def get(self, key):
+        value = self.local.get(key)
+        if value is MISS and self.shared is not None:
+            value = self.shared.get(key)
+            if value is not MISS and self.local_ttl:
+                # Short local copy; the shared backend stays the source of truth
+                self.local.set(key, value, min(self.ttl, self.local_ttl))
+        self._record(value)
+        return value
+
+    def set(self, key, value, ttl=None):
+        ttl = self.ttl if ttl is None else ttl
+        if ttl <= 0:
+            return
+        if self.shared is None or self.local_ttl:
+            self.local.set(key, value, ttl)
+        if self.shared is not None:
+            self.shared.set(key, value, ttl)
+
+    def delete(self, key):
+        self.local.delete(key)
+        if self.shared is not None:
+            self.shared.delete(key)
+
+    def clear(self):
+        self.local.clear()
+        if self.shared is not None:
+            self.shared.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'negative_hits': self.negative_hits,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0,
+                'size': len(self.local),
+                'evictions': self.local.evictions,
+                'shared_backend': self.shared is not None,
+                'enabled': self.ttl > 0,
+            }
+
+
+_caches = {}
+
+def make_cache(name, max_size=1024, ttl=300, local_ttl=30, fallback_ttl=None):
+    """
+    Create (and register for stats) a cache, using the shared backend if configured.
+    fallback_ttl: the entries must be invalidated across workers, so without a shared
+    backend they are only kept per worker for this many seconds (a delete() reaches
+    the calling worker only; the others serve their copy until it expires).
+    """
+    shared = None
+    if CACHE_REDIS_URL:
+        if redis is None:
+            print("⚠️ CACHE_REDIS_URL is set but the 'redis' package is not installed; using in-process cache only")
+        else:
+            shared = RedisBackend(CACHE_REDIS_URL, prefix=f"ssp:{name}:")
+    if fallback_ttl is not None and shared is None:
+        ttl = min(ttl, fallback_ttl)
+    cache = TTLCache(name, max_size=max_size, ttl=ttl, shared=shared, local_ttl=local_ttl)
+    _caches[name] = cache
+    return cache
+
+def get_cache_stats():
+    return {name: cache.stats() for name, cache in _caches.items()}
@@ -0,0 +1,171 @@
+import os
+import sqlite3
+import threading
+import time
+from dotenv import load_dotenv
+
+try:
+    import fcntl
+except ImportError:  # Windows dev machines: no cross-process sync lock
+    fcntl = None
+
+# ---------- LOAD ENV ----------
+load_dotenv()
+
+# Embedded SQLite copy of the CostCenterEntitySet (only the fields we use).
+# Empty COST_CENTER_REPLICA_PATH disables it; lookups then always go to the API.
+COST_CENTER_REPLICA_PATH = os.getenv(
+    "COST_CENTER_REPLICA_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "instance", "cost_centers.sqlite3")
+)
+
+
+class CostCenterReplica:
+    """
+    Local, indexed store of cost center master data, filled by
+    utility.sync_cost_center_replica. One SQLite connection per thread; WAL mode
+    lets lookups run while a sync writes.
+    """
+
+    def __init__(self, path, fields):
+        self.path = path
+        self.fields = list(fields)
+        self._quoted = ', '.join(f'"{f}"' for f in self.fields)
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self.lookups = 0
+        self.hits = 0
+
+    # ----- connections -----
+    def _connect(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            columns = ', '.join(f'"{f}" TEXT' for f in self.fields if f != 'CostCenter')
+            conn.executescript(f"""
+                CREATE TABLE IF NOT EXISTS cost_centers (
+                    "CostCenter" TEXT PRIMARY KEY,
+                    {columns},
+                    synced_at REAL NOT NULL
+                ) WITHOUT ROWID;
+                CREATE TABLE IF NOT EXISTS sync_state (key TEXT PRIMARY KEY, value TEXT);
+            """)
+            self._local.conn = conn
+        return conn
+
+    def available(self):
+        """True once a full sync has completed (lookups before that go to the API)."""
+        return bool(self.path) and os.path.exists(self.path) and self.get_state('last_full_sync') is not None
+
+    # ----- reads -----
+    def lookup(self, candidates):
+        """
+        Best record among the zero-padded candidates (earliest wins, same rule as
+        the API lookup) via the primary key index, or None.
+        """
+        if not candidates:
+            return None
+        conn = self._connect()
+        rows = conn.execute(
+            f"SELECT {self._quoted} FROM cost_centers "
+            f"WHERE \"CostCenter\" IN ({','.join('?' for _ in candidates)})",
+            list(candidates)
+        ).fetchall()
+        records = {row[0]: dict(zip(self.fields, row)) for row in rows}
+        with self._lock:
+            self.lookups += 1
+            self.hits += bool(records)
+        for candidate in candidates:
+            if candidate in records:
+                return records[candidate]
+        return None
+
+    def get_state(self, key):
+        row = self._connect().execute("SELECT value FROM sync_state WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def stats(self):
+        conn = self._connect()
+        with self._lock:
+            lookups, hits = self.lookups, self.hits
+        return {
+            'path': self.path,
+            'rows': conn.execute("SELECT COUNT(*) FROM cost_centers").fetchone()[0],
+            'last_full_sync': self.get_state('last_full_sync'),
+            'last_incremental_sync': self.get_state('last_incremental_sync'),
+            'watermark': self.get_state('watermark'),
+            'lookups': lookups,
+            'hit_rate': round(hits / lookups, 4) if lookups else 0.0,
+        }
+
+    # ----- writes (sync job) -----
+    def upsert(self, records, synced_at):
+        if not records:
+            return
+        conn = self._connect()
+        with conn:
+            conn.executemany(
+                f"INSERT OR REPLACE INTO cost_centers ({self._quoted}, synced_at) "
+                f"VALUES ({', '.join('?' for _ in self.fields)}, ?)",
+                [
+                    [(r[f] or '').strip().upper() if f == 'CostCenter' else r.get(f) for f in self.fields] + [synced_at]
+                    for r in records if r.get('CostCenter')
+                ]
+            )
+
+    def prune(self, synced_before):
+        """Drop rows a full sync did not see again (deleted upstream)."""
+        conn = self._connect()
+        with conn:
+            return conn.execute("DELETE FROM cost_centers WHERE synced_at < ?", (synced_before,)).rowcount
+
+    def set_state(self, **values):
+        conn = self._connect()
+        with conn:
+            conn.executemany("INSERT OR REPLACE INTO sync_state (key, value) VALUES (?, ?)",
+                             [(k, None if v is None else str(v)) for k, v in values.items()])
+
+    def sync_lock(self):
+        """
+        Non-blocking cross-process lock so only one gunicorn worker syncs at a time.
+        Returns a release callable, or None when another process holds it.
+        """
+        if fcntl is None:
+            return lambda: None
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        handle = open(self.path + '.lock', 'w')
+        try:
+            fcntl.flock(handle, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            handle.close()
+            return None
+
+        def release():
+            fcntl.flock(handle, fcntl.LOCK_UN)
+            handle.close()
+        return release
+
+
+def run_scheduler(sync, interval):
+    """Daemon thread calling sync() every `interval` seconds (first run right away)."""
+    def loop():
+        while True:
+            try:
+                sync()
+            except Exception as e:
+                print(f"❌ Cost center replica sync failed: {e}")
+            time.sleep(interval)
+
+    thread = threading.Thread(target=loop, name="cost-center-sync", daemon=True)
+    thread.start()
+    return thread
+
+
+if __name__ == "__main__":
+    # python -m cost_center_replica [--full]   (cron / WebJob entry point)
+    import sys
+    from utility import sync_cost_center_replica
+    print(sync_cost_center_replica(full='--full' in sys.argv[1:]))
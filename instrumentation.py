@@ -0,0 +1,202 @@
+import contextvars
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from dotenv import load_dotenv
+
+# ---------- LOAD ENV ----------
+load_dotenv()
+
+# Requests slower than this (ms) get a one-line breakdown in the log; 0 = off
+SLOW_REQUEST_LOG_MS = float(os.getenv("SLOW_REQUEST_LOG_MS", "2000"))
+
+# Upper bounds (ms) of the /metrics latency histogram buckets (+Inf is implicit)
+LATENCY_BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000)
+
+# Span names → Server-Timing metric names, in header order
+SPAN_NAMES = {
+    'db_connect': 'db-connect',
+    'db': 'db',
+    'db_fetch': 'db-fetch',
+    'cost_center_api': 'cc-api',
+    'render': 'render',
+}
+
+_LABEL_LENGTH = 120
+
+
+# ---------- PER-REQUEST SPANS ----------
+class Span:
+    """Aggregate of one kind of timed call within a request."""
+    __slots__ = ('count', 'total', 'slowest', 'slowest_label')
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.slowest = 0.0
+        self.slowest_label = None
+
+
+class RequestTrace:
+    """
+    Timing of one request, broken down per span kind (DB connect, statements,
+    cost center API, template rendering). Thread-safe: the per-platform listing
+    fallback and the cost center lookups record into it from worker threads.
+    """
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.spans = {}
+        self._lock = threading.Lock()
+
+    def record(self, name, seconds, label=None):
+        with self._lock:
+            span = self.spans.get(name)
+            if span is None:
+                span = self.spans[name] = Span()
+            span.count += 1
+            span.total += seconds
+            if seconds >= span.slowest:
+                span.slowest = seconds
+                span.slowest_label = label
+
+    def elapsed(self):
+        return time.perf_counter() - self.started
+
+    def server_timing(self):
+        """Server-Timing header value (durations in ms)."""
+        parts = []
+        with self._lock:
+            for name, metric in SPAN_NAMES.items():
+                span = self.spans.get(name)
+                if span:
+                    parts.append(f'{metric};dur={span.total * 1000:.1f};desc="{span.count} calls, '
+                                 f'slowest {span.slowest * 1000:.1f}ms"')
+        parts.append(f'total;dur={self.elapsed() * 1000:.1f}')
+        return ', '.join(parts)
+
+    def summary(self):
+        with self._lock:
+            return {
+                name: {
+                    'count': span.count,
+                    'total_ms': round(span.total * 1000, 1),
+                    'slowest_ms': round(span.slowest * 1000, 1),
+                    'slowest': span.slowest_label
+                }
+                for name, span in self.spans.items()
+            }
+
+
+_request_trace = contextvars.ContextVar("request_trace", default=None)
+
+def start_request_trace():
+    """Attach a fresh trace to the current context (call once per request)."""
+    trace = RequestTrace()
+    _request_trace.set(trace)
+    return trace
+
+def get_request_trace():
+    return _request_trace.get()
+
+def record_span(name, seconds, label=None):
+    trace = _request_trace.get()
+    if trace is not None:
+        trace.record(name, seconds, label)
+
+@contextmanager
+def span(name, label=None):
+    """Time the enclosed block as one `name` call of the current request (no-op outside requests)."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_span(name, time.perf_counter() - start, label)
+
+def statement_label(sql):
+    """Compact single-line form of a SQL statement for slowest-query reporting."""
+    label = ' '.join(str(sql).split())
+    return label if len(label) <= _LABEL_LENGTH else label[:_LABEL_LENGTH - 3] + '...'
+
+
+# ---------- PER-ROUTE METRICS ----------
+class RouteMetrics:
+    """Per-process latency histograms and span totals per (route, method)."""
+
+    def __init__(self, buckets=LATENCY_BUCKETS_MS):
+        self.buckets = tuple(buckets)
+        self._routes = {}
+        self._lock = threading.Lock()
+
+    def observe(self, route, method, status, trace):
+        elapsed_ms = trace.elapsed() * 1000
+        spans = trace.summary()
+        with self._lock:
+            entry = self._routes.get((route, method))
+            if entry is None:
+                entry = self._routes[(route, method)] = {
+                    'buckets': [0] * (len(self.buckets) + 1),
+                    'count': 0,
+                    'sum_ms': 0.0,
+                    'errors': 0,
+                    'spans': {}
+                }
+            entry['buckets'][bisect_left(self.buckets, elapsed_ms)] += 1
+            entry['count'] += 1
+            entry['sum_ms'] += elapsed_ms
+            entry['errors'] += status >= 500
+            for name, data in spans.items():
+                totals = entry['spans'].setdefault(name, [0, 0.0])
+                totals[0] += data['count']
+                totals[1] += data['total_ms']
+        return elapsed_ms
+
+    def render(self):
+        """Prometheus text exposition format."""
+        with self._lock:
+            routes = {key: {**entry, 'buckets': list(entry['buckets']),
+                            'spans': {k: list(v) for k, v in entry['spans'].items()}}
+                      for key, entry in self._routes.items()}
+
+        lines = [
+            '# HELP http_request_duration_ms Request latency per route.',
+            '# TYPE http_request_duration_ms histogram',
+        ]
+        for (route, method), entry in sorted(routes.items()):
+            labels = f'route="{route}",method="{method}"'
+            cumulative = 0
+            for bound, count in zip(self.buckets, entry['buckets']):
+                cumulative += count
+                lines.append(f'http_request_duration_ms_bucket{{{labels},le="{bound}"}} {cumulative}')
+            lines.append(f'http_request_duration_ms_bucket{{{labels},le="+Inf"}} {entry["count"]}')
+            lines.append(f'http_request_duration_ms_sum{{{labels}}} {entry["sum_ms"]:.3f}')
+            lines.append(f'http_request_duration_ms_count{{{labels}}} {entry["count"]}')
+
+        lines += [
+            '# HELP http_request_errors_total Responses with status >= 500 per route.',
+            '# TYPE http_request_errors_total counter',
+        ]
+        for (route, method), entry in sorted(routes.items()):
+            lines.append(f'http_request_errors_total{{route="{route}",method="{method}"}} {entry["errors"]}')
+
+        lines += [
+            '# HELP request_span_calls_total Timed calls per route and span (db_connect, db, db_fetch, cost_center_api, render).',
+            '# TYPE request_span_calls_total counter',
+        ]
+        for (route, method), entry in sorted(routes.items()):
+            for name, (count, _) in sorted(entry['spans'].items()):
+                lines.append(f'request_span_calls_total{{route="{route}",method="{method}",span="{name}"}} {count}')
+
+        lines += [
+            '# HELP request_span_duration_ms_total Time spent per route and span.',
+            '# TYPE request_span_duration_ms_total counter',
+        ]
+        for (route, method), entry in sorted(routes.items()):
+            for name, (_, total_ms) in sorted(entry['spans'].items()):
+                lines.append(f'request_span_duration_ms_total{{route="{route}",method="{method}",span="{name}"}} {total_ms:.3f}')
+        return '\n'.join(lines) + '\n'
+
+
+route_metrics = RouteMetrics()
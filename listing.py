@@ -0,0 +1,300 @@
+import base64
+import contextvars
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+import pyodbc
+from dotenv import load_dotenv
+from schema import PLATFORMS
+from status import get_sql_connection, owner_email_predicate
+
+# ---------- LOAD ENV ----------
+load_dotenv()
+
+# When the combined query over all platforms fails, each platform is queried on its
+# own (concurrently, with a shared deadline), so one broken or slow asset table only
+# costs its own rows plus a warning instead of the whole page
+PLATFORM_FETCH_TIMEOUT = float(os.getenv("PLATFORM_FETCH_TIMEOUT", "20"))  # seconds
+platform_executor = ThreadPoolExecutor(
+    max_workers=int(os.getenv("PLATFORM_FETCH_WORKERS", "6")),
+    thread_name_prefix="platform-fetch"
+)
+
+# ---------- LISTING SOURCES ----------
+
+# API name → column of the `listed` CTE below
+SORT_COLUMNS = ['platform', 'status', 'id', 'environment', 'cost_center', 'it_owner']
+EXACT_FILTERS = ['status', 'environment']            # checkbox filters (IN list)
+CONTAINS_FILTERS = ['id', 'cost_center', 'it_owner']  # free-text filters (LIKE %x%)
+SEARCH_COLUMNS = ['platform', 'status', 'id', 'environment', 'cost_center', 'it_owner']
+FACET_COLUMNS = ['platform', 'status', 'environment']
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+# Dashboard counter name per status value
+STATUS_COUNTERS = {
+    'up to date': 'up_to_date',
+    'overdue': 'overdue',
+    'in-progress': 'in_progress',
+    'check': 'check'
+}
+
+
+class ListingError(ValueError):
+    """Invalid listing parameters (bad sort key, cursor, ...)."""
+
+
+# ---------- QUERY BUILDING ----------
+def _text(column):
+    return f"COALESCE(CAST([{column}] AS NVARCHAR(255)), '')"
+
+def _like_escape(value):
+    return value.replace('[', '[[]').replace('%', '[%]').replace('_', '[_]')
+
+def _base_cte(platforms, emails):
+    """CTE producing one normalized row per asset the user owns, with its status."""
+    selects, params = [], []
+    for platform in platforms:
+        source = PLATFORMS[platform]
+        owner_sql, owner_params = owner_email_predicate(emails)
+        selects.append(f"""
+            SELECT '{platform}' AS platform,
+                   {_text(source.id_column)} AS id,
+                   {_text(source.environment_column)} AS environment,
+                   {_text('Cost Center')} AS cost_center,
+                   {_text('IT Owner')} AS it_owner
+            FROM [{source.table}]
+            WHERE ({owner_sql})""")
+        params += owner_params
+
+    sql = f"""
+        WITH assets AS ({' UNION ALL '.join(selects)}
+        ), listed AS (
+            SELECT a.platform, a.id, a.environment, a.cost_center, a.it_owner,
+                CASE
+                    WHEN EXISTS (
+                        SELECT 1 FROM cost_center_approvals c
+                        WHERE c.subscription_id = a.id AND c.platform = a.platform AND c.status = 'Pending'
+                    ) THEN 'Check'
+                    WHEN EXISTS (
+                        SELECT 1 FROM proposed_changes p
+                        WHERE p.sub_id = a.id AND p.platform = a.platform
+                    ) THEN 'In-Progress'
+                    ELSE 'Up to date'
+                END AS status
+            FROM assets a
+        )"""
+    return sql, params
+
+def _filter_clause(filters, search):
+    clauses, params = [], []
+    for column in EXACT_FILTERS:
+        values = [v for v in filters.get(column, []) if v is not None]
+        if values:
+            clauses.append(f"{column} IN ({','.join('?' for _ in values)})")
+            params += values
+    for column in CONTAINS_FILTERS:
+        value = (filters.get(column) or [''])[0].strip()
+        if value:
+            clauses.append(f"{column} LIKE ?")
+            params.append(f"%{_like_escape(value)}%")
+    if search:
+        clauses.append('(' + ' OR '.join(f"{column} LIKE ?" for column in SEARCH_COLUMNS) + ')')
+        params += [f"%{_like_escape(search)}%"] * len(SEARCH_COLUMNS)
+    return clauses, params
+
+def encode_cursor(row, sort):
+    values = [row[sort], row['platform'], row['id']]
+    return base64.urlsafe_b64encode(json.dumps(values).encode('utf-8')).decode('ascii')
+
+def decode_cursor(cursor):
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+    except (ValueError, UnicodeError):
+        raise ListingError("Invalid cursor")
+    if not isinstance(values, list) or len(values) != 3:
+        raise ListingError("Invalid cursor")
+    return values
+
+def _keyset_clause(sort, descending, cursor):
+    """Rows strictly after the cursor in (sort, platform, id) order."""
+    op = '<' if descending else '>'
+    sort_value, platform, sub_id = decode_cursor(cursor)
+    sql = (f"({sort} {op} ? OR ({sort} = ? AND "
+           f"(platform {op} ? OR (platform = ? AND id {op} ?))))")
+    return sql, [sort_value, sort_value, platform, platform, sub_id]
+
+
+# ---------- PER-PLATFORM FAULT ISOLATION ----------
+def _per_platform(fetch, platforms):
+    """
+    fetch(platform) for every platform concurrently, within one PLATFORM_FETCH_TIMEOUT.
+    Returns ({platform: result} for those that answered, [warnings] for the rest).
+    """
+    futures = {
+        # copy_context() keeps the request's DB call counter and trace visible in the workers
+        platform: platform_executor.submit(contextvars.copy_context().run, fetch, platform)
+        for platform in platforms
+    }
+    deadline = time.monotonic() + PLATFORM_FETCH_TIMEOUT
+
+    results, warnings = {}, []
+    for platform, future in futures.items():
+        try:
+            results[platform] = future.result(timeout=max(0, deadline - time.monotonic()))
+        except FutureTimeoutError:
+            future.cancel()
+            print(f"⚠️ {platform} subscriptions timed out after {PLATFORM_FETCH_TIMEOUT}s")
+            warnings.append(f"{platform} data is temporarily unavailable (timed out).")
+        except Exception as e:
+            print(f"❌ Failed to load {platform} subscriptions: {e}")
+            warnings.append(f"{platform} data is temporarily unavailable.")
+    return results, warnings
+
+def _fetch_isolated(fetch, platforms):
+    """
+    fetch(platforms) as one statement; if that fails, fetch([platform]) per platform.
+    Returns ([results], [warnings]): the single combined result, or one result per
+    platform that answered.
+    """
+    try:
+        return [fetch(platforms)], []
+    except (pyodbc.Error, TimeoutError) as e:
+        print(f"⚠️ Listing query over {', '.join(platforms)} failed ({e}); retrying per platform")
+    results, warnings = _per_platform(lambda platform: fetch([platform]), platforms)
+    return list(results.values()), warnings
+
+
+# ---------- PUBLIC API ----------
+def _query_page(platforms, emails, clauses, params, sort, direction, limit, with_facets):
+    """(rows, facet rows or None) of one listing page over the given platforms."""
+    cte_sql, cte_params = _base_cte(platforms, emails)
+    page_sql = f"""{cte_sql}
+        SELECT TOP ({limit + 1}) platform, status, id, environment, cost_center, it_owner
+        FROM listed
+        {'WHERE ' + ' AND '.join(clauses) if clauses else ''}
+        ORDER BY {sort} {direction}, platform {direction}, id {direction}
+    """
+
+    conn = get_sql_connection()
+    try:
+        cursor = conn.cursor()
+        cursor.execute(page_sql, cte_params + params)
+        columns = [col[0] for col in cursor.description]
+        rows = [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+        facets = None
+        if with_facets:
+            # Options for the column filters, over everything the user owns
+            facet_sql = cte_sql + ' UNION ALL '.join(
+                f" SELECT '{column}' AS facet, {column} AS value FROM listed GROUP BY {column}"
+                for column in FACET_COLUMNS
+            )
+            cursor.execute(facet_sql, cte_params)
+            facets = cursor.fetchall()
+        cursor.close()
+    finally:
+        conn.close()
+    return rows, facets
+
+def list_subscriptions(user_emails, platforms=None, filters=None, search=None,
+                       sort='platform', order='asc', limit=DEFAULT_PAGE_SIZE, cursor=None,
+                       with_facets=False):
+    """
+    One page of the metadata listing with keyset pagination.
+    Sorting, filtering and status resolution all happen in SQL.
+    Returns {'items': [...], 'next_cursor': str|None, 'warnings': [...], 'facets': {...}}
+    (facets on request). A platform whose table cannot be read is left out with a warning.
+    """
+    emails = [e.lower() for e in user_emails if e]
+    platforms = [p for p in (platforms or PLATFORMS) if p in PLATFORMS]
+    if sort not in SORT_COLUMNS:
+        raise ListingError(f"Cannot sort by '{sort}'")
+    descending = order == 'desc'
+    limit = max(1, min(int(limit), MAX_PAGE_SIZE))
+
+    page = {'items': [], 'next_cursor': None, 'warnings': []}
+    if with_facets:
+        page['facets'] = {column: [] for column in FACET_COLUMNS}
+    if not emails or not platforms:
+        return page
+
+    clauses, params = _filter_clause(filters or {}, (search or '').strip())
+    if cursor:
+        keyset_sql, keyset_params = _keyset_clause(sort, descending, cursor)
+        clauses.append(keyset_sql)
+        params += keyset_params
+
+    direction = 'DESC' if descending else 'ASC'
+    results, page['warnings'] = _fetch_isolated(
+        lambda selected: _query_page(selected, emails, clauses, params, sort, direction, limit, with_facets),
+        platforms
+    )
+
+    rows = [row for platform_rows, _ in results for row in platform_rows]
+    if len(results) > 1:
+        # Per-platform pages: merge into the (sort, platform, id) order the SQL uses
+        # (all three are non-NULL text; the database collation is case-insensitive)
+        rows.sort(key=lambda row: (row[sort].lower(), row['platform'].lower(), row['id'].lower()),
+                  reverse=descending)
+    if with_facets:
+        for _, facet_rows in results:
+            for facet, value in facet_rows:
+                page['facets'][facet].append(value)
+        for column, values in page['facets'].items():
+            page['facets'][column] = sorted(set(values))
+
+    if len(rows) > limit:
+        rows = rows[:limit]
+        page['next_cursor'] = encode_cursor(rows[-1], sort)
+    page['items'] = rows
+    return page
+
+def empty_summary():
+    return {'total': 0, **{counter: 0 for counter in STATUS_COUNTERS.values()}}
+
+def _query_summary(platforms, emails):
+    """(platform, status, count) rows over the given platforms."""
+    cte_sql, cte_params = _base_cte(platforms, emails)
+    sql = f"""{cte_sql}
+        SELECT platform, status, COUNT(*) AS n
+        FROM listed
+        GROUP BY platform, status
+    """
+
+    conn = get_sql_connection()
+    try:
+        cursor = conn.cursor()
+        cursor.execute(sql, cte_params)
+        rows = cursor.fetchall()
+        cursor.close()
+    finally:
+        conn.close()
+    return rows
+
+def summarize_subscriptions(user_emails, platforms=None):
+    """
+    Dashboard counters for everything the user owns, from one GROUP BY over the
+    listing CTE: ({platform: {'total', 'up_to_date', 'overdue', 'in_progress', 'check'}},
+    [warnings]). Only (platform, status, count) rows come back, so no asset rows are
+    fetched, normalized or counted in Python. A platform that cannot be read keeps
+    zero counters and gets a warning.
+    """
+    emails = [e.lower() for e in user_emails if e]
+    platforms = [p for p in (platforms or PLATFORMS) if p in PLATFORMS]
+    summary = {platform: empty_summary() for platform in platforms}
+    if not emails or not platforms:
+        return summary, []
+
+    results, warnings = _fetch_isolated(lambda selected: _query_summary(selected, emails), platforms)
+
+    for rows in results:
+        for platform, status, count in rows:
+            counts = summary[platform]
+            counts['total'] += count
+            counter = STATUS_COUNTERS.get((status or '').lower())
+            if counter:
+                counts[counter] += count
+    return summary, warnings
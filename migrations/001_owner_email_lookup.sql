@@ -0,0 +1,57 @@
+-- =====================================================================
+-- 001: Sargable owner-email lookups
+--
+-- The listing/home/review queries used to filter with
+--   LOWER([IT Owner]) IN (...) OR LOWER([Cost Center Responsible]) IN (...)
+-- which forces a scan of every asset table. This adds persisted, indexed
+-- lower-case copies of the owner columns so those filters become seeks.
+-- Computed columns are maintained by SQL Server, so no write path changes.
+--
+-- Idempotent: safe to run more than once.
+-- After running it, set OWNER_LOOKUP_COLUMNS=true in the app.
+-- =====================================================================
+
+-- ---------- azure_assets ----------
+IF COL_LENGTH('dbo.azure_assets', 'IT Owner LC') IS NULL
+    ALTER TABLE dbo.azure_assets ADD [IT Owner LC] AS CAST(LOWER([IT Owner]) AS NVARCHAR(320)) PERSISTED;
+IF COL_LENGTH('dbo.azure_assets', 'Cost Center Responsible LC') IS NULL
+    ALTER TABLE dbo.azure_assets ADD [Cost Center Responsible LC] AS CAST(LOWER([Cost Center Responsible]) AS NVARCHAR(320)) PERSISTED;
+GO
+IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE name = 'IX_azure_assets_it_owner_lc' AND object_id = OBJECT_ID('dbo.azure_assets'))
+    CREATE INDEX IX_azure_assets_it_owner_lc ON dbo.azure_assets ([IT Owner LC]);
+IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE name = 'IX_azure_assets_cc_responsible_lc' AND object_id = OBJECT_ID('dbo.azure_assets'))
+    CREATE INDEX IX_azure_assets_cc_responsible_lc ON dbo.azure_assets ([Cost Center Responsible LC]);
+GO
+
+-- ---------- aws_assets ----------
+IF COL_LENGTH('dbo.aws_assets', 'IT Owner LC') IS NULL
+    ALTER TABLE dbo.aws_assets ADD [IT Owner LC] AS CAST(LOWER([IT Owner]) AS NVARCHAR(320)) PERSISTED;
+IF COL_LENGTH('dbo.aws_assets', 'Cost Center Responsible LC') IS NULL
+    ALTER TABLE dbo.aws_assets ADD [Cost Center Responsible LC] AS CAST(LOWER([Cost Center Responsible]) AS NVARCHAR(320)) PERSISTED;
+GO
+IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE name = 'IX_aws_assets_it_owner_lc' AND object_id = OBJECT_ID('dbo.aws_assets'))
+    CREATE INDEX IX_aws_assets_it_owner_lc ON dbo.aws_assets ([IT Owner LC]);
+IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE name = 'IX_aws_assets_cc_responsible_lc' AND object_id = OBJECT_ID('dbo.aws_assets'))
+    CREATE INDEX IX_aws_assets_cc_responsible_lc ON dbo.aws_assets ([Cost Center Responsible LC]);
+GO
+
+-- ---------- gcp_assets ----------
+IF COL_LENGTH('dbo.gcp_assets', 'IT Owner LC') IS NULL
+    ALTER TABLE dbo.gcp_assets ADD [IT Owner LC] AS CAST(LOWER([IT Owner]) AS NVARCHAR(320)) PERSISTED;
+IF COL_LENGTH('dbo.gcp_assets', 'Cost Center Responsible LC') IS NULL
+    ALTER TABLE dbo.gcp_assets ADD [Cost Center Responsible LC] AS CAST(LOWER([Cost Center Responsible]) AS NVARCHAR(320)) PERSISTED;
+GO
+IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE name = 'IX_gcp_assets_it_owner_lc' AND object_id = OBJECT_ID('dbo.gcp_assets'))
+    CREATE INDEX IX_gcp_assets_it_owner_lc ON dbo.gcp_assets ([IT Owner LC]);
+IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE name = 'IX_gcp_assets_cc_responsible_lc' AND object_id = OBJECT_ID('dbo.gcp_assets'))
+    CREATE INDEX IX_gcp_assets_cc_responsible_lc ON dbo.gcp_assets ([Cost Center Responsible LC]);
+GO
+
+-- ---------- cost_center_approvals (review page) ----------
+IF COL_LENGTH('dbo.cost_center_approvals', 'new_cost_center_responsible_lc') IS NULL
+    ALTER TABLE dbo.cost_center_approvals ADD new_cost_center_responsible_lc AS CAST(LOWER(new_cost_center_responsible) AS NVARCHAR(320)) PERSISTED;
+GO
+IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE name = 'IX_cost_center_approvals_responsible_lc' AND object_id = OBJECT_ID('dbo.cost_center_approvals'))
+    CREATE INDEX IX_cost_center_approvals_responsible_lc
+        ON dbo.cost_center_approvals (new_cost_center_responsible_lc, last_review_date DESC);
+GO
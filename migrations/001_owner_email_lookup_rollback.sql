@@ -0,0 +1,15 @@
+-- Rollback for 001_owner_email_lookup.sql. Set OWNER_LOOKUP_COLUMNS=false in the app first.
+
+DROP INDEX IF EXISTS IX_azure_assets_it_owner_lc ON dbo.azure_assets;
+DROP INDEX IF EXISTS IX_azure_assets_cc_responsible_lc ON dbo.azure_assets;
+DROP INDEX IF EXISTS IX_aws_assets_it_owner_lc ON dbo.aws_assets;
+DROP INDEX IF EXISTS IX_aws_assets_cc_responsible_lc ON dbo.aws_assets;
+DROP INDEX IF EXISTS IX_gcp_assets_it_owner_lc ON dbo.gcp_assets;
+DROP INDEX IF EXISTS IX_gcp_assets_cc_responsible_lc ON dbo.gcp_assets;
+DROP INDEX IF EXISTS IX_cost_center_approvals_responsible_lc ON dbo.cost_center_approvals;
+GO
+ALTER TABLE dbo.azure_assets DROP COLUMN IF EXISTS [IT Owner LC], [Cost Center Responsible LC];
+ALTER TABLE dbo.aws_assets DROP COLUMN IF EXISTS [IT Owner LC], [Cost Center Responsible LC];
+ALTER TABLE dbo.gcp_assets DROP COLUMN IF EXISTS [IT Owner LC], [Cost Center Responsible LC];
+ALTER TABLE dbo.cost_center_approvals DROP COLUMN IF EXISTS new_cost_center_responsible_lc;
+GO
@@ -0,0 +1,141 @@
+import os
+import sys
+import threading
+import time
+from bisect import bisect_left
+from dotenv import load_dotenv
+from status import get_sql_connection
+
+# ---------- LOAD ENV ----------
+load_dotenv()
+
+# it_owner_reference is small and read on every IT owner keystroke → keep it in memory
+IT_OWNER_INDEX_REFRESH = int(os.getenv("IT_OWNER_INDEX_REFRESH", "300"))   # seconds, 0 = load once
+IT_OWNER_TYPEAHEAD_LIMIT = int(os.getenv("IT_OWNER_TYPEAHEAD_LIMIT", "10"))
+IT_OWNER_TYPEAHEAD_MAX = 50
+
+
+class ITOwnerIndex:
+    """
+    In-process copy of it_owner_reference.
+
+    Exact lookups hit a dict keyed by lower-cased email (same matching as the
+    case-insensitive [IT Owner] = ? it replaces); typeahead does a binary search
+    over the sorted keys. Refreshes build a new snapshot and swap it in with one
+    assignment, so readers never see a half-loaded index. A failed refresh keeps
+    the previous snapshot.
+    """
+
+    def __init__(self, load):
+        self._load = load
+        self._snapshot = None           # ({email_lc: (email, wom)}, [sorted email_lc])
+        self._load_lock = threading.Lock()
+        self.loaded_at = None
+        self.refresh_seconds = None
+        self.refresh_errors = 0
+
+    @property
+    def ready(self):
+        return self._snapshot is not None
+
+    def refresh(self):
+        start = time.perf_counter()
+        by_email = {}
+        for email, wom in self._load():
+            if email:
+                email = email.strip()
+                by_email.setdefault(email.lower(), (email, wom))
+        self._snapshot = (by_email, sorted(by_email))
+        self.refresh_seconds = time.perf_counter() - start
+        self.loaded_at = time.time()
+        return len(by_email)
+
+    def _current(self):
+        """Snapshot, loading it on first use (one loader at a time)."""
+        snapshot = self._snapshot
+        if snapshot is None:
+            with self._load_lock:
+                if self._snapshot is None:
+                    self.refresh()
+                snapshot = self._snapshot
+        return snapshot
+
+    def wom(self, email):
+        """WOM of one IT owner, or None when unknown."""
+        entry = self._current()[0].get((email or '').strip().lower())
+        return entry[1] if entry else None
+
+    def woms(self, emails):
+        """{lower-cased email: WOM} for the known owners among `emails`."""
+        by_email = self._current()[0]
+        found = {}
+        for email in emails:
+            key = (email or '').strip().lower()
+            if key in by_email:
+                found[key] = by_email[key][1]
+        return found
+
+    def search(self, prefix, limit=IT_OWNER_TYPEAHEAD_LIMIT):
+        """First `limit` owners (alphabetical) whose email starts with `prefix`."""
+        prefix = (prefix or '').strip().lower()
+        if not prefix:
+            return []
+        by_email, keys = self._current()
+        matches = []
+        for i in range(bisect_left(keys, prefix), len(keys)):
+            key = keys[i]
+            if not key.startswith(prefix) or len(matches) >= limit:
+                break
+            email, wom = by_email[key]
+            matches.append({'it_owner': email, 'it_owner_wom': wom})
+        return matches
+
+    def start_refresh(self, interval):
+        """Daemon thread reloading the index every `interval` seconds."""
+        def loop():
+            while True:
+                time.sleep(interval)
+                try:
+                    self.refresh()
+                except Exception as e:
+                    self.refresh_errors += 1
+                    print(f"❌ IT owner index refresh failed: {e}")
+
+        thread = threading.Thread(target=loop, name="it-owner-refresh", daemon=True)
+        thread.start()
+        return thread
+
+    def stats(self):
+        snapshot = self._snapshot
+        rows = len(snapshot[0]) if snapshot else 0
+        return {
+            'rows': rows,
+            'loaded_at': self.loaded_at,
+            'refresh_seconds': round(self.refresh_seconds, 3) if self.refresh_seconds is not None else None,
+            'refresh_errors': self.refresh_errors,
+            'approx_bytes': _approx_size(snapshot) if snapshot else 0,
+        }
+
+
+def _approx_size(snapshot):
+    """Shallow sizes of the containers plus every key/value string (shared strings counted once)."""
+    by_email, keys = snapshot
+    total = sys.getsizeof(by_email) + sys.getsizeof(keys)
+    for key, entry in by_email.items():
+        total += sys.getsizeof(key) + sys.getsizeof(entry) + sum(sys.getsizeof(v) for v in entry)
+    return total
+
+
+def load_it_owner_reference():
+    conn = get_sql_connection()
+    try:
+        cursor = conn.cursor()
+        cursor.execute("SELECT [IT Owner], [IT Owner WOM] FROM it_owner_reference")
+        rows = cursor.fetchall()
+        cursor.close()
+    finally:
+        conn.close()
+    return rows
+
+
+it_owner_index = ITOwnerIndex(load_it_owner_reference)
@@ -0,0 +1,157 @@
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Mapping
+
+# ---------- PLATFORM SCHEMA REGISTRY ----------
+# Physical names of the per-platform columns that differ between asset tables
+PLATFORM_COLUMNS = {
+    'Azure': {
+        'table': 'azure_assets',
+        'id': 'Subscription ID',
+        'name': 'Subscription Name',
+        'environment': 'Type of Subscription',
+        'person_related': 'Person-related'
+    },
+    'AWS': {
+        'table': 'aws_assets',
+        'id': 'Account ID',
+        'name': 'Account Name',
+        'environment': 'Type of Account',
+        'person_related': 'Person-related'
+    },
+    'GCP': {
+        'table': 'gcp_assets',
+        'id': 'Project ID',
+        'name': 'Project Name',
+        'environment': 'Type of Project',
+        'person_related': 'Personal Related'
+    }
+}
+
+# Editable fields on the details page:
+# UI label → (proposed_changes column prefix, asset column; lower-case = logical name)
+EDITABLE_FIELDS = {
+    'I-SC': ('i_sc', 'I-SC'),
+    'A-SC': ('a_sc', 'A-SC'),
+    'C-SC': ('c_sc', 'C-SC'),
+    'Organizational Unit': ('organizational_unit', 'Management Group (OE)'),
+    'Type of Environment': ('environment', 'environment'),
+    'Cost Center': ('cost_center', 'Cost Center'),
+    'IT Owner': ('it_owner', 'IT Owner'),
+    'Person-related': ('person_related', 'person_related')
+}
+
+# Cost center changes go through cost_center_approvals instead of a direct update
+APPROVAL_GATED_FIELDS = ('cost_center',)
+
+# Columns each code path reads from the asset tables. Lower-case entries are
+# logical names resolved through PLATFORM_COLUMNS; the rest are shared columns.
+COLUMN_SETS = {
+    # /components/metadetails
+    'details': ['id', 'name', 'environment', 'person_related',
+                'I-SC', 'A-SC', 'C-SC', 'Management Group (OE)',
+                'Cost Center', 'Cost Center Name', 'Cost Center Responsible', 'Cost Center Responsible WOM',
+                'IT Owner', 'IT Owner WOM', 'Last Review Date'],
+    # /save_proposed_changes (originals of the editable fields + owners for cache invalidation)
+    'save': ['id', 'environment', 'person_related',
+             'I-SC', 'A-SC', 'C-SC', 'Management Group (OE)', 'Cost Center', 'IT Owner',
+             'Cost Center Responsible'],
+    # /submit_proposed_changes (change detection + approval row)
+    'submit': ['id', 'name', 'Management Group (OE)',
+               'Cost Center', 'Cost Center Name', 'Cost Center Responsible', 'Cost Center Responsible WOM',
+               'IT Owner', 'IT Owner WOM']
+}
+
+# proposed_changes columns read back by the details and submit paths
+PROPOSED_COLUMNS = [
+    'i_sc_proposed', 'a_sc_proposed', 'c_sc_proposed', 'organizational_unit_proposed',
+    'environment_proposed', 'cost_center_proposed', 'it_owner_proposed', 'person_related_proposed',
+    'cost_center_name_manual', 'cost_center_responsible_manual', 'cost_center_responsible_wom_manual'
+]
+
+
+# ---------- PLATFORM DESCRIPTORS ----------
+@dataclass(frozen=True)
+class Platform:
+    """Everything the routes need to know about one platform's asset table."""
+    name: str
+    table: str
+    id_column: str
+    name_column: str
+    environment_column: str
+    person_related_column: str
+    editable_columns: Mapping[str, str]       # UI label → asset column
+    proposed_prefixes: Mapping[str, str]      # UI label → proposed_changes column prefix
+    direct_update_columns: Mapping[str, str]  # '<prefix>_proposed' → asset column (not approval-gated)
+    column_index: Mapping[str, str]           # normalized (stripped, lower-case) name → asset column
+    projections: Mapping[str, tuple]          # code path → (columns, SELECT ... WHERE id = ?)
+
+    def column(self, name):
+        """Case/whitespace-insensitive lookup of a known asset column, or None."""
+        return self.column_index.get(name.strip().lower())
+
+
+def _resolve(platform, column):
+    return PLATFORM_COLUMNS[platform].get(column, column)
+
+def _build_projections(platform):
+    """
+    Precompute, for every code path:
+    (columns, 'SELECT [a] AS [a], ... FROM [table] WHERE [id] = ?').
+    """
+    cols = PLATFORM_COLUMNS[platform]
+    projections = {}
+    for path, logical in COLUMN_SETS.items():
+        physical = tuple(dict.fromkeys(_resolve(platform, c) for c in logical))
+        # Explicit aliases pin the result-set names to the registry spelling
+        select_list = ', '.join(f"[{c}] AS [{c}]" for c in physical)
+        select = f"SELECT {select_list} FROM [{cols['table']}]"
+        projections[path] = (physical, f"{select} WHERE [{cols['id']}] = ?")
+    return MappingProxyType(projections)
+
+def _build_platform(platform):
+    cols = PLATFORM_COLUMNS[platform]
+    editable = {label: _resolve(platform, column) for label, (_, column) in EDITABLE_FIELDS.items()}
+    prefixes = {label: prefix for label, (prefix, _) in EDITABLE_FIELDS.items()}
+    direct = {
+        f"{prefix}_proposed": editable[label]
+        for label, prefix in prefixes.items() if prefix not in APPROVAL_GATED_FIELDS
+    }
+    known = {_resolve(platform, c) for path_cols in COLUMN_SETS.values() for c in path_cols}
+    return Platform(
+        name=platform,
+        table=cols['table'],
+        id_column=cols['id'],
+        name_column=cols['name'],
+        environment_column=cols['environment'],
+        person_related_column=cols['person_related'],
+        editable_columns=MappingProxyType(editable),
+        proposed_prefixes=MappingProxyType(prefixes),
+        direct_update_columns=MappingProxyType(direct),
+        column_index=MappingProxyType({c.strip().lower(): c for c in known}),
+        projections=_build_projections(platform)
+    )
+
+# Built once at import; read-only afterwards
+PLATFORMS = MappingProxyType({name: _build_platform(name) for name in PLATFORM_COLUMNS})
+
+_PROPOSED_SELECT = (
+    f"SELECT {', '.join(PROPOSED_COLUMNS)} FROM proposed_changes WHERE sub_id = ? AND platform = ?"
+)
+
+
+def get_platform(name):
+    """Descriptor for 'Azure' / 'AWS' / 'GCP', or None for anything else."""
+    return PLATFORMS.get(name)
+
+def columns_for(platform, path):
+    """Physical column names the given code path reads for this platform."""
+    return PLATFORMS[platform].projections[path][0]
+
+def select_by_id(platform, path):
+    """Projected single-row lookup; takes the platform ID as its only parameter."""
+    return PLATFORMS[platform].projections[path][1]
+
+def select_proposed():
+    """proposed_changes lookup by (sub_id, platform)."""
+    return _PROPOSED_SELECT
@@ -1,25 +1,175 @@
+// ================= LISTING STATE =================
+// Rows are fetched page by page from /api/metadata; sorting, filtering and
+// search all run server-side.
+const assetTable = document.getElementById("assetTable");
+const assetBody = document.getElementById("assetBody");
+const emptyRow = document.getElementById("emptyRow");
+const loadMoreBtn = document.getElementById("loadMoreBtn");
+const listingStatus = document.getElementById("listingStatus");
+const listingWarning = document.getElementById("listingWarning");
+
+const FACET_COLUMNS = ["platform", "status", "environment"];  // checkbox filters
+const TEXT_COLUMNS = ["id", "cost_center", "it_owner"];        // "contains" filters
+
+const urlPlatform = new URLSearchParams(window.location.search).get("platform");
+
+const listing = {
+  sort: "platform",
+  order: "asc",
+  filters: { platform: [], status: [], environment: [], id: "", cost_center: "", it_owner: "" },
+  search: "",
+  cursor: null,
+  hasMore: true,
+  loading: false,
+  requestId: 0
+};
+
+function buildQuery(withFacets) {
+  const params = new URLSearchParams();
+  const platforms = urlPlatform ? [urlPlatform] : listing.filters.platform;
+  platforms.forEach(p => params.append("platform", p));
+  ["status", "environment"].forEach(col => listing.filters[col].forEach(v => params.append(col, v)));
+  TEXT_COLUMNS.forEach(col => { if (listing.filters[col]) params.set(col, listing.filters[col]); });
+  if (listing.search) params.set("q", listing.search);
+  params.set("sort", listing.sort);
+  params.set("order", listing.order);
+  params.set("limit", assetTable.dataset.pageSize || "50");
+  if (listing.cursor) params.set("cursor", listing.cursor);
+  if (withFacets) params.set("facets", "1");
+  return params.toString();
+}
+
+function showWarning(message) {
+  listingWarning.textContent = message ? `⚠️ ${message}` : "";
+  listingWarning.style.display = message ? "block" : "none";
+}
+
+
+// ================= ROW RENDERING =================
+function makeCell(className, text, strong = false) {
+  const td = document.createElement("td");
+  if (className) td.className = className;
+  if (strong) {
+    const b = document.createElement("strong");
+    b.textContent = text;
+    td.appendChild(b);
+  } else {
+    td.textContent = text;
+  }
+  return td;
+}
+
+function renderRow(item) {
+  const tr = document.createElement("tr");
+  tr.className = "data-row";
+
+  const selectTd = document.createElement("td");
+  const checkbox = document.createElement("input");
+  checkbox.type = "checkbox";
+  checkbox.className = "row-selector";
+  selectTd.appendChild(checkbox);
+  tr.appendChild(selectTd);
+
+  tr.appendChild(makeCell(`platform ${item.platform.toLowerCase()}`, item.platform));
+  const statusCell = makeCell("status", item.status);
+  applyStatusColor(statusCell);
+  tr.appendChild(statusCell);
+  tr.appendChild(makeCell("id", item.id, true));
+  tr.appendChild(makeCell("environment", item.environment || "N/A"));
+  tr.appendChild(makeCell("costcenter", item.cost_center || "N/A"));
+  tr.appendChild(makeCell("itowner", item.it_owner || "N/A"));
+
+  const actionTd = document.createElement("td");
+  const detailsBtn = document.createElement("button");
+  detailsBtn.className = "expand-btn";
+  detailsBtn.textContent = "Details";
+  detailsBtn.addEventListener("click", () => {
+    const params = new URLSearchParams({ id: item.id, platform: item.platform });
+    window.location.href = `${assetTable.dataset.detailsUrl}?${params}`;
+  });
+  actionTd.appendChild(detailsBtn);
+  tr.appendChild(actionTd);
+
+  return tr;
+}
+
+
+// ================= PAGE LOADING =================
+function loadPage({ reset = false, withFacets = false } = {}) {
+  if (reset) {
+    listing.cursor = null;
+    listing.hasMore = true;
+    assetBody.querySelectorAll(".data-row").forEach(r => r.remove());
+    updateSelectAllUI();
+  }
+  if (!listing.hasMore || (listing.loading && !reset)) return Promise.resolve();
+
+  const requestId = ++listing.requestId;
+  listing.loading = true;
+  listingStatus.textContent = "Loading...";
+  loadMoreBtn.style.display = "none";
+
+  return fetch(`${assetTable.dataset.apiUrl}?${buildQuery(withFacets)}`)
+    .then(response => response.json().then(data => {
+      if (!response.ok) throw new Error(data.error || "Failed to load subscriptions");
+      return data;
+    }))
+    .then(data => {
+      if (requestId !== listing.requestId) return;  // a newer query replaced this one
+      // Platforms whose data could not be read are listed in data.warnings
+      showWarning(data.warnings && data.warnings.length ? data.warnings.join(" ") : null);
+      data.items.forEach(item => assetBody.appendChild(renderRow(item)));
+      listing.cursor = data.next_cursor;
+      listing.hasMore = Boolean(data.next_cursor);
+      if (data.facets) updateFilterOptions(data.facets);
+
+      const loaded = assetBody.querySelectorAll(".data-row").length;
+      emptyRow.style.display = loaded === 0 ? "" : "none";
+      listingStatus.textContent = loaded ? `${loaded} shown` : "";
+      loadMoreBtn.style.display = listing.hasMore ? "" : "none";
+    })
+    .catch(error => {
+      if (requestId !== listing.requestId) return;
+      console.error("Error loading subscriptions:", error);
+      listingStatus.textContent = "";
+      loadMoreBtn.style.display = listing.hasMore ? "" : "none";
+      showWarning("Subscriptions could not be loaded completely. Please try again.");
+    })
+    .finally(() => {
+      if (requestId === listing.requestId) listing.loading = false;
+    });
+}
+
+loadMoreBtn.addEventListener("click", () => loadPage());
+
+// Infinite scroll: fetch the next page when the footer comes into view
+if ("IntersectionObserver" in window) {
+  new IntersectionObserver(entries => {
+    if (entries.some(e => e.isIntersecting) && listing.cursor) loadPage();
+  }).observe(document.getElementById("listingFooter"));
+}
+
+
 // ================= EXPORT BUTTON LOGIC =================
 const exportBtn = document.getElementById("exportBtn");
-const checkboxes = document.querySelectorAll(".row-selector");
- 
-checkboxes.forEach(box => {
-  box.addEventListener("change", () => {
-    const selected = [...checkboxes].some(cb => cb.checked);
-    exportBtn.dataset.hasSelection = selected ? "true" : "false";
-  });
+
+assetBody.addEventListener("change", e => {
+  if (!e.target.classList.contains("row-selector")) return;
+  const selected = assetBody.querySelector(".row-selector:checked") !== null;
+  exportBtn.dataset.hasSelection = selected ? "true" : "false";
 });
- 
+
 exportBtn.addEventListener("click", () => {
   const selectedRows = document.querySelectorAll(".row-selector:checked");
- 
+
   if (selectedRows.length === 0) {
     alert("At least select one row to proceed.");
     exportBtn.dataset.hasSelection = "false";
     return;
   }
- 
+
   let csv = "Platform,Status,ID,Environment,Cost Center,IT Owner\n";
- 
+
   selectedRows.forEach(row => {
     const tr = row.closest("tr");
     const cells = tr.querySelectorAll("td");
@@ -32,7 +182,7 @@ exportBtn.addEventListener("click", () => {
       cells[6].innerText
     ].join(",") + "\n";
   });
- 
+
   const blob = new Blob([csv], { type: "text/csv" });
   const url = URL.createObjectURL(blob);
   const a = document.createElement("a");
@@ -43,172 +193,175 @@ exportBtn.addEventListener("click", () => {
   document.body.removeChild(a);
   URL.revokeObjectURL(url);
 });
- 
- 
-// ================= URL PLATFORM FILTER =================
-window.onload = function () {
-  const params = new URLSearchParams(window.location.search);
-  const selectedPlatform = params.get("platform");
- 
-  document.querySelectorAll(".data-row").forEach(row => {
-    const platformCell = row.querySelector(".platform");
-    row.style.display =
-      selectedPlatform &&
-      platformCell.textContent.trim().toLowerCase() !== selectedPlatform.toLowerCase()
-        ? "none"
-        : "";
+
+
+// ================= SORTING =================
+function updateSortIndicators() {
+  document.querySelectorAll("th[data-column]").forEach(th => {
+    const title = th.querySelector(".header-title");
+    title.dataset.sort = th.dataset.column === listing.sort ? listing.order : "";
+    title.textContent = title.textContent.replace(/ [▲▼]$/, "") +
+      (th.dataset.column === listing.sort ? (listing.order === "asc" ? " ▲" : " ▼") : "");
   });
-};
- 
- 
+}
+
+document.querySelectorAll("th[data-column] .header-title").forEach(title => {
+  title.style.cursor = "pointer";
+  title.addEventListener("click", () => {
+    const column = title.closest("th").dataset.column;
+    listing.order = listing.sort === column && listing.order === "asc" ? "desc" : "asc";
+    listing.sort = column;
+    updateSortIndicators();
+    loadPage({ reset: true });
+  });
+});
+
+
 // ================= FILTER SYSTEM =================
+function updateFilterOptions(facets) {
+  document.querySelectorAll("th[data-column]").forEach(th => {
+    const column = th.dataset.column;
+    if (!FACET_COLUMNS.includes(column)) return;
+    if (column === "platform" && urlPlatform) return;
+
+    const ul = th.querySelector(".filter-options");
+    ul.innerHTML = "";
+    (facets[column] || []).forEach(v => {
+      const li = document.createElement("li");
+      const label = document.createElement("label");
+      const cb = document.createElement("input");
+      cb.type = "checkbox";
+      cb.className = "filter-check";
+      cb.value = v;
+      cb.checked = listing.filters[column].includes(v);
+      label.appendChild(cb);
+      label.appendChild(document.createTextNode(` ${v}`));
+      li.appendChild(label);
+      ul.appendChild(li);
+    });
+  });
+}
+
 function initializeFilters() {
-  const rows = document.querySelectorAll("#assetBody .data-row");
- 
-  document.querySelectorAll(".filter-dropdown").forEach(dropdown => {
-    const filterIcon = dropdown.parentElement.querySelector(".filter-icon");
+  document.querySelectorAll("th[data-column]").forEach(th => {
+    const column = th.dataset.column;
+    const dropdown = th.querySelector(".filter-dropdown");
+    const filterIcon = th.querySelector(".filter-icon");
     const input = dropdown.querySelector(".filter-input");
     const clearBtn = dropdown.querySelector(".clear-filter");
- 
-    const newIcon = filterIcon.cloneNode(true);
-    const newInput = input.cloneNode(true);
-    filterIcon.replaceWith(newIcon);
-    input.replaceWith(newInput);
-    if (clearBtn) clearBtn.replaceWith(clearBtn.cloneNode(true));
- 
-    const columnKey = dropdown.closest("th")
-      .querySelector(".header-title")
-      .textContent.trim().toLowerCase().replace(/\s+/g, '');
- 
-    newIcon.addEventListener("click", e => {
+
+    if (column === "platform" && urlPlatform) {
+      th.querySelector(".filter-wrapper").style.display = "none";
+      return;
+    }
+
+    filterIcon.addEventListener("click", e => {
       e.stopPropagation();
+      const open = dropdown.style.display === "block";
       document.querySelectorAll(".filter-dropdown").forEach(d => d.style.display = "none");
-      dropdown.style.display = dropdown.style.display === "block" ? "none" : "block";
+      dropdown.style.display = open ? "none" : "block";
     });
- 
-    dropdown.addEventListener("change", () => {
-      const checked = [...dropdown.querySelectorAll(".filter-check:checked")]
-        .map(cb => cb.value.toLowerCase());
- 
-      rows.forEach(row => {
-        const cell = row.querySelector(`td.${columnKey}`);
-        row.style.display = checked.length === 0 || checked.includes(cell.textContent.trim().toLowerCase())
-          ? ""
-          : "none";
+
+    if (FACET_COLUMNS.includes(column)) {
+      // Text box narrows the option list; ticking options filters server-side
+      input.addEventListener("input", () => {
+        const term = input.value.trim().toLowerCase();
+        dropdown.querySelectorAll(".filter-options li").forEach(li => {
+          li.style.display = li.textContent.toLowerCase().includes(term) ? "" : "none";
+        });
       });
-    });
- 
-    dropdown.querySelector(".clear-filter")?.addEventListener("click", () => {
+      dropdown.addEventListener("change", e => {
+        if (!e.target.classList.contains("filter-check")) return;
+        listing.filters[column] = [...dropdown.querySelectorAll(".filter-check:checked")].map(cb => cb.value);
+        loadPage({ reset: true });
+      });
+    } else {
+      // Free-text "contains" filter, applied on Enter
+      input.addEventListener("keyup", e => {
+        if (e.key !== "Enter") return;
+        listing.filters[column] = input.value.trim();
+        dropdown.style.display = "none";
+        loadPage({ reset: true });
+      });
+    }
+
+    clearBtn?.addEventListener("click", () => {
       dropdown.querySelectorAll(".filter-check").forEach(cb => cb.checked = false);
-      rows.forEach(row => row.style.display = "");
+      input.value = "";
+      dropdown.querySelectorAll(".filter-options li").forEach(li => li.style.display = "");
+      listing.filters[column] = FACET_COLUMNS.includes(column) ? [] : "";
       dropdown.style.display = "none";
+      loadPage({ reset: true });
     });
   });
 }
- 
-function updateFilterOptions() {
-  const rows = document.querySelectorAll(".data-row");
- 
-  document.querySelectorAll(".filter-dropdown").forEach(dropdown => {
-    const columnClass = dropdown.closest("th")
-      .querySelector(".header-title")
-      .textContent.trim().toLowerCase().replace(/\s+/g, '');
- 
-    const values = new Set();
-    rows.forEach(row => {
-      const cell = row.querySelector(`td.${columnClass}`);
-      if (cell) values.add(cell.textContent.trim());
-    });
- 
-    const ul = dropdown.querySelector(".filter-options");
-    ul.innerHTML = "";
- 
-    [...values].sort().forEach(v => {
-      ul.innerHTML += `<li><label><input type="checkbox" class="filter-check" value="${v}"/> ${v}</label></li>`;
-    });
-  });
- 
-  initializeFilters();
-}
- 
- 
+
+
 // ================= SELECT ALL / UNSELECT ALL (FIXED) =================
+const selectAllBar = document.getElementById("selectAllBar");
+const selectAllBtn = document.getElementById("selectAllBtn");
+
+function updateSelectAllUI() {
+  const rowSelectors = [...document.querySelectorAll(".row-selector")];
+  const checkedCount = rowSelectors.filter(cb => cb.checked).length;
+
+  selectAllBar.style.display = checkedCount > 0 ? "flex" : "none";
+  selectAllBtn.textContent =
+    checkedCount === rowSelectors.length ? "Unselect All" : "Select All";
+}
+
 document.addEventListener("DOMContentLoaded", function () {
-  updateFilterOptions();
- 
-  const selectAllBar = document.getElementById("selectAllBar");
-  const selectAllBtn = document.getElementById("selectAllBtn");
-  const rowSelectors = document.querySelectorAll(".row-selector");
- 
-  function updateSelectAllUI() {
-    const checkedCount = [...rowSelectors].filter(cb => cb.checked).length;
- 
-    selectAllBar.style.display = checkedCount > 0 ? "flex" : "none";
-    selectAllBtn.textContent =
-      checkedCount === rowSelectors.length ? "Unselect All" : "Select All";
-  }
- 
-  rowSelectors.forEach(cb => {
-    cb.addEventListener("change", updateSelectAllUI);
+  initializeFilters();
+  updateSortIndicators();
+  loadPage({ withFacets: true });
+
+  assetBody.addEventListener("change", e => {
+    if (e.target.classList.contains("row-selector")) updateSelectAllUI();
   });
- 
+
   selectAllBtn.addEventListener("click", () => {
-    const allChecked = [...rowSelectors].every(cb => cb.checked);
+    const rowSelectors = [...document.querySelectorAll(".row-selector")];
+    const allChecked = rowSelectors.every(cb => cb.checked);
     rowSelectors.forEach(cb => cb.checked = !allChecked);
     updateSelectAllUI();
   });
- 
+
   document.addEventListener("click", e => {
     if (!e.target.closest(".filter-wrapper")) {
       document.querySelectorAll(".filter-dropdown").forEach(d => d.style.display = "none");
     }
   });
 });
- 
- 
+
+
 // ================= SEARCH =================
 document.addEventListener('DOMContentLoaded', function() {
   const searchInput = document.querySelector('.table-action-bar input');
-  const rows = document.querySelectorAll('tbody tr.data-row');
- 
+  if (!searchInput) return;
+
   searchInput.addEventListener('keyup', e => {
-    if (e.key === 'Enter') filter();
+    if (e.key === 'Enter') {
+      listing.search = searchInput.value.trim();
+      loadPage({ reset: true });
+    }
   });
- 
+
   searchInput.addEventListener('input', () => {
-    if (!searchInput.value.trim()) rows.forEach(r => r.style.display = "");
+    if (!searchInput.value.trim() && listing.search) {
+      listing.search = "";
+      loadPage({ reset: true });
+    }
   });
- 
-  function filter() {
-    const term = searchInput.value.toLowerCase();
-    rows.forEach(row => {
-      row.style.display = [...row.children]
-        .slice(1, -1)
-        .some(td => td.textContent.toLowerCase().includes(term))
-        ? ""
-        : "none";
-    });
-  }
 });
- 
- 
+
+
 // ================= STATUS COLORS =================
 function applyStatusColor(cell) {
   const t = cell.textContent.trim().toLowerCase();
   cell.className = "status";
- 
+
   if (t === "check") cell.classList.add("check");
   else if (t === "overdue") cell.classList.add("overdue");
   else if (t === "in-progress") cell.classList.add("inprogress");
   else if (t.includes("up")) cell.classList.add("upToDate");
 }
- 
-document.addEventListener("DOMContentLoaded", () => {
-  document.querySelectorAll(".status").forEach(cell => {
-    applyStatusColor(cell);
-    new MutationObserver(() => applyStatusColor(cell))
-      .observe(cell, { childList: true, subtree: true });
-  });
-});
- 
- 
\ No newline at end of file
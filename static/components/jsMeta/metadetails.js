@@ -248,6 +248,28 @@ function fetchCostCenterDetails(code) {
     const email = itOwnerInput.value.trim();
     if (email) fetchItOwnerDetails(email);
   });
+  // Typeahead suggestions from the in-memory owner index (debounced)
+  let suggestTimer = null;
+  itOwnerInput.addEventListener("input", () => {
+    clearTimeout(suggestTimer);
+    const prefix = itOwnerInput.value.trim();
+    if (prefix.length < 3) return;
+    suggestTimer = setTimeout(() => {
+      fetch('/search_it_owners?q=' + encodeURIComponent(prefix))
+        .then(response => response.json())
+        .then(data => {
+          const list = document.getElementById("it_owner_suggestions");
+          list.innerHTML = "";
+          (data.results || []).forEach(owner => {
+            const option = document.createElement("option");
+            option.value = owner.it_owner;
+            option.label = owner.it_owner_wom || "";
+            list.appendChild(option);
+          });
+        })
+        .catch(error => console.error("Error fetching IT Owner suggestions:", error));
+    }, 200);
+  });
 //=== Cost Center Triggers ===
   costCenterInput.addEventListener("keydown", e => {
     if (e.key === "Enter") {
@@ -1,6 +1,9 @@
-from datetime import datetime
+import contextvars
+import threading
+import time
 import pyodbc
 from dotenv import load_dotenv
+from instrumentation import span, statement_label
 import os
 
 # ---------- LOAD ENV ----------
@@ -12,45 +15,321 @@ username = os.getenv("DB_USERNAME")
 password = os.getenv("DB_PASSWORD")
 driver = "{ODBC Driver 18 for SQL Server}"
 
-# ---------- HELPER FUNCTION TO GET CONNECTION ----------
-def get_sql_connection():
-    conn = pyodbc.connect(
+# Pool settings (one pool per gunicorn worker process, shared by its threads)
+POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "10"))
+POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))       # seconds to wait for a free connection
+POOL_RECYCLE = float(os.getenv("DB_POOL_RECYCLE", "1800"))     # max connection lifetime in seconds
+POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() == "true"
+
+# Use the indexed lower-case owner columns from migrations/001_owner_email_lookup.sql.
+# Off by default so an un-migrated database keeps working; turn it on once the migration ran.
+OWNER_LOOKUP_COLUMNS = os.getenv("OWNER_LOOKUP_COLUMNS", "false").lower() == "true"
+
+
+def _connect():
+    return pyodbc.connect(
         f"DRIVER={driver};SERVER={server};DATABASE={database};UID={username};PWD={password};"
         "Encrypt=yes;TrustServerCertificate=no;Connection Timeout=30;"
     )
-    return conn
 
-# ---------- MAIN FUNCTION ----------
-def get_subscription_status(sub_id, platform):
+
+# ---------- PER-REQUEST DB CALL TRACKING ----------
+class DBCallCounter:
+    """Counts connection checkouts and executed statements for one request."""
+
+    def __init__(self):
+        self.connections = 0
+        self.queries = 0
+        self._lock = threading.Lock()
+
+    def add(self, connections=0, queries=0):
+        with self._lock:
+            self.connections += connections
+            self.queries += queries
+
+
+_db_call_counter = contextvars.ContextVar("db_call_counter", default=None)
+
+def start_db_call_tracking():
+    """Attach a fresh counter to the current context (call once per request)."""
+    counter = DBCallCounter()
+    _db_call_counter.set(counter)
+    return counter
+
+def get_db_call_counter():
+    return _db_call_counter.get()
+
+def _track(connections=0, queries=0):
+    counter = _db_call_counter.get()
+    if counter is not None:
+        counter.add(connections, queries)
+
+
+class TrackedCursor:
+    """pyodbc cursor wrapper that counts and times execute() calls for the current request."""
+
+    def __init__(self, raw):
+        self._raw = raw
+
+    def execute(self, sql, *args, **kwargs):
+        _track(queries=1)
+        with span('db', statement_label(sql)):
+            self._raw.execute(sql, *args, **kwargs)
+        return self
+
+    def executemany(self, sql, *args, **kwargs):
+        _track(queries=1)
+        with span('db', statement_label(sql)):
+            self._raw.executemany(sql, *args, **kwargs)
+        return self
+
+    def fetchone(self):
+        with span('db_fetch'):
+            return self._raw.fetchone()
+
+    def fetchall(self):
+        with span('db_fetch'):
+            return self._raw.fetchall()
+
+    def __iter__(self):
+        return iter(self._raw)
+
+    def __getattr__(self, name):
+        return getattr(self._raw, name)
+
+    def __setattr__(self, name, value):
+        # Driver options such as fast_executemany belong on the raw cursor
+        if name == '_raw':
+            object.__setattr__(self, name, value)
+        else:
+            setattr(self._raw, name, value)
+
+
+# ---------- CONNECTION POOL ----------
+class PooledConnection:
+    """
+    Thin wrapper around a pyodbc connection borrowed from the pool.
+    close() hands the connection back to the pool instead of closing it,
+    so existing `conn.close()` call sites keep working unchanged.
+    """
+
+    def __init__(self, pool, raw, created_at):
+        self._pool = pool
+        self._raw = raw
+        self.created_at = created_at
+        self._returned = False
+
+    def cursor(self):
+        return TrackedCursor(self._raw.cursor())
+
+    def commit(self):
+        self._raw.commit()
+
+    def rollback(self):
+        self._raw.rollback()
+
+    def close(self):
+        if self._returned:
+            return
+        self._returned = True
+        self._pool._release(self._raw, self.created_at)
+
+    def __getattr__(self, name):
+        return getattr(self._raw, name)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+class ConnectionPool:
     """
-    Determine subscription status based on approvals and proposed changes.
-    Skips overdue for now.
+    Process-wide, thread-safe pool of pyodbc connections.
+    - at most `size` connections are open at once; extra callers wait up to `timeout`
+    - idle connections are health-checked on checkout (SELECT 1) when pre_ping is on
+    - connections older than `recycle` seconds are closed and replaced
     """
-    conn = get_sql_connection()
-    cursor = conn.cursor()
 
-    try:
-        # 1️⃣ Check for pending cost center approvals → "Check"
-        cursor.execute(
-            "SELECT 1 FROM cost_center_approvals WHERE subscription_id=? AND platform=? AND status='Pending'",
-            (sub_id, platform)
-        )
-        if cursor.fetchone():
-            return "Check"
+    def __init__(self, connect, size=POOL_SIZE, timeout=POOL_TIMEOUT, recycle=POOL_RECYCLE, pre_ping=POOL_PRE_PING):
+        self._connect = connect
+        self.size = size
+        self.timeout = timeout
+        self.recycle = recycle
+        self.pre_ping = pre_ping
+
+        self._idle = []            # list of (raw_connection, created_at)
+        self._in_use = 0
+        self._cond = threading.Condition()
+
+        # Metrics
+        self._checkouts = 0
+        self._created = 0
+        self._recycled = 0
+        self._ping_failures = 0
+        self._timeouts = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+
+    def _is_expired(self, created_at):
+        return self.recycle > 0 and time.monotonic() - created_at > self.recycle
+
+    def _is_alive(self, raw):
+        try:
+            cursor = raw.cursor()
+            cursor.execute("SELECT 1")
+            cursor.fetchone()
+            cursor.close()
+            return True
+        except pyodbc.Error:
+            return False
+
+    @staticmethod
+    def _discard(raw):
+        try:
+            raw.close()
+        except pyodbc.Error:
+            pass
+
+    def acquire(self):
+        # Pool wait + validation + (re)connect all count as db_connect time
+        with span('db_connect'):
+            return self._acquire()
+
+    def _acquire(self):
+        start = time.monotonic()
+        with self._cond:
+            while not self._idle and self._in_use >= self.size:
+                remaining = self.timeout - (time.monotonic() - start)
+                if remaining <= 0:
+                    self._timeouts += 1
+                    raise TimeoutError(f"No database connection available after {self.timeout}s")
+                self._cond.wait(remaining)
+
+            waited = time.monotonic() - start
+            self._wait_total += waited
+            self._wait_max = max(self._wait_max, waited)
+            self._checkouts += 1
+            self._in_use += 1
+            candidate = self._idle.pop() if self._idle else None
+
+        # Validate / open outside the lock so slow network calls don't block other threads
+        try:
+            if candidate:
+                raw, created_at = candidate
+                if self._is_expired(created_at):
+                    self._discard(raw)
+                    with self._cond:
+                        self._recycled += 1
+                    candidate = None
+                elif self.pre_ping and not self._is_alive(raw):
+                    self._discard(raw)
+                    with self._cond:
+                        self._ping_failures += 1
+                    candidate = None
+
+            if not candidate:
+                raw, created_at = self._connect(), time.monotonic()
+                with self._cond:
+                    self._created += 1
+        except Exception:
+            with self._cond:
+                self._in_use -= 1
+                self._cond.notify()
+            raise
+
+        _track(connections=1)
+        return PooledConnection(self, raw, created_at)
+
+    def _release(self, raw, created_at):
+        # Never hand a connection with an open transaction to the next borrower
+        try:
+            raw.rollback()
+            healthy = True
+        except pyodbc.Error:
+            healthy = False
+
+        with self._cond:
+            self._in_use -= 1
+            if healthy and not self._is_expired(created_at):
+                self._idle.append((raw, created_at))
+                raw = None
+            elif healthy:
+                self._recycled += 1
+            self._cond.notify()
+
+        if raw is not None:
+            self._discard(raw)
+
+    def dispose(self):
+        """Close every idle connection (e.g. after fork or on shutdown)."""
+        with self._cond:
+            idle, self._idle = self._idle, []
+        for raw, _ in idle:
+            self._discard(raw)
+
+    def stats(self):
+        with self._cond:
+            return {
+                'size': self.size,
+                'in_use': self._in_use,
+                'idle': len(self._idle),
+                'checkouts': self._checkouts,
+                'created': self._created,
+                'recycled': self._recycled,
+                'ping_failures': self._ping_failures,
+                'timeouts': self._timeouts,
+                'wait_time_total': round(self._wait_total, 6),
+                'wait_time_avg': round(self._wait_total / self._checkouts, 6) if self._checkouts else 0.0,
+                'wait_time_max': round(self._wait_max, 6),
+            }
 
-        # 2️⃣ If proposed changes exist without pending approval → "In-Progress"
-        cursor.execute(
-            "SELECT 1 FROM proposed_changes WHERE sub_id=? AND platform=?",
-            (sub_id, platform)
-        )
-        if cursor.fetchone():
-            return "In-Progress"
 
-        # 3️⃣ Default → "Up to date"
-        return "Up to date"
+pool = ConnectionPool(_connect)
 
-    finally:
-        conn.close()
+
+# ---------- HELPER FUNCTION TO GET CONNECTION ----------
+def get_sql_connection():
+    """Borrow a connection from the process-wide pool; conn.close() returns it."""
+    return pool.acquire()
+
+
+def get_pool_stats():
+    return pool.stats()
+
+# ---------- OWNER LOOKUPS ----------
+# (column, persisted lower-case computed column)
+ASSET_OWNER_COLUMNS = [('IT Owner', 'IT Owner LC'), ('Cost Center Responsible', 'Cost Center Responsible LC')]
+APPROVER_COLUMNS = [('new_cost_center_responsible', 'new_cost_center_responsible_lc')]
+
+def owner_email_predicate(emails, columns=ASSET_OWNER_COLUMNS):
+    """
+    WHERE fragment (plus params) matching any of `columns` against the given emails.
+    Emails are lower-cased here and compared with the indexed LC columns, so the
+    filter is an index seek instead of a LOWER(column) scan.
+    """
+    emails = [e.lower() for e in emails]
+    placeholders = ','.join('?' for _ in emails)
+    parts = [
+        f"[{lc_column}] IN ({placeholders})" if OWNER_LOOKUP_COLUMNS
+        else f"LOWER([{column}]) IN ({placeholders})"  # legacy, un-migrated schema
+        for column, lc_column in columns
+    ]
+    return ' OR '.join(parts), emails * len(columns)
+
+# ---------- ROW HELPERS ----------
+def row_mapper(cursor):
+    """
+    Build a row → dict function for the cursor's current result set.
+    Column names are read from cursor.description once, not per row.
+    """
+    columns = tuple(col[0] for col in cursor.description)
+    return lambda row: dict(zip(columns, row))
+
+def rows_to_dicts(cursor, rows):
+    to_dict = row_mapper(cursor)
+    return [to_dict(row) for row in rows]
 
 def row_to_dict(cursor, row):
     """
@@ -60,4 +339,20 @@ def row_to_dict(cursor, row):
     if not row:
         return {}
     columns = [col[0] for col in cursor.description]
-    return dict(zip(columns, row))
\ No newline at end of file
+    return dict(zip(columns, row))
+
+def values_clause(rows, types=None):
+    """
+    Inline table for set-based statements: (VALUES (?, ?), (?, ?)) plus flat params.
+    `types` optionally CASTs each column (e.g. 'NVARCHAR(4000)') so a NULL in the
+    first row cannot pin the column to the wrong type. Callers keep
+    len(rows) * width under SQL Server's 2100-parameter limit.
+    """
+    width = len(rows[0])
+    markers = [f"CAST(? AS {t})" if t else '?' for t in (types or [None] * width)]
+    row_sql = '(' + ', '.join(markers) + ')'
+    return f"(VALUES {', '.join(row_sql for _ in rows)})", [v for row in rows for v in row]
+
+def chunked(items, size):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
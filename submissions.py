@@ -0,0 +1,396 @@
+import os
+from datetime import datetime
+from dotenv import load_dotenv
+from schema import PLATFORMS, PROPOSED_COLUMNS, EDITABLE_FIELDS, columns_for
+from status import get_sql_connection, values_clause, chunked
+from owners import it_owner_index
+from utility import fetch_cost_center_details, fetch_cost_center_details_bulk, normalize_cost_center
+
+# ---------- LOAD ENV ----------
+load_dotenv()
+
+# Subscriptions per bulk review-submit request
+REVIEW_BATCH_MAX = int(os.getenv("REVIEW_BATCH_MAX", "1000"))
+# Rows per set-based statement: the widest (approvals MERGE) binds 10 parameters
+# per row, SQL Server allows 2100 per statement and 1000 VALUES rows
+STATEMENT_CHUNK = 150
+
+TEXT = 'NVARCHAR(4000)'
+EMPTY_MARKERS = ('"', "'")
+# Azure/GCP store security classes with their letter prefix
+SC_PREFIXES = {'i_sc_proposed': 'I-', 'a_sc_proposed': 'A-', 'c_sc_proposed': 'C-'}
+SC_PREFIXED_PLATFORMS = ('Azure', 'GCP')
+# proposed_changes row written by /save_proposed_changes, in bind order
+PROPOSED_KEY_COLUMNS = ['sub_id', 'platform']
+PROPOSED_VALUE_COLUMNS = [
+    f"{prefix}_{kind}" for prefix, _ in EDITABLE_FIELDS.values() for kind in ('original', 'proposed')
+] + ['cost_center_name_manual', 'cost_center_responsible_manual', 'cost_center_responsible_wom_manual']
+PROPOSED_WRITE_COLUMNS = PROPOSED_KEY_COLUMNS + PROPOSED_VALUE_COLUMNS
+
+APPROVAL_COLUMNS = [
+    'platform', 'subscription_id', 'name', 'management_group',
+    'old_cost_center', 'old_cost_center_responsible',
+    'new_cost_center', 'new_cost_center_responsible', 'new_cost_center_name', 'it_owner'
+]
+
+
+class ReviewBatchError(ValueError):
+    """The batch as a whole is malformed (not a list, empty, too large)."""
+
+
+# ---------- PER-SUBSCRIPTION PLAN ----------
+def _clean(value):
+    value = (value or '').strip()
+    return '' if value in EMPTY_MARKERS else value
+
+def plan_submission(descriptor, original, proposed):
+    """
+    What submitting the saved proposed changes does to one asset row.
+    Returns {'updates': {column: value} (non-gated fields), 'new_it_owner', 'new_cost_center'}.
+    """
+    updates, new_it_owner, new_cost_center = {}, None, None
+    if proposed:
+        old_it_owner = (original.get('IT Owner') or '').strip()
+        for key, column in descriptor.direct_update_columns.items():
+            value = _clean(proposed.get(key))
+            if not value:
+                continue
+            prefix = SC_PREFIXES.get(key)
+            if prefix and descriptor.name in SC_PREFIXED_PLATFORMS and not value.startswith(prefix):
+                value = f"{prefix}{value}"
+            updates[column] = value
+            if column == 'IT Owner' and value != old_it_owner:
+                new_it_owner = value
+
+        cost_center = _clean(proposed.get('cost_center_proposed'))
+        if cost_center and cost_center != (original.get('Cost Center') or '').strip():
+            new_cost_center = cost_center
+    return {'updates': updates, 'new_it_owner': new_it_owner, 'new_cost_center': new_cost_center}
+
+def cost_center_approval_fields(cc_data, proposed):
+    """
+    (responsible, responsible WOM, name) for a changed cost center, from the API
+    record or else the manual fields (responsible and WOM both required).
+    Returns None when neither source has them.
+    """
+    if cc_data:
+        responsible = f"{cc_data['Responsible'].lower()}@bosch.com" if cc_data.get("Responsible") else None
+        name = f"{(cc_data.get('Name4') or '').strip()} {(cc_data.get('Name3') or '').strip()}".strip()
+        department = (cc_data.get("Department") or '').strip()
+        if department:
+            name = f"{name} ({department})"
+        return responsible, cc_data.get("ResponsibleOrgOffice"), name
+
+    manual_responsible = (proposed.get('cost_center_responsible_manual') or '').strip()
+    manual_wom = (proposed.get('cost_center_responsible_wom_manual') or '').strip()
+    if manual_responsible and manual_wom:
+        return manual_responsible, manual_wom, (proposed.get('cost_center_name_manual') or '').strip()
+    return None
+
+def approval_row(descriptor, sub_id, original, updates, new_cost_center, responsible, name):
+    """Values for APPROVAL_COLUMNS; management group and IT owner reflect this submit's updates."""
+    return (
+        descriptor.name,
+        sub_id,
+        original.get(descriptor.name_column, sub_id),
+        updates.get('Management Group (OE)', original.get('Management Group (OE)')),
+        original.get('Cost Center'),
+        original.get('Cost Center Responsible'),
+        new_cost_center,
+        responsible,
+        name,
+        updates.get('IT Owner', original.get('IT Owner'))
+    )
+
+
+# ---------- SET-BASED STATEMENTS ----------
+def load_rows(cursor, platform, sub_ids):
+    """{sub_id: (original, proposed or {})} for the given IDs of one platform."""
+    descriptor = PLATFORMS[platform]
+    asset_columns = columns_for(platform, 'submit')
+    select_list = ', '.join(
+        [f"a.[{c}] AS [{c}]" for c in asset_columns] +
+        [f"p.[{c}] AS [{c}]" for c in PROPOSED_COLUMNS] +
+        ["p.sub_id AS proposed_sub_id"]
+    )
+    loaded = {}
+    for chunk in chunked(sub_ids, STATEMENT_CHUNK):
+        values_sql, params = values_clause([(sub_id,) for sub_id in chunk], [TEXT])
+        cursor.execute(f"""
+            SELECT {select_list}
+            FROM [{descriptor.table}] a
+            JOIN {values_sql} AS v(sub_id) ON a.[{descriptor.id_column}] = v.sub_id
+            LEFT JOIN proposed_changes p ON p.sub_id = v.sub_id AND p.platform = ?
+        """, params + [platform])
+        columns = [col[0] for col in cursor.description]
+        split = len(asset_columns)
+        for row in cursor.fetchall():
+            original = dict(zip(columns[:split], row[:split]))
+            proposed = dict(zip(PROPOSED_COLUMNS, row[split:-1])) if row[-1] is not None else {}
+            # IDs compare case-insensitively in SQL Server
+            loaded[str(original[descriptor.id_column]).lower()] = (original, proposed)
+    return loaded
+
+def _update_assets(cursor, platform, rows, today_str):
+    """
+    One UPDATE per chunk: every direct column plus [IT Owner WOM] and [Last Review Date].
+    NULL in the VALUES row means "keep the current value".
+    """
+    descriptor = PLATFORMS[platform]
+    columns = list(descriptor.direct_update_columns.values()) + ['IT Owner WOM']
+    set_clause = ', '.join(f"[{c}] = COALESCE(v.[{c}], a.[{c}])" for c in columns)
+    for chunk in chunked(rows, STATEMENT_CHUNK):
+        values_sql, params = values_clause(
+            [(sub_id, *(updates.get(c) for c in columns)) for sub_id, updates in chunk],
+            [TEXT] * (len(columns) + 1)
+        )
+        cursor.execute(f"""
+            UPDATE a
+            SET {set_clause}, [Last Review Date] = ?
+            FROM [{descriptor.table}] a
+            JOIN {values_sql} AS v(sub_id, {', '.join(f'[{c}]' for c in columns)})
+              ON a.[{descriptor.id_column}] = v.sub_id
+        """, [today_str] + params)
+
+def upsert_approvals(cursor, rows, today_str):
+    """MERGE pending cost_center_approvals rows (one per subscription) from APPROVAL_COLUMNS tuples."""
+    updates = ', '.join(f"{c} = source.{c}" for c in APPROVAL_COLUMNS if c != 'subscription_id')
+    for chunk in chunked(rows, STATEMENT_CHUNK):
+        values_sql, params = values_clause(chunk, [TEXT] * len(APPROVAL_COLUMNS))
+        cursor.execute(f"""
+            MERGE cost_center_approvals AS target
+            USING {values_sql} AS source({', '.join(APPROVAL_COLUMNS)})
+            ON target.subscription_id = source.subscription_id AND target.status = 'Pending'
+            WHEN MATCHED THEN
+                UPDATE SET {updates}, last_review_date = ?
+            WHEN NOT MATCHED THEN
+                INSERT ({', '.join(APPROVAL_COLUMNS)}, last_review_date, status)
+                VALUES ({', '.join(f'source.{c}' for c in APPROVAL_COLUMNS)}, ?, 'Pending');
+        """, params + [today_str, today_str])
+
+def _build_proposed_upsert():
+    """
+    MERGE binding every value once through a one-row VALUES source. A matched row is
+    only rewritten when some value differs (NULL-safe via EXCEPT), so re-saving an
+    unchanged form costs a read, not a write.
+    """
+    source_row = ', '.join(f"CAST(? AS {TEXT})" for _ in PROPOSED_WRITE_COLUMNS)
+    source_cols = ', '.join(f"source.{c}" for c in PROPOSED_VALUE_COLUMNS)
+    target_cols = ', '.join(f"target.{c}" for c in PROPOSED_VALUE_COLUMNS)
+    return f"""
+        MERGE proposed_changes AS target
+        USING (VALUES ({source_row})) AS source({', '.join(PROPOSED_WRITE_COLUMNS)})
+        ON target.sub_id = source.sub_id AND target.platform = source.platform
+        WHEN MATCHED AND EXISTS (SELECT {source_cols} EXCEPT SELECT {target_cols}) THEN
+            UPDATE SET {', '.join(f"{c} = source.{c}" for c in PROPOSED_VALUE_COLUMNS)}
+        WHEN NOT MATCHED THEN
+            INSERT ({', '.join(PROPOSED_WRITE_COLUMNS)})
+            VALUES ({', '.join(f"source.{c}" for c in PROPOSED_WRITE_COLUMNS)});
+    """
+
+PROPOSED_UPSERT = _build_proposed_upsert()
+
+def upsert_proposed_changes(cursor, rows):
+    """
+    Upsert proposed_changes rows (dicts keyed by PROPOSED_WRITE_COLUMNS).
+    Several rows go out as one parameter array (fast_executemany).
+    Returns the number of rows written (unchanged rows are skipped), or -1 when the
+    driver cannot tell (batched).
+    """
+    params = [tuple(row.get(c) for c in PROPOSED_WRITE_COLUMNS) for row in rows]
+    if len(params) == 1:
+        cursor.execute(PROPOSED_UPSERT, params[0])
+        return cursor.rowcount
+    cursor.fast_executemany = True
+    cursor.executemany(PROPOSED_UPSERT, params)
+    return -1
+
+def enrich_queued_approval(platform, sub_id, new_cost_center, proposed):
+    """
+    Background half of asynchronous submit enrichment. Resolves the cost center, then
+    fills in the queued approval row's responsible/name. When nothing resolves it, the
+    row is dropped, leaving the change in proposed_changes as a synchronous miss would.
+    Returns True if the row was filled in.
+    """
+    fields = cost_center_approval_fields(fetch_cost_center_details(new_cost_center), proposed)
+    resolved = bool(fields and fields[0])
+    conn = get_sql_connection()
+    try:
+        cursor = conn.cursor()
+        match = """
+            WHERE subscription_id = ? AND platform = ? AND status = 'Pending'
+              AND new_cost_center = ? AND new_cost_center_responsible IS NULL
+        """
+        if resolved:
+            cursor.execute(f"""
+                UPDATE cost_center_approvals
+                SET new_cost_center_responsible = ?, new_cost_center_name = ?
+                {match}
+            """, (fields[0], fields[2], sub_id, platform, new_cost_center))
+        else:
+            cursor.execute(f"DELETE FROM cost_center_approvals {match}", (sub_id, platform, new_cost_center))
+        conn.commit()
+        cursor.close()
+    finally:
+        conn.close()
+    return resolved
+
+def queued_approvals(limit):
+    """
+    Up to `limit` pending approval rows still waiting for asynchronous enrichment
+    (responsible not filled in yet), with the manual fields saved for them:
+    [(platform, sub_id, new_cost_center, proposed, owners)].
+    """
+    conn = get_sql_connection()
+    try:
+        cursor = conn.cursor()
+        cursor.execute("""
+            SELECT TOP (?) a.platform, a.subscription_id, a.new_cost_center,
+                   a.old_cost_center_responsible, a.it_owner,
+                   p.cost_center_name_manual, p.cost_center_responsible_manual,
+                   p.cost_center_responsible_wom_manual
+            FROM cost_center_approvals a
+            LEFT JOIN proposed_changes p ON p.sub_id = a.subscription_id AND p.platform = a.platform
+            WHERE a.status = 'Pending' AND a.new_cost_center_responsible IS NULL
+        """, (limit,))
+        rows = cursor.fetchall()
+        cursor.close()
+    finally:
+        conn.close()
+    return [
+        (platform, sub_id, new_cost_center,
+         {'cost_center_name_manual': name, 'cost_center_responsible_manual': responsible,
+          'cost_center_responsible_wom_manual': wom},
+         (old_responsible, it_owner))
+        for platform, sub_id, new_cost_center, old_responsible, it_owner, name, responsible, wom in rows
+    ]
+
+def _delete_proposed(cursor, pairs):
+    for chunk in chunked(pairs, STATEMENT_CHUNK):
+        values_sql, params = values_clause(chunk, [TEXT, TEXT])
+        cursor.execute(f"""
+            DELETE p
+            FROM proposed_changes p
+            JOIN {values_sql} AS v(sub_id, platform) ON p.sub_id = v.sub_id AND p.platform = v.platform
+        """, params)
+
+
+# ---------- BULK REVIEW SUBMIT ----------
+def _validate(items):
+    if not isinstance(items, list) or not items:
+        raise ReviewBatchError("items must be a non-empty list")
+    if len(items) > REVIEW_BATCH_MAX:
+        raise ReviewBatchError(f"At most {REVIEW_BATCH_MAX} subscriptions per request")
+
+    accepted, results, seen = [], [None] * len(items), set()
+    for idx, item in enumerate(items):
+        item = item if isinstance(item, dict) else {}
+        sub_id = str(item.get('subscription_id') or '').strip()
+        platform = item.get('platform')
+        results[idx] = {'subscription_id': sub_id, 'platform': platform}
+
+        if not sub_id or platform not in PLATFORMS:
+            results[idx].update(status='invalid', error='Invalid request')
+        elif (sub_id, platform) in seen:
+            results[idx].update(status='duplicate', error='Subscription listed more than once')
+        else:
+            seen.add((sub_id, platform))
+            accepted.append((idx, sub_id, platform))
+    return accepted, results
+
+def submit_reviews(items):
+    """
+    Review-submit many subscriptions: stamp [Last Review Date] and apply each one's
+    saved proposed_changes, exactly like /submit_proposed_changes does for one.
+    Cost center changes are routed to cost_center_approvals.
+
+    items: [{'subscription_id', 'platform'}, ...]
+    Returns (results, touched):
+      results - one dict per input item, in order: 'status' is 'submitted', 'not_found',
+                'invalid' or 'duplicate'; submitted items whose cost center changed carry
+                'cost_center': 'pending_approval' or 'unresolved' (kept in proposed_changes)
+      touched - [(platform, sub_id, owner emails)] for cache invalidation
+
+    Reads happen first; cost centers are then resolved in bulk with no connection
+    held; all writes run set-based in one transaction.
+    """
+    accepted, results = _validate(items)
+    if not accepted:
+        return results, []
+
+    # 1. Current rows + saved proposals, and WOMs of incoming IT owners
+    conn = get_sql_connection()
+    try:
+        cursor = conn.cursor()
+        loaded = {}
+        for platform in PLATFORMS:
+            sub_ids = [sub_id for _, sub_id, p in accepted if p == platform]
+            if sub_ids:
+                loaded[platform] = load_rows(cursor, platform, sub_ids)
+
+        plans = {}
+        for idx, sub_id, platform in accepted:
+            row = loaded.get(platform, {}).get(sub_id.lower())
+            if row is None:
+                results[idx].update(status='not_found', error='Subscription not found')
+                continue
+            original, proposed = row
+            plans[idx] = (original, proposed, plan_submission(PLATFORMS[platform], original, proposed))
+
+        new_owners = [plan['new_it_owner'] for _, _, plan in plans.values() if plan['new_it_owner']]
+        woms = it_owner_index.woms(new_owners) if new_owners else {}
+        cursor.close()
+    finally:
+        conn.close()
+
+    if not plans:
+        return results, []
+
+    # 2. Cost center enrichment (cached, concurrent) outside any transaction
+    changed = [plan['new_cost_center'] for _, _, plan in plans.values() if plan['new_cost_center']]
+    cost_centers = fetch_cost_center_details_bulk(changed)['results'] if changed else {}
+
+    # 3. Writes
+    today_str = datetime.today().strftime('%Y-%m-%d')
+    asset_updates = {platform: [] for platform in PLATFORMS}
+    approvals, cleared, touched = [], [], []
+    for idx, (original, proposed, plan) in plans.items():
+        sub_id, platform = results[idx]['subscription_id'], results[idx]['platform']
+        descriptor = PLATFORMS[platform]
+        updates = dict(plan['updates'])
+        if plan['new_it_owner'] and plan['new_it_owner'].lower() in woms:
+            updates['IT Owner WOM'] = woms[plan['new_it_owner'].lower()]
+        asset_updates[platform].append((sub_id, updates))
+        results[idx]['status'] = 'submitted'
+
+        new_cost_center = plan['new_cost_center']
+        if new_cost_center:
+            fields = cost_center_approval_fields(cost_centers.get(normalize_cost_center(new_cost_center)), proposed)
+            if fields and fields[0]:
+                responsible, _, name = fields
+                approvals.append(approval_row(descriptor, sub_id, original, updates, new_cost_center, responsible, name))
+                results[idx]['cost_center'] = 'pending_approval'
+            else:
+                results[idx]['cost_center'] = 'unresolved'
+        else:
+            cleared.append((sub_id, platform))
+
+        owners = {original.get('IT Owner'), original.get('Cost Center Responsible'), plan['new_it_owner']}
+        touched.append((platform, sub_id, {o for o in owners if isinstance(o, str) and o}))
+
+    conn = get_sql_connection()
+    try:
+        cursor = conn.cursor()
+        for platform, rows in asset_updates.items():
+            if rows:
+                _update_assets(cursor, platform, rows, today_str)
+        if approvals:
+            upsert_approvals(cursor, approvals, today_str)
+        if cleared:
+            _delete_proposed(cursor, cleared)
+        conn.commit()
+        cursor.close()
+    finally:
+        conn.close()
+
+    return results, touched
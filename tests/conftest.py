@@ -0,0 +1,154 @@
+"""
+Shared fixtures: the Flask app with a fake pyodbc connection behind the pool.
+
+The fake answers each statement from canned result sets registered per SQL
+fragment and records what was executed, so tests can assert on the queries a
+route sends without a SQL Server.
+"""
+import base64
+import json
+import os
+import sys
+import types
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# No background loaders, no replica file and no shared cache during tests
+os.environ["IT_OWNER_INDEX_REFRESH"] = "0"
+os.environ["COST_CENTER_SYNC_INTERVAL"] = "0"
+os.environ["COST_CENTER_ENRICH_SWEEP_INTERVAL"] = "0"
+os.environ["COST_CENTER_REPLICA_PATH"] = ""
+os.environ["CACHE_REDIS_URL"] = ""
+os.environ["DB_DEBUG_HEADERS"] = "true"
+
+try:
+    import pyodbc  # noqa: F401
+except ImportError:
+    # Driver manager (unixODBC) not installed: the tests never connect anyway
+    fake_pyodbc = types.ModuleType("pyodbc")
+    fake_pyodbc.Error = type("Error", (Exception,), {})
+    fake_pyodbc.connect = lambda *args, **kwargs: pytest.fail("tests must not open a real connection")
+    sys.modules["pyodbc"] = fake_pyodbc
+
+import app as app_module  # noqa: E402
+import status  # noqa: E402
+from owners import ITOwnerIndex  # noqa: E402
+from schema import PROPOSED_COLUMNS, columns_for  # noqa: E402
+
+
+class FakeDatabase:
+    """Canned results per SQL fragment (latest registration wins) plus a statement log."""
+
+    def __init__(self):
+        self.handlers = []
+        self.statements = []
+
+    def on(self, fragment, rows=(), columns=(), rowcount=None, error=None):
+        self.handlers.insert(0, (fragment, [tuple(r) for r in rows], tuple(columns), rowcount, error))
+
+    def run(self, sql, params):
+        self.statements.append((sql, params))
+        for fragment, rows, columns, rowcount, error in self.handlers:
+            if fragment in sql:
+                if error is not None:
+                    raise error
+                return rows, columns, len(rows) if rowcount is None else rowcount
+        return [], (), 0
+
+    def executed(self, fragment):
+        return [sql for sql, _ in self.statements if fragment in sql]
+
+
+class FakeCursor:
+    def __init__(self, db):
+        self._db = db
+        self._rows = []
+        self.description = None
+        self.rowcount = -1
+        self.fast_executemany = False
+
+    def execute(self, sql, *params):
+        rows, columns, self.rowcount = self._db.run(sql, params)
+        self._rows = list(rows)
+        self.description = [(c, str, None, None, None, None, True) for c in columns] or None
+        return self
+
+    def executemany(self, sql, seq_of_params):
+        self._db.run(sql, list(seq_of_params))
+        self._rows, self.description, self.rowcount = [], None, -1
+
+    def fetchone(self):
+        return self._rows.pop(0) if self._rows else None
+
+    def fetchall(self):
+        rows, self._rows = self._rows, []
+        return rows
+
+    def __iter__(self):
+        return iter(self.fetchall())
+
+    def close(self):
+        pass
+
+
+class FakeConnection:
+    def __init__(self, db):
+        self._db = db
+
+    def cursor(self):
+        return FakeCursor(self._db)
+
+    def commit(self):
+        pass
+
+    def rollback(self):
+        pass
+
+    def close(self):
+        pass
+
+
+def principal_headers(name, email, username=None):
+    """X-MS-CLIENT-PRINCIPAL for a user signing in with an email address and a UPN."""
+    claims = [{'typ': 'name', 'val': name},
+              {'typ': 'http://schemas.xmlsoap.org/ws/2005/05/identity/claims/emailaddress', 'val': email}]
+    if username:
+        claims.append({'typ': 'preferred_username', 'val': username})
+    principal = base64.b64encode(json.dumps({'claims': claims}).encode()).decode()
+    return {'X-MS-CLIENT-PRINCIPAL': principal}
+
+
+@pytest.fixture
+def db(monkeypatch):
+    database = FakeDatabase()
+    monkeypatch.setattr(status, "pool", status.ConnectionPool(lambda: FakeConnection(database), pre_ping=False))
+    app_module.details_cache.clear()
+    app_module.dashboard_cache.clear()
+    return database
+
+
+@pytest.fixture
+def client(db):
+    app_module.app.config["TESTING"] = True
+    return app_module.app.test_client()
+
+
+@pytest.fixture
+def submit_row(db, monkeypatch):
+    """Register the load_rows result for Azure sub-1; returns a setter for the proposed values."""
+    monkeypatch.setattr(app_module, 'it_owner_index', ITOwnerIndex(lambda: [('new.owner@bosch.com', 'W000001')]))
+    monkeypatch.setattr(app_module, 'fetch_cost_center_details_within', lambda code, deadline: {
+        'CostCenter': code, 'Responsible': 'RESP1', 'Name3': 'Doe', 'Name4': 'Jane', 'Department': 'IT/1',
+    })
+    asset_columns = columns_for('Azure', 'submit')
+    original = {c: f"old {c}" for c in asset_columns}
+    original.update({'Subscription ID': 'sub-1', 'Cost Center': '000065F650', 'IT Owner': 'jane.doe@bosch.com'})
+
+    def register(**proposed_values):
+        proposed = {c: '' for c in PROPOSED_COLUMNS}
+        proposed.update(proposed_values)
+        db.on('LEFT JOIN proposed_changes p', columns=[*asset_columns, *PROPOSED_COLUMNS, 'proposed_sub_id'],
+              rows=[(*(original[c] for c in asset_columns), *(proposed[c] for c in PROPOSED_COLUMNS), 'sub-1')])
+    return register
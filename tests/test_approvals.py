@@ -0,0 +1,16 @@
+from approvals import apply_approval_decisions
+
+
+def test_approve_copies_a_single_pending_row_per_asset(db):
+    # Two Pending rows for the same subscription (e.g. left over from before the MERGE)
+    db.on('JOIN cost_center_approvals c', columns=['idx', 'new', 'old', 'it_owner'],
+          rows=[(0, 'a@bosch.com', None, None), (0, 'b@bosch.com', None, None)])
+
+    results, touched = apply_approval_decisions(
+        [{'subscription_id': 'sub-1', 'platform': 'Azure', 'action': 'approve'}])
+
+    assert results[0]['status'] == 'approved'
+    assert touched == [('Azure', 'sub-1', {'a@bosch.com', 'b@bosch.com'})]
+    [update] = db.executed('UPDATE a')
+    assert 'ROW_NUMBER() OVER (PARTITION BY subscription_id ORDER BY id DESC)' in update
+    assert 'c.rn = 1' in update
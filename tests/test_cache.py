@@ -0,0 +1,45 @@
+import cache
+from cache import MISS, LocalBackend, TTLCache, make_cache
+
+
+def test_invalidated_cache_falls_back_to_short_per_worker_copies(monkeypatch):
+    monkeypatch.setattr(cache, 'CACHE_REDIS_URL', '')
+    details = make_cache('test-fallback', ttl=60, local_ttl=0, fallback_ttl=5)
+
+    details.set('Azure|sub-1', {'name': 'x'})
+    assert details.get('Azure|sub-1') == {'name': 'x'}
+    assert details.ttl == 5
+
+    details.delete('Azure|sub-1')
+    assert details.get('Azure|sub-1') is MISS
+
+
+def test_zero_fallback_ttl_disables_the_cache_without_shared_backend(monkeypatch):
+    monkeypatch.setattr(cache, 'CACHE_REDIS_URL', '')
+    details = make_cache('test-no-fallback', ttl=60, local_ttl=0, fallback_ttl=0)
+
+    details.set('Azure|sub-1', {'name': 'x'})
+
+    assert details.get('Azure|sub-1') is MISS
+    assert details.stats()['enabled'] is False
+
+
+def test_per_worker_cache_still_caches_without_shared_backend(monkeypatch):
+    monkeypatch.setattr(cache, 'CACHE_REDIS_URL', '')
+    lookups = make_cache('test-local', ttl=60)
+
+    lookups.set('key', None)
+
+    assert lookups.get('key') is None
+
+
+def test_delete_is_seen_by_every_worker_with_shared_backend():
+    shared = LocalBackend(16)
+    worker_a = TTLCache('details', ttl=60, shared=shared, local_ttl=0)
+    worker_b = TTLCache('details', ttl=60, shared=shared, local_ttl=0)
+
+    worker_a.set('Azure|sub-1', {'name': 'old'})
+    assert worker_b.get('Azure|sub-1') == {'name': 'old'}
+
+    worker_a.delete('Azure|sub-1')
+    assert worker_b.get('Azure|sub-1') is MISS
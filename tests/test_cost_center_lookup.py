@@ -0,0 +1,132 @@
+"""
+The single-request, streaming cost center lookup must resolve exactly what the
+old one-request-per-padding loop did, checked against the load test OData stub.
+"""
+import xml.etree.ElementTree as ET
+
+import pytest
+
+import utility
+from benchmarks.loadtest import data, odata_stub
+from utility import CostCenterApiClient, parse_cost_center_feed, cost_center_candidates
+
+NS = {
+    "atom": "http://www.w3.org/2005/Atom",
+    "d": "http://schemas.microsoft.com/ado/2007/08/dataservices",
+    "m": "http://schemas.microsoft.com/ado/2007/08/dataservices/metadata"
+}
+
+
+def legacy_lookup(session, base_url, normalized_input):
+    """The lookup as it was before the combined $filter: pad and re-query until a match."""
+    while len(normalized_input) <= 10:
+        response = session.get(f"{base_url}?$filter=CostCenter eq '{normalized_input}'")
+        response.raise_for_status()
+        root = ET.fromstring(response.text)
+        result = []
+        for entry in root.findall("atom:entry", NS):
+            props = entry.find("atom:content/m:properties", NS)
+            if props is not None:
+                result.append({child.tag.split("}")[-1]: child.text for child in props
+                               if child.tag.split("}")[-1] in utility.REQUIRED_FIELDS})
+        if result:
+            return result[0]
+        normalized_input = '0' + normalized_input
+    return None
+
+
+def legacy_pick(feed_bytes):
+    """What the old parser returned for a feed: its first entry's record."""
+    root = ET.fromstring(feed_bytes)
+    for entry in root.findall("atom:entry", NS):
+        props = entry.find("atom:content/m:properties", NS)
+        if props is not None:
+            return {child.tag.split("}")[-1]: child.text for child in props}
+    return None
+
+
+@pytest.fixture(scope='module')
+def stub():
+    server, url = odata_stub.start(0, latency_ms=0)
+    yield server, url
+    server.shutdown()
+
+
+@pytest.fixture
+def client(stub, monkeypatch):
+    _, url = stub
+    api = CostCenterApiClient(base_url=url, api_key='test', proxies=None, retries=0)
+    api.session.trust_env = False  # the stub is on localhost, never behind HTTP(S)_PROXY
+    monkeypatch.setattr(utility, 'cost_center_client', api)
+    utility.cost_center_cache.clear()
+    return api
+
+
+KNOWN = [data.cost_center_code(n) for n in (0, 1, 1234, data.COST_CENTER_COUNT - 1)]
+
+CODES = [
+    *KNOWN,                                  # full ten characters
+    *(code.lstrip('0') for code in KNOWN),   # typed without leading zeros
+    '0' + KNOWN[2].lstrip('0'),              # partially padded
+    KNOWN[2].lower(),                        # lower case
+    f"  {KNOWN[3].lstrip('0')} ",            # surrounding whitespace
+    'FFFFFF',                                # unknown
+    '99999999999',                           # longer than ten characters
+    '1',                                     # pads all the way, never matches
+]
+
+
+@pytest.mark.parametrize('code', CODES)
+def test_lookup_matches_legacy_loop(client, stub, code):
+    server, url = stub
+    normalized = utility.normalize_cost_center(code)
+    expected = legacy_lookup(client.session, url, normalized)
+
+    before = server.requests
+    assert utility.fetch_cost_center_details(code) == expected
+    assert server.requests - before == (1 if cost_center_candidates(normalized) else 0)
+
+
+def test_known_codes_resolve(client):
+    for n in (0, 1234):
+        record = utility.fetch_cost_center_details(data.cost_center_code(n).lstrip('0'))
+        assert record == data.cost_center_record(n)
+
+
+def chunks_of(payload, size=64):
+    return [payload[i:i + size] for i in range(0, len(payload), size)]
+
+
+def test_multi_entry_feed_prefers_shortest_padding():
+    # Several padded forms exist; the old loop asked for '10005' before '0010005'
+    longer = dict(data.cost_center_record(5), CostCenter='0010005', Name3='Longer')
+    shorter = dict(data.cost_center_record(5), CostCenter='10005', Name3='Shorter')
+    feed = odata_stub.feed([data.cost_center_record(7), longer, shorter])
+
+    assert parse_cost_center_feed(chunks_of(feed), cost_center_candidates('10005')) == shorter
+
+
+def test_multi_entry_feed_picks_the_candidate_over_earlier_entries():
+    feed = odata_stub.feed([data.cost_center_record(n) for n in (7, 5, 6)])
+    candidates = cost_center_candidates(data.cost_center_code(5).lstrip('0'))
+
+    assert parse_cost_center_feed(chunks_of(feed), candidates) == data.cost_center_record(5)
+
+
+def test_multi_entry_feed_without_candidate_match_returns_none():
+    feed = odata_stub.feed([data.cost_center_record(n) for n in (7, 5, 6)])
+
+    assert parse_cost_center_feed(chunks_of(feed), cost_center_candidates('FFFFFF')) is None
+
+
+def test_feed_without_candidates_returns_first_entry():
+    feed = odata_stub.feed([data.cost_center_record(n) for n in (7, 5, 6)])
+
+    assert parse_cost_center_feed(chunks_of(feed)) == legacy_pick(feed)
+
+
+def test_empty_feed():
+    feed = odata_stub.feed([])
+
+    assert parse_cost_center_feed(chunks_of(feed), cost_center_candidates('10000')) is None
+    assert legacy_pick(feed) is None
@@ -0,0 +1,58 @@
+import pytest
+
+import app as app_module
+from cache import TTLCache, LocalBackend
+from conftest import principal_headers
+from schema import columns_for, select_by_id
+
+USER = principal_headers('Jane Doe', 'Jane.Doe@bosch.com', 'jdo2abc@bosch.com')
+SUMMARY_SQL = 'GROUP BY platform, status'
+
+
+@pytest.fixture
+def shared_dashboard_cache(monkeypatch):
+    # A LocalBackend stands in for Redis: every worker would see the same entries
+    cache = TTLCache('dashboard', ttl=120, shared=LocalBackend(64), local_ttl=0)
+    monkeypatch.setattr(app_module, 'dashboard_cache', cache)
+    return cache
+
+
+def home_queries(client, db):
+    before = len(db.executed(SUMMARY_SQL))
+    response = client.get('/', headers=USER)
+    assert response.status_code == 200
+    return len(db.executed(SUMMARY_SQL)) - before
+
+
+def test_dashboard_is_cached_per_user(client, db, shared_dashboard_cache):
+    db.on(SUMMARY_SQL, columns=['platform', 'status', 'n'], rows=[('Azure', 'Up to date', 3)])
+
+    assert home_queries(client, db) == 1
+    assert home_queries(client, db) == 0
+
+
+def test_edit_by_user_with_two_emails_invalidates_their_dashboard(client, db, shared_dashboard_cache):
+    db.on(SUMMARY_SQL, columns=['platform', 'status', 'n'], rows=[('Azure', 'Up to date', 3)])
+    assert home_queries(client, db) == 1
+
+    # The asset is owned by the user's UPN, the edit is made under both emails
+    columns = columns_for('Azure', 'save')
+    original = {c: '' for c in columns}
+    original['IT Owner'] = 'jdo2abc@bosch.com'
+    db.on(select_by_id('Azure', 'save'), columns=columns, rows=[tuple(original[c] for c in columns)])
+    db.on('MERGE proposed_changes', rowcount=1)
+
+    response = client.post('/save_proposed_changes', headers=USER,
+                           json={'subscription_id': 'sub-1', 'platform': 'Azure', 'IT Owner': 'new.owner@bosch.com'})
+    assert response.status_code == 200
+
+    assert home_queries(client, db) == 1
+
+
+def test_invalidating_either_email_refreshes_the_combined_entry(client, db, shared_dashboard_cache):
+    db.on(SUMMARY_SQL, columns=['platform', 'status', 'n'], rows=[('Azure', 'Up to date', 3)])
+    assert home_queries(client, db) == 1
+
+    app_module.invalidate_dashboards('JANE.DOE@bosch.com ')
+    assert home_queries(client, db) == 1
+    assert home_queries(client, db) == 0
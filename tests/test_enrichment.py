@@ -0,0 +1,99 @@
+import threading
+from concurrent.futures import TimeoutError as FutureTimeoutError
+
+import pytest
+
+import app as app_module
+import utility
+from conftest import principal_headers
+from submissions import cost_center_approval_fields
+from utility import EnrichmentBusyError, ENRICH_MAX_WORKERS
+
+USER = principal_headers('Jane Doe', 'jane.doe@bosch.com')
+
+
+@pytest.fixture
+def stuck_api(monkeypatch):
+    """fetch_cost_center_details blocks until released, like a hung cost center API."""
+    release = threading.Event()
+
+    def fetch(user_input):
+        release.wait(10)
+        return {'CostCenter': user_input, 'Responsible': 'RESP1'}
+
+    monkeypatch.setattr(utility, 'fetch_cost_center_details', fetch)
+    yield release
+    release.set()
+    # Wait for the stuck lookups to hand their slots back before the next test
+    slots = utility._enrich_lookup_slots
+    for _ in range(ENRICH_MAX_WORKERS):
+        assert slots.acquire(timeout=5)
+    for _ in range(ENRICH_MAX_WORKERS):
+        slots.release()
+
+
+def test_stuck_lookups_never_queue(stuck_api):
+    for _ in range(ENRICH_MAX_WORKERS):
+        with pytest.raises(FutureTimeoutError):
+            utility.fetch_cost_center_details_within('65F650', 0.01)
+
+    with pytest.raises(EnrichmentBusyError):
+        utility.fetch_cost_center_details_within('65F650', 0.01)
+
+
+def test_workers_are_reused_once_the_api_answers(stuck_api):
+    with pytest.raises(FutureTimeoutError):
+        utility.fetch_cost_center_details_within('65F650', 0.01)
+    stuck_api.set()
+
+    assert utility.fetch_cost_center_details_within('65F651', 5)['CostCenter'] == '65F651'
+
+
+def test_submit_falls_back_to_background_enrichment_when_busy(client, db, submit_row, monkeypatch):
+    submit_row(cost_center_proposed='000065F651')
+
+    def busy(code, deadline):
+        raise EnrichmentBusyError("All cost center lookup workers are busy")
+
+    queued = []
+    monkeypatch.setattr(app_module, 'fetch_cost_center_details_within', busy)
+    monkeypatch.setattr(app_module, 'submit_enrichment', lambda *args: queued.append(args) or True)
+
+    response = client.post('/submit_proposed_changes', headers=USER,
+                           json={'subscription_id': 'sub-1', 'platform': 'Azure'})
+
+    assert response.status_code == 200
+    assert response.get_json()['cost_center_enrichment'] == 'queued'
+    assert db.executed('MERGE cost_center_approvals')
+    assert [args[0] for args in queued] == [app_module.enrich_in_background]
+
+
+def test_approval_fields_take_the_wom_from_the_api_record():
+    record = {'CostCenter': '000065F650', 'Responsible': 'RESP1', 'Name3': 'Doe', 'Name4': 'Jane',
+              'Department': 'IT/1', 'ResponsibleOrgOffice': 'WOM1'}
+
+    assert cost_center_approval_fields(record, {}) == ('resp1@bosch.com', 'WOM1', 'Jane Doe (IT/1)')
+
+
+def test_background_queue_is_bounded(monkeypatch):
+    release = threading.Event()
+    monkeypatch.setattr(utility, '_enrich_job_slots', threading.BoundedSemaphore(2))
+
+    assert utility.submit_enrichment(release.wait, 10)
+    assert utility.submit_enrichment(release.wait, 10)
+    assert not utility.submit_enrichment(release.wait, 10)
+    release.set()
+
+
+def test_sweep_resubmits_approvals_left_queued(db, monkeypatch):
+    db.on('new_cost_center_responsible IS NULL', rows=[
+        ('Azure', 'sub-1', '000065F651', 'old.resp@bosch.com', 'jane.doe@bosch.com', None, None, None),
+        ('GCP', 'proj-2', '000065F652', None, 'john.doe@bosch.com', 'Manual', 'm@bosch.com', 'WOM2'),
+    ])
+    submitted = []
+    monkeypatch.setattr(app_module, 'submit_enrichment', lambda *args: submitted.append(args) or True)
+
+    app_module.sweep_queued_enrichments()
+
+    assert [args[1:4] for args in submitted] == [('Azure', 'sub-1', '000065F651'), ('GCP', 'proj-2', '000065F652')]
+    assert submitted[1][4]['cost_center_responsible_wom_manual'] == 'WOM2'
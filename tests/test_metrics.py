@@ -0,0 +1,64 @@
+import re
+
+import pytest
+
+import app as app_module
+import status
+from conftest import principal_headers
+from instrumentation import RequestTrace, RouteMetrics, route_metrics, start_request_trace
+
+HISTOGRAM_SUFFIX = re.compile(r'_(bucket|sum|count)$')
+
+
+def families(text):
+    """Metric family of each sample line, in exposition order."""
+    return [HISTOGRAM_SUFFIX.sub('', line.split('{')[0]) for line in text.splitlines() if not line.startswith('#')]
+
+
+def test_each_family_is_contiguous_after_its_type_line():
+    metrics = RouteMetrics()
+    for route in ('/', '/api/metadata'):
+        trace = RequestTrace()
+        trace.record('db', 0.01)
+        trace.record('render', 0.002)
+        metrics.observe(route, 'GET', 200, trace)
+
+    text = metrics.render()
+    seen = []
+    for family in families(text):
+        if not seen or seen[-1] != family:
+            assert family not in seen, f"{family} is split"
+            seen.append(family)
+    for family in ('request_span_calls_total', 'request_span_duration_ms_total'):
+        assert text.index(f'# TYPE {family} counter') < text.index(f'\n{family}{{')
+
+
+def test_fetches_are_timed_as_db_fetch(db):
+    db.on('SELECT', columns=['n'], rows=[(1,), (2,)])
+    trace = start_request_trace()
+    cursor = status.get_sql_connection().cursor()
+
+    cursor.execute("SELECT n FROM t")
+    cursor.fetchone()
+    cursor.fetchall()
+
+    assert trace.summary()['db_fetch']['count'] == 2
+
+
+def errors_total(route):
+    prefix = f'http_request_errors_total{{route="{route}",method="GET"}} '
+    lines = [line for line in route_metrics.render().splitlines() if line.startswith(prefix)]
+    return int(lines[0][len(prefix):]) if lines else 0
+
+
+def test_unhandled_exception_counts_as_error(client, monkeypatch):
+    def crash(*args, **kwargs):
+        raise RuntimeError("boom")
+
+    monkeypatch.setattr(app_module, 'summarize_subscriptions', crash)
+    before = errors_total('/')
+
+    with pytest.raises(RuntimeError):
+        client.get('/', headers=principal_headers('Jane Doe', 'jane.doe@bosch.com'))
+
+    assert errors_total('/') == before + 1
@@ -0,0 +1,51 @@
+import pyodbc
+
+from conftest import principal_headers
+
+USER = principal_headers('Jane Doe', 'jane.doe@bosch.com')
+LISTED = ['platform', 'status', 'id', 'environment', 'cost_center', 'it_owner']
+
+
+def break_aws(db):
+    """The combined query and the AWS-only query fail; Azure and GCP answer on their own."""
+    db.on('aws_assets', error=pyodbc.Error('42S02', "Invalid object name 'aws_assets'"))
+
+
+def test_home_keeps_healthy_platforms_and_warns(client, db):
+    db.on('[azure_assets]', columns=['platform', 'status', 'n'], rows=[('Azure', 'Up to date', 4)])
+    db.on('[gcp_assets]', columns=['platform', 'status', 'n'], rows=[('GCP', 'Check', 2)])
+    break_aws(db)
+
+    response = client.get('/', headers=USER)
+    html = response.get_data(as_text=True)
+
+    assert response.status_code == 200
+    assert 'AWS data is temporarily unavailable.' in html
+    assert 'Azure data' not in html and 'GCP data' not in html
+
+
+def test_listing_merges_platform_pages_in_sort_order(client, db):
+    db.on('[azure_assets]', columns=LISTED, rows=[
+        ('Azure', 'Up to date', f"az-{n}", 'Production', f"CC{n:02d}", 'jane.doe@bosch.com') for n in (1, 4, 6)
+    ])
+    db.on('[gcp_assets]', columns=LISTED, rows=[
+        ('GCP', 'Check', f"gc-{n}", 'Test', f"cc{n:02d}", 'jane.doe@bosch.com') for n in (2, 3, 5)
+    ])
+    break_aws(db)
+
+    response = client.get('/api/metadata', query_string={'sort': 'cost_center', 'limit': 4}, headers=USER)
+    page = response.get_json()
+
+    assert response.status_code == 200
+    assert [item['id'] for item in page['items']] == ['az-1', 'gc-2', 'gc-3', 'az-4']
+    assert page['next_cursor']
+    assert page['warnings'] == ['AWS data is temporarily unavailable.']
+
+
+def test_listing_without_failures_has_no_warnings(client, db):
+    db.on('SELECT TOP', columns=LISTED, rows=[('Azure', 'Up to date', 'az-1', 'Production', 'CC01', 'x')])
+
+    page = client.get('/api/metadata', headers=USER).get_json()
+
+    assert page['warnings'] == []
+    assert len(db.executed('SELECT TOP')) == 1
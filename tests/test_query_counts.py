@@ -0,0 +1,97 @@
+"""
+Statement budgets per route, read from the X-DB-Queries header. The fake
+database returns many rows where a route lists or resolves several assets, so
+a per-row query (N+1) blows the budget instead of slipping through.
+"""
+import pytest
+
+from conftest import principal_headers
+from schema import PROPOSED_COLUMNS, columns_for, select_by_id, select_proposed
+
+USER = principal_headers('Jane Doe', 'jane.doe@bosch.com', 'jdo2abc@bosch.com')
+LISTING_ROWS = 120
+
+QUERY_BUDGETS = {
+    'home': 1,                 # one GROUP BY for all platforms
+    'metadata_page': 1,        # page query, status resolved in SQL
+    'metadata_facets': 2,      # + one UNION ALL for the filter options
+    'metadetails': 2,          # proposed changes + asset row
+    'submit_cost_center': 3,   # load + UPDATE + approvals MERGE
+    'submit_direct': 3,        # load + UPDATE + DELETE proposed_changes
+}
+
+
+def queries(response):
+    assert response.status_code == 200, response.get_data(as_text=True)
+    return int(response.headers['X-DB-Queries'])
+
+
+def listed_row(n):
+    platform = ('Azure', 'AWS', 'GCP')[n % 3]
+    return (platform, 'Up to date', f"sub-{n:04d}", 'Production', '000065F650', 'jane.doe@bosch.com')
+
+
+def test_home(client, db):
+    db.on('GROUP BY platform, status', columns=['platform', 'status', 'n'],
+          rows=[(p, s, 40) for p in ('Azure', 'AWS', 'GCP') for s in ('Up to date', 'Check', 'In-Progress')])
+
+    assert queries(client.get('/', headers=USER)) <= QUERY_BUDGETS['home']
+
+
+@pytest.mark.parametrize('params', [
+    {},
+    {'platform': ['Azure', 'GCP'], 'status': 'Up to date', 'q': 'sub'},
+    {'sort': 'cost_center', 'order': 'desc', 'limit': '25', 'it_owner': 'jane'},
+])
+def test_metadata_page(client, db, params):
+    db.on('SELECT TOP', columns=['platform', 'status', 'id', 'environment', 'cost_center', 'it_owner'],
+          rows=[listed_row(n) for n in range(LISTING_ROWS)])
+
+    response = client.get('/api/metadata', query_string=params, headers=USER)
+
+    assert queries(response) <= QUERY_BUDGETS['metadata_page']
+    assert response.get_json()['next_cursor']
+
+
+def test_metadata_next_page_and_facets(client, db):
+    db.on('SELECT TOP', columns=['platform', 'status', 'id', 'environment', 'cost_center', 'it_owner'],
+          rows=[listed_row(n) for n in range(LISTING_ROWS)])
+    db.on('AS facet', columns=['facet', 'value'],
+          rows=[('platform', p) for p in ('Azure', 'AWS', 'GCP')] + [('status', 'Up to date')])
+
+    first = client.get('/api/metadata', query_string={'facets': '1'}, headers=USER)
+    assert queries(first) <= QUERY_BUDGETS['metadata_facets']
+
+    cursor = first.get_json()['next_cursor']
+    second = client.get('/api/metadata', query_string={'cursor': cursor}, headers=USER)
+    assert queries(second) <= QUERY_BUDGETS['metadata_page']
+
+
+def test_metadetails(client, db):
+    columns = columns_for('Azure', 'details')
+    db.on(select_proposed(), columns=PROPOSED_COLUMNS, rows=[tuple('' for _ in PROPOSED_COLUMNS)])
+    db.on(select_by_id('Azure', 'details'), columns=columns, rows=[tuple('x' for _ in columns)])
+
+    response = client.get('/components/metadetails', query_string={'id': 'sub-1', 'platform': 'Azure'})
+
+    assert queries(response) <= QUERY_BUDGETS['metadetails']
+
+
+def test_submit_with_cost_center_change(client, db, submit_row):
+    submit_row(it_owner_proposed='new.owner@bosch.com', cost_center_proposed='000065F651')
+
+    response = client.post('/submit_proposed_changes', headers=USER,
+                           json={'subscription_id': 'sub-1', 'platform': 'Azure'})
+
+    assert queries(response) <= QUERY_BUDGETS['submit_cost_center']
+    assert db.executed('MERGE cost_center_approvals')
+
+
+def test_submit_direct_fields_only(client, db, submit_row):
+    submit_row(it_owner_proposed='new.owner@bosch.com', i_sc_proposed='I-SC2')
+
+    response = client.post('/submit_proposed_changes', headers=USER,
+                           json={'subscription_id': 'sub-1', 'platform': 'Azure'})
+
+    assert queries(response) <= QUERY_BUDGETS['submit_direct']
+    assert db.executed('DELETE FROM proposed_changes')
@@ -0,0 +1,47 @@
+"""
+Replica sync against the load test OData stub: paging must reach every cost
+center even when the server caps $top, and only a complete full sync prunes.
+"""
+import pytest
+
+import utility
+from benchmarks.loadtest import data, odata_stub
+from cost_center_replica import CostCenterReplica
+from utility import CostCenterApiClient, sync_cost_center_replica
+
+
+@pytest.fixture(scope='module')
+def stub():
+    server, url = odata_stub.start(0, latency_ms=0)
+    yield server, url
+    server.shutdown()
+
+
+@pytest.fixture
+def replica(stub, tmp_path, monkeypatch):
+    _, url = stub
+    api = CostCenterApiClient(base_url=url, api_key='test', proxies=None, retries=0)
+    api.session.trust_env = False  # the stub is on localhost, never behind HTTP(S)_PROXY
+    monkeypatch.setattr(utility, 'cost_center_client', api)
+    monkeypatch.setattr(utility, 'COST_CENTER_SYNC_DELTA_FIELD', '')
+    store = CostCenterReplica(str(tmp_path / 'cost_centers.sqlite3'), utility.REQUIRED_FIELDS)
+    monkeypatch.setattr(utility, 'cost_center_replica', store)
+    return store
+
+
+def test_capped_page_size_neither_stops_early_nor_prunes(replica, monkeypatch):
+    sync_cost_center_replica(full=True, page_size=data.COST_CENTER_COUNT)
+    monkeypatch.setattr(odata_stub, 'MAX_PAGE', 700)
+
+    result = sync_cost_center_replica(full=True, page_size=1000)
+
+    assert result['rows'] == data.COST_CENTER_COUNT
+    assert result['pruned'] == 0
+    assert replica.stats()['rows'] == data.COST_CENTER_COUNT
+
+
+def test_scheduled_sync_skips_when_another_worker_just_synced(replica):
+    assert sync_cost_center_replica(min_interval=3600)['mode'] == 'full'
+
+    assert 'skipped' in sync_cost_center_replica(min_interval=3600)
+    assert sync_cost_center_replica(full=True, min_interval=3600)['mode'] == 'full'
@@ -1,7 +1,18 @@
+import contextvars
 import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from urllib.parse import urlsplit
 import requests
 import xml.etree.ElementTree as ET
 import urllib3
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from cache import make_cache, MISS
+from instrumentation import span
+from cost_center_replica import CostCenterReplica, COST_CENTER_REPLICA_PATH
 urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
 
 # Load environment variables from .env file (optional in local dev)
@@ -21,66 +32,528 @@ proxies = {
     "https": PROXY_URL_HTTPS
 } if PROXY_URL_HTTP and PROXY_URL_HTTPS else None
 
+# Cost center master data barely changes during a day → cache lookups
+COST_CENTER_CACHE_SIZE = int(os.getenv("COST_CENTER_CACHE_SIZE", "5000"))
+COST_CENTER_CACHE_TTL = int(os.getenv("COST_CENTER_CACHE_TTL", "3600"))                    # seconds
+COST_CENTER_NEGATIVE_CACHE_TTL = int(os.getenv("COST_CENTER_NEGATIVE_CACHE_TTL", "300"))   # seconds
+
+cost_center_cache = make_cache("cost_center", max_size=COST_CENTER_CACHE_SIZE, ttl=COST_CENTER_CACHE_TTL)
+
+# Overridable so benchmarks can point the app at a local stand-in (benchmarks/loadtest)
+COST_CENTER_API_URL = os.getenv(
+    "COST_CENTER_API_URL",
+    "https://ews-esz-emea.api.bosch.com/information-and-data/master/controlling/"
+    "costcenter/v2/CostCenterEntitySet"
+)
+
+# HTTP client settings for the cost center API
+API_CONNECT_TIMEOUT = float(os.getenv("COST_CENTER_API_CONNECT_TIMEOUT", "3"))   # seconds
+API_READ_TIMEOUT = float(os.getenv("COST_CENTER_API_READ_TIMEOUT", "10"))        # seconds
+API_RETRIES = int(os.getenv("COST_CENTER_API_RETRIES", "2"))
+API_BACKOFF = float(os.getenv("COST_CENTER_API_BACKOFF", "0.3"))                 # 0.3s, 0.6s, ...
+API_POOL_SIZE = int(os.getenv("COST_CENTER_API_POOL_SIZE", "10"))
+CIRCUIT_FAILURE_THRESHOLD = int(os.getenv("COST_CENTER_CIRCUIT_FAILURES", "5"))
+CIRCUIT_RESET_TIMEOUT = float(os.getenv("COST_CENTER_CIRCUIT_RESET", "60"))      # seconds
+
+# Bulk resolution: concurrent API calls per batch (keep ≤ API_POOL_SIZE)
+BULK_MAX_WORKERS = int(os.getenv("COST_CENTER_BULK_WORKERS", "8"))
+
+# Submit enrichment. Deadline-bound lookups get their own pool: one that misses its
+# deadline keeps its worker until the API answers, so at most ENRICH_MAX_WORKERS are
+# admitted at a time (none wait in the queue) and further submits enrich asynchronously.
+# Background enrichment jobs (async mode) run on enrich_executor, at most
+# ENRICH_QUEUE_MAX queued or running; past that the approval row stays queued for the
+# periodic sweep (app.sweep_queued_enrichments).
+ENRICH_MAX_WORKERS = int(os.getenv("COST_CENTER_ENRICH_WORKERS", "4"))
+ENRICH_QUEUE_MAX = int(os.getenv("COST_CENTER_ENRICH_QUEUE", "200"))
+enrich_lookup_executor = ThreadPoolExecutor(max_workers=ENRICH_MAX_WORKERS, thread_name_prefix="cost-center-lookup")
+_enrich_lookup_slots = threading.BoundedSemaphore(ENRICH_MAX_WORKERS)
+enrich_executor = ThreadPoolExecutor(max_workers=ENRICH_MAX_WORKERS, thread_name_prefix="cost-center-enrich")
+_enrich_job_slots = threading.BoundedSemaphore(ENRICH_QUEUE_MAX)
+
+# Local replica sync (see cost_center_replica.py). Without a delta field every
+# sync is a full one; with it, runs in between only fetch entries changed since
+# the last watermark (deletions are picked up by the next full sync).
+COST_CENTER_SYNC_PAGE_SIZE = int(os.getenv("COST_CENTER_SYNC_PAGE_SIZE", "1000"))
+COST_CENTER_SYNC_DELTA_FIELD = os.getenv("COST_CENTER_SYNC_DELTA_FIELD", "")       # e.g. "ChangedOn"
+COST_CENTER_SYNC_INTERVAL = int(os.getenv("COST_CENTER_SYNC_INTERVAL", "0"))        # seconds, 0 = off
+COST_CENTER_FULL_SYNC_MAX_AGE = int(os.getenv("COST_CENTER_FULL_SYNC_MAX_AGE", "86400"))  # seconds
+
+
+# --------------------------
+# Cost Center API Client
+# --------------------------
+class CircuitOpenError(requests.RequestException):
+    """Raised instead of calling the API while the circuit breaker is open."""
+
+
+class EnrichmentBusyError(RuntimeError):
+    """Raised instead of queueing a deadline-bound lookup while every lookup worker is busy."""
+
+
+class CircuitBreaker:
+    """
+    Opens after `failure_threshold` consecutive failures and rejects calls for
+    `reset_timeout` seconds; then lets a single trial call through (half-open).
+    """
+
+    def __init__(self, failure_threshold=CIRCUIT_FAILURE_THRESHOLD, reset_timeout=CIRCUIT_RESET_TIMEOUT):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._failures = 0
+        self._opened_at = None
+        self._trial_running = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        with self._lock:
+            if self._opened_at is None:
+                return "closed"
+            if time.monotonic() - self._opened_at >= self.reset_timeout:
+                return "half-open"
+            return "open"
+
+    def allow(self):
+        with self._lock:
+            if self._opened_at is None:
+                return True
+            if time.monotonic() - self._opened_at < self.reset_timeout or self._trial_running:
+                return False
+            self._trial_running = True
+            return True
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._trial_running = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            self._trial_running = False
+            if self._opened_at is not None or self._failures >= self.failure_threshold:
+                self._opened_at = time.monotonic()
+
+
+class CostCenterApiClient:
+    """
+    Reusable client for the cost center OData service.
+    Owns a pooled requests.Session (keep-alive through the proxy), applies
+    connect/read timeouts, retries 5xx and connection errors with backoff and
+    fails fast through a circuit breaker when the service is down.
+    """
+
+    def __init__(self, base_url=COST_CENTER_API_URL, api_key=API_KEY, proxies=proxies,
+                 timeout=(API_CONNECT_TIMEOUT, API_READ_TIMEOUT), retries=API_RETRIES,
+                 backoff=API_BACKOFF, pool_size=API_POOL_SIZE, breaker=None):
+        self.base_url = base_url
+        self.timeout = timeout
+        self.breaker = breaker or CircuitBreaker()
+
+        retry = Retry(
+            total=retries,
+            connect=retries,
+            read=retries,
+            status=retries,
+            backoff_factor=backoff,
+            status_forcelist=(500, 502, 503, 504),
+            allowed_methods=frozenset(["GET"]),
+            raise_on_status=False
+        )
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=retry)
+
+        self.session = requests.Session()
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.session.headers.update({
+            "KeyId": api_key,
+            "Accept": "application/atom+xml"
+        })
+        self.session.verify = False  # Bosch internal API over HTTPS
+        if proxies:
+            self.session.proxies.update(proxies)
+
+    def get(self, query, stream=False):
+        """GET base_url?query. Raises requests.RequestException (incl. CircuitOpenError)."""
+        if not self.breaker.allow():
+            raise CircuitOpenError("Cost center API circuit is open; skipping call")
+
+        try:
+            # Streamed bodies are read after this returns, so the span covers time to headers
+            with span('cost_center_api', query[:120]):
+                response = self.session.get(f"{self.base_url}?{query}", timeout=self.timeout, stream=stream)
+            response.raise_for_status()
+        except requests.HTTPError as e:
+            if e.response is not None:
+                e.response.close()
+            # 4xx means the service answered; only 5xx counts against the breaker
+            if e.response is not None and e.response.status_code >= 500:
+                self.breaker.record_failure()
+            else:
+                self.breaker.record_success()
+            raise
+        except requests.RequestException:
+            self.breaker.record_failure()
+            raise
+
+        self.breaker.record_success()
+        return response
+
+
+cost_center_client = CostCenterApiClient()
+
 
 # --------------------------
 # Fetch Cost Center Details
 # --------------------------
+def normalize_cost_center(user_input):
+    """Cache key / query form of a user-typed cost center code."""
+    return (user_input or '').strip().upper()
+
+
 def fetch_cost_center_details(user_input):
     """
     Given a user input string for Cost Center, normalize it by padding zeros
     and fetch the full 10-digit cost center info from Bosch internal API.
     Returns a dictionary with Responsible info if found, else None.
+    Results are cached (not-found results with a shorter TTL); API errors are not cached.
+    While the API circuit breaker is open this returns None immediately, so the
+    UI falls back to manual entry.
     """
-    normalized_input = user_input.upper()
+    normalized_input = normalize_cost_center(user_input)
+    if not normalized_input:
+        return None
 
-    while len(normalized_input) <= 10:
-        url = (
-            "https://ews-esz-emea.api.bosch.com/information-and-data/master/controlling/"
-            f"costcenter/v2/CostCenterEntitySet?$filter=CostCenter eq '{normalized_input}'"
-        )
+    cached = cost_center_cache.get(normalized_input)
+    if cached is not MISS:
+        return dict(cached) if cached else None
 
-        headers = {
-            "KeyId": API_KEY,
-            "Accept": "application/atom+xml"
-        }
+    try:
+        return _resolve_uncached(normalized_input)
+    except requests.RequestException as e:
+        print(f"❌ API error for {normalized_input}: {e}")
+        return None
 
+
+def fetch_cost_center_details_within(user_input, deadline):
+    """
+    fetch_cost_center_details with a hard deadline in seconds (retries included).
+    Raises concurrent.futures.TimeoutError when it is not met; the lookup keeps
+    running in the background and still fills the cache for the next caller.
+    Raises EnrichmentBusyError at once when ENRICH_MAX_WORKERS lookups are still
+    running, rather than waiting behind them.
+    """
+    if not _enrich_lookup_slots.acquire(blocking=False):
+        raise EnrichmentBusyError(f"All {ENRICH_MAX_WORKERS} cost center lookup workers are busy")
+
+    def lookup():
         try:
-            response = requests.get(
-                url,
-                headers=headers,
-                verify=False,   # Bosch internal API over HTTPS
-                proxies=proxies  # Use proxy if set
-            )
-            response.raise_for_status()
-        except requests.RequestException as e:
-            print(f"❌ API error for {normalized_input}: {e}")
-            return None
+            return fetch_cost_center_details(user_input)
+        finally:
+            _enrich_lookup_slots.release()
+
+    try:
+        future = enrich_lookup_executor.submit(contextvars.copy_context().run, lookup)
+    except RuntimeError:
+        _enrich_lookup_slots.release()  # executor shut down
+        raise
+    return future.result(timeout=deadline)
+
+
+def submit_enrichment(job, *args):
+    """
+    Run job(*args) on enrich_executor unless ENRICH_QUEUE_MAX jobs are already
+    queued or running. Returns False (nothing submitted) when the queue is full.
+    """
+    slots = _enrich_job_slots
+    if not slots.acquire(blocking=False):
+        return False
+
+    def run():
+        try:
+            job(*args)
+        finally:
+            slots.release()
+
+    try:
+        enrich_executor.submit(run)
+    except RuntimeError:
+        slots.release()  # executor shut down
+        raise
+    return True
+
+
+def _resolve_uncached(normalized_input):
+    """
+    Look up one normalized code and cache the outcome: the local replica first,
+    the API for codes it does not have (e.g. created since the last sync).
+    Raises on API errors.
+    """
+    result = _lookup_replica(normalized_input)
+    if result is None:
+        result = _lookup_cost_center(normalized_input)
+    if result:
+        cost_center_cache.set(normalized_input, result)
+    else:
+        cost_center_cache.set(normalized_input, None, ttl=COST_CENTER_NEGATIVE_CACHE_TTL)
+    return result
+
+
+def iter_cost_center_details(codes, max_workers=BULK_MAX_WORKERS):
+    """
+    Resolve many cost center codes. Codes are normalized and deduplicated;
+    cached ones are answered first, the rest go to the API with at most
+    `max_workers` requests in flight.
+    Yields (code, record_or_None, error_or_None) in completion order.
+    """
+    pending = []
+    for code in dict.fromkeys(normalize_cost_center(c) for c in codes):
+        if not code:
+            continue
+        cached = cost_center_cache.get(code)
+        if cached is MISS:
+            pending.append(code)
+        else:
+            yield code, (dict(cached) if cached else None), None
+
+    if not pending:
+        return
+
+    executor = ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(pending))),
+                                  thread_name_prefix="cost-center-bulk")
+    try:
+        # copy_context() per task so API spans land on the calling request's trace
+        futures = {executor.submit(contextvars.copy_context().run, _resolve_uncached, code): code for code in pending}
+        for future in as_completed(futures):
+            code = futures[future]
+            try:
+                yield code, future.result(), None
+            except requests.RequestException as e:
+                yield code, None, str(e)
+    finally:
+        # Consumer may stop early (e.g. client disconnected) → drop queued lookups
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+def fetch_cost_center_details_bulk(codes, max_workers=BULK_MAX_WORKERS):
+    """
+    Bulk version of fetch_cost_center_details.
+    Returns {'results': {code: record or None (not found)}, 'errors': {code: message}}.
+    """
+    results, errors = {}, {}
+    for code, record, error in iter_cost_center_details(codes, max_workers):
+        if error:
+            errors[code] = error
+        else:
+            results[code] = record
+    return {'results': results, 'errors': errors}
+
+
+REQUIRED_FIELDS = ["CostCenter", "Name3", "Name4", "Responsible", "Department", "ResponsibleOrgOffice"]
+
+# Namespaces for XML parsing (Clark notation, built once)
+ATOM_NS = "http://www.w3.org/2005/Atom"
+DATA_NS = "http://schemas.microsoft.com/ado/2007/08/dataservices"
+META_NS = "http://schemas.microsoft.com/ado/2007/08/dataservices/metadata"
+_ENTRY_TAG = f"{{{ATOM_NS}}}entry"
+_PROPERTIES_PATH = f"{{{ATOM_NS}}}content/{{{META_NS}}}properties"
+_FIELD_TAGS = {f"{{{DATA_NS}}}{name}": name for name in REQUIRED_FIELDS}
+_STREAM_CHUNK_SIZE = 8192
+_LINK_TAG = f"{{{ATOM_NS}}}link"
+
+cost_center_replica = CostCenterReplica(COST_CENTER_REPLICA_PATH, REQUIRED_FIELDS)
 
-        # Namespaces for XML parsing
-        ns = {
-            "atom": "http://www.w3.org/2005/Atom",
-            "d": "http://schemas.microsoft.com/ado/2007/08/dataservices",
-            "m": "http://schemas.microsoft.com/ado/2007/08/dataservices/metadata"
-        }
 
-        root = ET.fromstring(response.text)
-        required_fields = ["CostCenter", "Name3", "Name4", "Responsible", "Department", "ResponsibleOrgOffice"]
+def _entry_record(entry, field_tags=_FIELD_TAGS):
+    """Wanted fields of one Atom <entry>'s m:properties, or None when it has none."""
+    props = entry.find(_PROPERTIES_PATH)
+    if props is None:
+        return None
+    return {field_tags[child.tag]: child.text for child in props if child.tag in field_tags}
 
-        result = []
-        for entry in root.findall("atom:entry", ns):
-            props = entry.find("atom:content/m:properties", ns)
-            if props is not None:
-                record = {child.tag.split("}")[-1]: child.text for child in props if child.tag.split("}")[-1] in required_fields}
-                result.append(record)
 
-        if result:
-            return result[0]  # Found valid cost center
+def parse_cost_center_feed(chunks, candidates=()):
+    """
+    Incrementally parse a CostCenterEntitySet Atom feed given as an iterable of
+    byte chunks. Only the REQUIRED_FIELDS of each entry's m:properties are kept.
+    Returns the record for the best candidate (earliest in `candidates`), or None
+    when no entry matches any of them; without candidates, the first record (or
+    None). Stops reading as soon as the best possible match (candidates[0], or
+    any entry when no candidates are given) is seen.
+    """
+    rank = {c: i for i, c in enumerate(candidates)}
+    best, best_rank = None, len(rank)
+    parser = ET.XMLPullParser(events=("end",))
+
+    for chunk in chunks:
+        parser.feed(chunk)
+        for _, elem in parser.read_events():
+            if elem.tag != _ENTRY_TAG:
+                continue
+            record = _entry_record(elem)
+            if record is not None:
+                if not rank:
+                    return record
+                record_rank = rank.get((record.get("CostCenter") or '').upper(), len(rank))
+                if record_rank < best_rank:
+                    best, best_rank = record, record_rank
+                    if best_rank == 0:
+                        return best
+            elem.clear()  # keep memory flat for large feeds
+
+    return best
 
-        # Pad with leading zero and retry
+
+def cost_center_candidates(normalized_input):
+    """
+    Every zero-padded form of the input up to 10 characters, shortest first
+    (the order the old one-request-per-padding loop tried them in).
+    """
+    candidates = []
+    while len(normalized_input) <= 10:
+        candidates.append(normalized_input)
         normalized_input = '0' + normalized_input
+    return candidates
+
+
+def _lookup_cost_center(normalized_input):
+    """
+    Resolve all padded candidates with a single OData request and pick the
+    first candidate (shortest padding) that exists. Raises on API errors.
+    """
+    candidates = cost_center_candidates(normalized_input)
+    if not candidates:
+        return None
+
+    # OData escapes a single quote inside a literal by doubling it
+    filter_expr = " or ".join(
+        "CostCenter eq '{}'".format(c.replace("'", "''")) for c in candidates
+    )
+    query = f"$filter={filter_expr}&$select={','.join(REQUIRED_FIELDS)}"
+
+    with cost_center_client.get(query, stream=True) as response:
+        chunks = response.iter_content(chunk_size=_STREAM_CHUNK_SIZE)
+        result = parse_cost_center_feed(chunks, candidates)
+        # Drain whatever is left (tiny thanks to $select) so the keep-alive connection is reused
+        for _ in chunks:
+            pass
+
+    # None → no valid cost center found
+    return result
+
+
+# --------------------------
+# Local Cost Center Replica
+# --------------------------
+def _lookup_replica(normalized_input):
+    """Replica record for the best padded candidate, or None (not synced yet / not there / unreadable)."""
+    try:
+        if not cost_center_replica.available():
+            return None
+        return cost_center_replica.lookup(cost_center_candidates(normalized_input))
+    except sqlite3.Error as e:
+        print(f"❌ Cost center replica error for {normalized_input}: {e}")
+        return None
+
 
-    # No valid cost center found
-    return None
+def read_cost_center_page(chunks, field_tags=_FIELD_TAGS):
+    """
+    Parse one page of a CostCenterEntitySet feed.
+    Returns (records, next_href) where next_href is the feed's rel="next" link
+    (server-driven paging / $skiptoken) or None.
+    """
+    records, next_href = [], None
+    parser = ET.XMLPullParser(events=("end",))
+    for chunk in chunks:
+        parser.feed(chunk)
+        for _, elem in parser.read_events():
+            if elem.tag == _ENTRY_TAG:
+                record = _entry_record(elem, field_tags)
+                if record and record.get("CostCenter"):
+                    records.append(record)
+                elem.clear()
+            elif elem.tag == _LINK_TAG and elem.get("rel") == "next":
+                next_href = elem.get("href")
+    return records, next_href
+
+
+def sync_cost_center_replica(full=False, page_size=COST_CENTER_SYNC_PAGE_SIZE, min_interval=0):
+    """
+    Page through the CostCenterEntitySet into the local replica.
+
+    Follows the service's next links when it sends them, else pages with
+    $top/$skip ordered by CostCenter until a page comes back empty (a short page
+    proves nothing: the server may cap $top). A full sync replaces the whole replica
+    (entries not seen again are pruned, only once the last page was reached and
+    something came back); an incremental one only fetches entries
+    whose COST_CENTER_SYNC_DELTA_FIELD is past the stored watermark. Falls back
+    to a full sync when there is no delta field, no previous full sync, or the
+    last one is older than COST_CENTER_FULL_SYNC_MAX_AGE.
+    Only one process syncs at a time; others return immediately. With min_interval
+    (the in-app scheduler, which runs in every gunicorn worker) a sync is also skipped
+    when any process started one less than min_interval seconds ago.
+    """
+    release = cost_center_replica.sync_lock()
+    if release is None:
+        return {'skipped': 'another sync is running'}
+
+    try:
+        started = time.time()
+        last_full = cost_center_replica.get_state('last_full_sync')
+        if min_interval and not full:
+            last_sync = max(float(last_full or 0), float(cost_center_replica.get_state('last_incremental_sync') or 0))
+            if started - last_sync < min_interval:
+                return {'skipped': f"last sync {started - last_sync:.0f}s ago"}
+        watermark = cost_center_replica.get_state('watermark')
+        full = (full or not COST_CENTER_SYNC_DELTA_FIELD or last_full is None or not watermark
+                or started - float(last_full) > COST_CENTER_FULL_SYNC_MAX_AGE)
+
+        fields = list(REQUIRED_FIELDS)
+        field_tags = dict(_FIELD_TAGS)
+        if COST_CENTER_SYNC_DELTA_FIELD:
+            fields.append(COST_CENTER_SYNC_DELTA_FIELD)
+            field_tags[f"{{{DATA_NS}}}{COST_CENTER_SYNC_DELTA_FIELD}"] = COST_CENTER_SYNC_DELTA_FIELD
+
+        base_query = f"$select={','.join(fields)}&$orderby=CostCenter&$top={page_size}"
+        if not full:
+            base_query += f"&$filter={COST_CENTER_SYNC_DELTA_FIELD} gt datetime'{watermark}'"
+
+        query, pages, rows = base_query, 0, 0
+        new_watermark = watermark
+        while query:
+            with cost_center_client.get(query, stream=True) as response:
+                records, next_href = read_cost_center_page(
+                    response.iter_content(chunk_size=_STREAM_CHUNK_SIZE), field_tags
+                )
+            cost_center_replica.upsert(records, started)
+            pages += 1
+            rows += len(records)
+            if COST_CENTER_SYNC_DELTA_FIELD:
+                # ISO timestamps → lexical max is the latest change
+                new_watermark = max([new_watermark or ''] + [r.get(COST_CENTER_SYNC_DELTA_FIELD) or '' for r in records]) or None
+
+            if next_href:
+                query = urlsplit(next_href).query
+            elif records:
+                query = f"{base_query}&$skip={rows}"
+            else:
+                query = None
+
+        pruned = cost_center_replica.prune(started) if full and rows else 0
+        state = {'watermark': new_watermark}
+        state['last_full_sync' if full else 'last_incremental_sync'] = started
+        cost_center_replica.set_state(**state)
+        return {
+            'mode': 'full' if full else 'incremental',
+            'pages': pages,
+            'rows': rows,
+            'pruned': pruned,
+            'seconds': round(time.time() - started, 2)
+        }
+    finally:
+        release()
 
 
 # --------------------------